@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Uygulama günlüğü (~/garanti.log) ayarı.
+
+Modül import edilirken günlük ayarı yapılmaz; configure_logging() ilk çağrıldığında
+bir kez yapılır, sonraki çağrılar bir şey yapmaz.
+
+Kayıtlar GUI thread'inde sadece bir kuyruğa eklenir (QueueHandler); dosyaya yazma,
+döndürme ve sıkıştırma arka plandaki QueueListener thread'inde yapılır. Dosya
+LOG_MAX_BYTES boyutunu veya LOG_MAX_AGE_DAYS yaşını aşınca garanti.log.1.gz ...
+olarak döndürülür, en fazla LOG_BACKUP_COUNT eski dosya tutulur.
+
+Seviye çalışırken set_log_level() ile (veya GARANTI_LOG_LEVEL ortam değişkeniyle)
+değiştirilebilir; seviyenin altındaki kayıtlar kuyruğa hiç girmez.
+"""
+
+import atexit
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+LOG_FILE = Path.home() / "garanti.log"
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_MAX_AGE_DAYS = 7
+LOG_BACKUP_COUNT = 5
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+_configured = False
+_listener = None
+_lock = threading.Lock()
+
+
+class CompressingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Boyut veya yaş sınırında döndüren, eski dosyaları gzip'leyen dosya handler'ı"""
+
+    def __init__(self, filename, max_bytes=LOG_MAX_BYTES, max_age_days=LOG_MAX_AGE_DAYS,
+                 backup_count=LOG_BACKUP_COUNT):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding="utf-8", delay=True)
+        self.max_age = max_age_days * 86400 if max_age_days else 0
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self._compress
+        self._started_at = self._first_record_time()
+
+    def _first_record_time(self):
+        """Mevcut dosyanın ilk kaydının zamanı (dosya yoksa veya okunamazsa şimdi)"""
+        try:
+            with open(self.baseFilename, "r", encoding="utf-8", errors="replace") as f:
+                first = f.read(19)
+            return datetime.strptime(first, "%Y-%m-%d %H:%M:%S").timestamp()
+        except (OSError, ValueError):
+            return time.time()
+
+    def shouldRollover(self, record):
+        if self.max_age and time.time() - self._started_at >= self.max_age:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self._started_at = time.time()
+
+    @staticmethod
+    def _compress(source, dest):
+        with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+
+def configure_logging(level=None, filename=None):
+    """Kök logger'ı kuyruk üzerinden dönen dosyaya yazacak şekilde ayarla (bir kez).
+
+    Kök logger'ın zaten handler'ı varsa (ör. komut satırı araçları) dokunulmaz.
+    """
+    global _configured, _listener
+    with _lock:
+        if _configured:
+            return
+        _configured = True
+        root = logging.getLogger()
+        if root.handlers:
+            return
+
+        file_handler = CompressingRotatingFileHandler(str(filename or LOG_FILE))
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        log_queue = queue.SimpleQueue()
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=False)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+    set_log_level(level or os.environ.get("GARANTI_LOG_LEVEL", "INFO"))
+
+
+def set_log_level(level):
+    """Günlük seviyesini çalışırken değiştir ('DEBUG', 'INFO', ... veya logging sabiti)"""
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    logging.getLogger().setLevel(level)
+
+
+def get_log_level():
+    return logging.getLevelName(logging.getLogger().level)
+
+
+def shutdown_logging():
+    """Kuyrukta kalan kayıtları yaz ve arka plan thread'ini durdur"""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def add_log_level_menu(menu):
+    """Tepsi menüsüne "Günlük Seviyesi" alt menüsünü ekle"""
+    from PyQt6.QtGui import QActionGroup
+
+    submenu = menu.addMenu("Günlük Seviyesi")
+    group = QActionGroup(submenu)
+    group.setExclusive(True)
+    current = get_log_level()
+    for name in LOG_LEVELS:
+        action = submenu.addAction(name)
+        action.setCheckable(True)
+        action.setChecked(name == current)
+        action.triggered.connect(lambda _checked=False, name=name: set_log_level(name))
+        group.addAction(action)
+    return submenu
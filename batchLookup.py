@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Toplu garanti sorgusu (arayüzsüz).
+
+    python batchLookup.py serials.txt -o results.csv
+
+Seriler dosyadan (satır başına bir seri veya CSV'nin ilk kolonu) okunur, önbellekte
+olmayanlar backend'lere eşzamanlı sorulur; sonuçlar CSV'ye ve geçmişe toplu yazılır.
+cache_service.json varsa paylaşılan önbellekteki sonuçlar başta tek seferde alınır,
+yeni sonuçlar servise de gönderilir (bkz. cacheService.py).
+"""
+
+import argparse
+import csv
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from cacheService import get_shared_cache
+from serialRouting import RoutingTable
+from warrantyClient import BACKEND_ORDER, BACKENDS_FILE, WarrantyClient, load_backends
+from warrantyStore import get_store, status_label_text
+
+logger = logging.getLogger("garanti")
+
+# Geçmişe bu kadar sonuç biriktikçe tek transaction'da yaz
+WRITE_BATCH = 200
+
+
+def read_serials(path):
+    """Serileri sırayı koruyarak, tekrarsız oku"""
+    seen = set()
+    serials = []
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            serial = row[0].strip().upper()
+            if serial and serial not in seen and not serial.startswith('#'):
+                seen.add(serial)
+                serials.append(serial)
+    return serials
+
+
+def run_batch(serials, client, output_path, workers=16, use_cache=True, store=None, progress=None):
+    """Serileri eşzamanlı sorgula, sonuçları CSV'ye ve geçmişe yaz; özet sayıları döndür"""
+    summary = {'total': len(serials), 'cache': 0, 'stale': 0, 'api': 0, 'error': 0}
+    pending_history = []
+    started = time.monotonic()
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as f, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        writer = csv.writer(f)
+        writer.writerow(['Seri Numarası', 'Durum', 'Model', 'Kaynak', 'Hata'])
+
+        futures = {pool.submit(client.lookup, serial, use_cache): serial for serial in serials}
+        for done, future in enumerate(as_completed(futures), start=1):
+            serial = futures[future]
+            try:
+                result, source = future.result()
+            except Exception as e:
+                summary['error'] += 1
+                writer.writerow([serial, '', '', '', str(e)])
+                continue
+
+            writer.writerow([serial, status_label_text(result.get('status_color', '')),
+                             result.get('copy_model_payload', ''), source, ''])
+            if source in ('cache', 'stale'):
+                summary[source] += 1
+            else:
+                summary['api'] += 1
+                pending_history.append((serial, result, datetime.now()))
+
+            if store is not None and len(pending_history) >= WRITE_BATCH:
+                store.put_lookups(pending_history)
+                pending_history = []
+            if progress:
+                progress(done, len(serials))
+
+    if store is not None and pending_history:
+        store.put_lookups(pending_history)
+    # Eski önbellek kayıtlarının arka plan yenilemeleri de bitsin
+    client.wait_refreshes()
+
+    summary['seconds'] = time.monotonic() - started
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Toplu garanti sorgusu")
+    parser.add_argument("serials", help="Seri listesi (txt veya csv, ilk kolon)")
+    parser.add_argument("-o", "--output", default="results.csv", help="Sonuç CSV dosyası")
+    parser.add_argument("--config", default=BACKENDS_FILE, help="Backend ayar dosyası")
+    parser.add_argument("--workers", type=int, default=16, help="Eşzamanlı sorgu sayısı")
+    parser.add_argument("--no-cache", action="store_true", help="Önbelleği kullanma, hepsini sorgula")
+    parser.add_argument("--no-history", action="store_true", help="Sonuçları geçmişe yazma")
+    parser.add_argument("--parallel", action="store_true",
+                        help="RecciTek ve KVK'yı aynı anda sor, ilk kesin cevabı al")
+    parser.add_argument("--no-routing", action="store_true",
+                        help="Seri önekine göre backend tahmini yapma, sabit sırayla sor")
+    parser.add_argument("--no-shared", action="store_true",
+                        help="Paylaşılan önbellek servisini kullanma, sadece yerel depo")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    serials = read_serials(args.serials)
+    store = get_store()
+    history_store = store
+    shared = None if args.no_shared else get_shared_cache(store)
+    if shared is not None:
+        history_store = shared
+        if not args.no_cache:
+            # Servisin bildikleri yerel depoya tek seferde alınır; sorgular yerelden okur
+            shared.get_many(serials)
+    router = None
+    if not args.no_routing:
+        router = RoutingTable(BACKEND_ORDER)
+        router.learn_from_store(store)
+    client = WarrantyClient(load_backends(args.config), store, parallel=args.parallel, router=router)
+
+    def progress(done, total):
+        if done % 100 == 0 or done == total:
+            print(f"\r{done}/{total}", end="", file=sys.stderr, flush=True)
+
+    summary = run_batch(serials, client, args.output, workers=args.workers,
+                        use_cache=not args.no_cache,
+                        store=None if args.no_history else history_store,
+                        progress=progress)
+    client.close()
+    if shared is not None:
+        # Arka plan yenilemeleri yerel depoya yazıldı; onlar da servise gitsin
+        shared.push()
+    print(file=sys.stderr)
+    rate = summary['total'] / summary['seconds'] if summary['seconds'] else 0
+    print(f"{summary['total']} seri: {summary['cache']} önbellekten, {summary['stale']} eski önbellekten "
+          f"(yenilendi), {summary['api']} API'den, {summary['error']} hata - "
+          f"{summary['seconds']:.1f} sn ({rate:.1f} seri/sn)")
+    print(client.stats.summary())
+    print(client.latency.summary())
+    if router is not None:
+        print(router.report())
+    return 0 if summary['error'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""ClipboardWatcher için sentetik pano olayı benchmark'ı.
+
+    python -m benchmarks.clipboardBench --events 100000
+
+Karışık pano içeriği (kısa metin, kod/log parçası, büyük tablo, seri, seriye
+benzeyen metin) üretilir ve:
+  1. SerialFilter ile her metnin işlenme süresi, tüm metni regex ile tarayan
+     basit yaklaşımla karşılaştırılır
+  2. Olaylar patlamalar halinde ClipboardWatcher'a verilir (offscreen Qt), debounce
+     sonrası kaç okuma ve sorgu yapıldığı sayılır
+"""
+
+import argparse
+import os
+import random
+import re
+import string
+import sys
+import time
+
+NAIVE_RE = re.compile(r'\b[A-Z][A-Z0-9]{13}\b')
+SERIAL_PREFIXES = ("R58EBR", "R58VBR", "RCFVBY", "R35EBD")
+
+
+def synthetic_texts(count, seed=1):
+    """Operatör makinesindeki pano trafiğine benzer metinler"""
+    rng = random.Random(seed)
+    words = ["garanti", "cihaz", "servis", "kayıt", "müşteri", "Roborock", "teslim", "arıza", "OK"]
+    big_table = "\n".join(
+        "\t".join(rng.choice(words) for _ in range(8)) for _ in range(2000)
+    )
+    code = "def f(x):\n    return x * 2\n" * 40
+    texts = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.40:
+            texts.append(" ".join(rng.choice(words) for _ in range(rng.randint(1, 12))))
+        elif roll < 0.55:
+            texts.append(code)
+        elif roll < 0.60:
+            texts.append(big_table)
+        elif roll < 0.75:
+            texts.append(str(rng.randint(0, 10 ** 12)))
+        elif roll < 0.80:
+            # Seriye benzeyen ama geçersiz: yanlış uzunluk / Türkçe karakter / boşluk
+            texts.append(rng.choice(SERIAL_PREFIXES) + rng.choice(["1234", "ÇĞ12345678", "12 345678"]))
+        else:
+            serial = rng.choice(SERIAL_PREFIXES) + "".join(rng.choices(string.digits, k=8))
+            texts.append(rng.choice(["", " ", "\n"]) + serial + rng.choice(["", "\n", "\r\n"]))
+    return texts
+
+
+def bench_filter(texts):
+    from clipboardWatcher import SerialFilter
+
+    naive_hits = 0
+    started = time.perf_counter()
+    for text in texts:
+        if NAIVE_RE.search(text.upper()):
+            naive_hits += 1
+    naive_seconds = time.perf_counter() - started
+
+    serial_filter = SerialFilter(duplicate_seconds=0)
+    started = time.perf_counter()
+    for text in texts:
+        serial_filter.check(text)
+    filter_seconds = time.perf_counter() - started
+
+    print(f"Basit regex taraması : {naive_seconds * 1000:8.1f} ms "
+          f"({naive_seconds / len(texts) * 1e6:.2f} µs/olay, {naive_hits} eşleşme)")
+    print(f"SerialFilter         : {filter_seconds * 1000:8.1f} ms "
+          f"({filter_seconds / len(texts) * 1e6:.2f} µs/olay, {serial_filter.looked_up} seri)")
+    print(f"  sayaçlar: {serial_filter.counters()}")
+
+
+def bench_watcher(texts, burst):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+
+    from clipboardWatcher import ClipboardWatcher
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    current = [""]
+    watcher = ClipboardWatcher(app.clipboard(), debounce_ms=0, text_source=lambda: current[0])
+    detected = []
+    watcher.serialDetected.connect(detected.append)
+
+    started = time.perf_counter()
+    for index, text in enumerate(texts, start=1):
+        # Gerçek panoya yazmak yerine sinyali doğrudan tetikle (kopyala-yapıştır patlaması)
+        current[0] = text
+        watcher._on_data_changed()
+        if index % burst == 0:
+            app.processEvents()
+    app.processEvents()
+    seconds = time.perf_counter() - started
+
+    counters = watcher.counters()
+    print(f"ClipboardWatcher     : {seconds * 1000:8.1f} ms, {counters['events']} olay -> "
+          f"{counters['seen']} okuma -> {len(detected)} sorgu (patlama boyu {burst})")
+    print(f"  sayaçlar: {counters}")
+    watcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pano izleyici benchmark'ı")
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--burst", type=int, default=5, help="Debounce penceresine düşen olay sayısı")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    texts = synthetic_texts(args.events, args.seed)
+    bench_filter(texts)
+    bench_watcher(texts, args.burst)
+
+
+if __name__ == "__main__":
+    main()
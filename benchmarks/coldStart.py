@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Soğuk açılış ölçümü: tepsi simgesinin görünmesine kadar geçen süre ve import dökümü.
+
+    python -m benchmarks.coldStart                  # ölç ve yazdır
+    python -m benchmarks.coldStart --save base.json # sonucu kaydet
+    python -m benchmarks.coldStart --compare base.json
+
+Her senaryo ayrı (taze) bir Python sürecinde çalışır:
+  eager  historyUi import edilir ve HistoryPopup açılışta kurulur (eski davranış)
+  lazy   sadece lazyHistory import edilir, pencere ilk kullanımda kurulur
+Süreler process başlangıcından tepsi simgesinin show() çağrısının dönmesine kadardır.
+Ayrıca `-X importtime` çıktısından en pahalı importlar listelenir.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_SCRIPT = r"""
+import os, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {package_dir!r})
+from PyQt6.QtWidgets import QApplication, QSystemTrayIcon
+from PyQt6.QtGui import QIcon
+app = QApplication(sys.argv)
+if {mode!r} == "eager":
+    from historyUi import HistoryPopup
+    history = HistoryPopup()
+else:
+    from lazyHistory import LazyHistory
+    history = LazyHistory()
+tray = QSystemTrayIcon(QIcon(os.path.join({package_dir!r}, "logo.ico")))
+tray.show()
+print(f"TRAY {{(time.perf_counter() - started) * 1000:.1f}}")
+"""
+
+# Regresyon sayılacak artış oranı
+TOLERANCE = 0.20
+
+
+def run_startup(mode, workdir):
+    script = STARTUP_SCRIPT.format(package_dir=PACKAGE_DIR, mode=mode)
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=workdir, env=env, capture_output=True, text=True, timeout=120,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{mode} senaryosu başarısız:\n{completed.stderr[-2000:]}")
+
+    tray_ms = None
+    for line in completed.stdout.splitlines():
+        if line.startswith("TRAY "):
+            tray_ms = float(line.split()[1])
+    return tray_ms, parse_importtime(completed.stderr)
+
+
+def parse_importtime(stderr):
+    """`-X importtime` satırlarından {modül: (öz süre ms, kümülatif ms, derinlik)}"""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        except ValueError:
+            continue
+        # İç içe importlar ikişer boşlukla girintilenir
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000, depth)
+    return imports
+
+
+def measure(repeat):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in ("eager", "lazy"):
+            runs = [run_startup(mode, workdir) for _ in range(repeat)]
+            tray_times = sorted(tray_ms for tray_ms, _imports in runs)
+            imports = runs[-1][1]
+            results[mode] = {
+                "tray_ms": tray_times[len(tray_times) // 2],
+                "import_ms": sum(self_ms for self_ms, _cumulative, _depth in imports.values()),
+                # Sadece başlangıç betiğinin doğrudan yaptığı importlar
+                "top_imports": sorted(
+                    ((name, cumulative) for name, (_self, cumulative, depth) in imports.items()
+                     if depth == 0),
+                    key=lambda item: item[1], reverse=True,
+                )[:10],
+            }
+    return results
+
+
+def print_results(results):
+    for mode, result in results.items():
+        print(f"[{mode}] tepsi görünene kadar {result['tray_ms']:.1f} ms "
+              f"(importlar toplam {result['import_ms']:.1f} ms)")
+        for name, cumulative in result["top_imports"]:
+            print(f"    {cumulative:8.1f} ms  {name}")
+
+
+def compare(results, baseline):
+    """Baz ölçüme göre TOLERANCE'tan fazla yavaşlayan senaryolar"""
+    regressions = []
+    for mode, result in results.items():
+        base = baseline.get(mode)
+        if not base:
+            continue
+        change = result["tray_ms"] / base["tray_ms"] - 1
+        print(f"[{mode}] {base['tray_ms']:.1f} ms -> {result['tray_ms']:.1f} ms ({change * 100:+.0f}%)")
+        if change > TOLERANCE:
+            regressions.append(mode)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soğuk açılış ölçümü")
+    parser.add_argument("--repeat", type=int, default=5, help="Senaryo başına tekrar (medyan alınır)")
+    parser.add_argument("--save", metavar="PATH", help="Sonucu JSON olarak kaydet")
+    parser.add_argument("--compare", metavar="PATH", help="Kayıtlı sonuçla karşılaştır")
+    args = parser.parse_args()
+
+    results = measure(args.repeat)
+    print_results(results)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f))
+        if regressions:
+            print(f"Yavaşlama: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
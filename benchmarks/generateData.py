@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Benchmark'lar için gerçekçi warranty_cache.json ve device_notes.json üretici.
+
+    python -m benchmarks.generateData 100000 --out /tmp/bench
+
+Kayıtlar app.py'nin yazdığı biçimdedir:
+    {"SERI": {"result": {"status_color": "green", "copy_model_payload": "..."},
+              "timestamp": "2025-03-01T12:34:56.123456"}}
+Seri önekleri README'deki test serilerinden, durum dağılımı öneklerden gelir.
+"""
+
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+SIZES = (1000, 10000, 100000, 1000000)
+
+# önek -> [(durum, ağırlık)]
+PREFIX_STATUS = {
+    "R58VBR": [("green", 0.9), ("red", 0.1)],
+    "RCFVBY": [("red", 1.0)],
+    "R58EBR": [("blue", 0.85), ("red", 0.15)],
+    "R35EBD": [("red", 1.0)],
+    "R72SBR": [("green", 0.6), ("blue", 0.3), ("red", 0.1)],
+}
+
+MODEL_PAYLOADS = (
+    "Roborock S8 Sonic Siyah",
+    "Roborock S8 Pro Ultra Beyaz",
+    "Roborock S7 MaxV Siyah",
+    "Roborock Q7 Max Beyaz",
+    "Roborock Q5 Pro Siyah",
+    "Roborock Qrevo S Beyaz",
+    "Roborock Dyad Pro",
+    "Roborock H1 Kablosuz Süpürge",
+    "",
+)
+
+NOTE_TEXTS = (
+    "Müşteri tekrar arayacak",
+    "Batarya değişimi yapıldı",
+    "Fatura bekleniyor",
+    "Kargoya verildi",
+    "Ana kart arızası, parça sipariş edildi",
+    "İade talebi",
+)
+
+
+def generate_cache(count, seed=1, days=365):
+    """{seri: kayıt} sözlüğü (seriler benzersiz)"""
+    rng = random.Random(seed)
+    prefixes = list(PREFIX_STATUS)
+    now = datetime.now()
+    cache = {}
+    while len(cache) < count:
+        prefix = rng.choice(prefixes)
+        serial = prefix + f"{rng.randrange(10 ** 8):08d}"
+        if serial in cache:
+            continue
+        statuses, weights = zip(*PREFIX_STATUS[prefix])
+        status = rng.choices(statuses, weights)[0]
+        model = "" if status == "red" and rng.random() < 0.5 else rng.choice(MODEL_PAYLOADS)
+        timestamp = now - timedelta(seconds=rng.randrange(days * 86400))
+        cache[serial] = {
+            "result": {"status_color": status, "copy_model_payload": model},
+            "timestamp": timestamp.isoformat(),
+        }
+    return cache
+
+
+def generate_notes(serials, ratio=0.02, seed=2):
+    """Serilerin yaklaşık `ratio` kadarı için not"""
+    rng = random.Random(seed)
+    return {serial: rng.choice(NOTE_TEXTS) for serial in serials if rng.random() < ratio}
+
+
+def write_files(directory, count, seed=1, note_ratio=0.02):
+    """Dizine warranty_cache.json ve device_notes.json yaz; (kayıt, not) sayısını döndür"""
+    os.makedirs(directory, exist_ok=True)
+    cache = generate_cache(count, seed)
+    notes = generate_notes(cache, note_ratio, seed + 1)
+    with open(os.path.join(directory, "warranty_cache.json"), "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    with open(os.path.join(directory, "device_notes.json"), "w", encoding="utf-8") as f:
+        json.dump(notes, f, ensure_ascii=False)
+    return len(cache), len(notes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentetik önbellek ve not dosyası üret")
+    parser.add_argument("count", type=int, help=f"Kayıt sayısı (ör. {', '.join(map(str, SIZES))})")
+    parser.add_argument("--out", default=".", help="Çıktı dizini")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--note-ratio", type=float, default=0.02, help="Notu olan kayıt oranı")
+    args = parser.parse_args()
+
+    count, notes = write_files(args.out, args.count, args.seed, args.note_ratio)
+    print(f"{count} kayıt, {notes} not -> {os.path.abspath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
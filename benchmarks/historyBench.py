@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""Geçmiş penceresi ve kalıcılık sıcak yolları için süre ve bellek benchmark'ı.
+
+    python -m benchmarks.historyBench                          # 1k/10k/100k
+    python -m benchmarks.historyBench --sizes 1000000
+    python -m benchmarks.historyBench --save benchmarks/baseline.json
+    python -m benchmarks.historyBench --compare benchmarks/baseline.json
+    python -m benchmarks.historyBench --table 1000000           # kayıt başına bellek
+
+Her boyut ve ölçüm geçişi ayrı bir süreçte, üretilmiş JSON dosyalarının kopyası
+olan boş bir dizinde ve Qt `offscreen` platformuyla çalışır. Süreler tracemalloc
+kapalıyken, tepe bellek (Python nesneleri) ayrı bir geçişte tracemalloc ile ölçülür.
+
+Ölçülen işlemler:
+  load_history_cold         HistoryPopup kurulumu (JSON geçişi dahil) + ilk yükleme
+  load_history_full         depodan tam yeniden yükleme
+  load_history_incremental  10 yeni sorgudan sonra artımlı yenileme
+  filter_notes / filter_all filter_devices("notes") / ("all")
+  filter_facets             durum + notlu + tarih yüzeyleri, VEYA kipi ve temizleme
+  search                    search_history("R58E") ve ("sonic")
+  export_csv                "Dışa Aktar" butonunun çalıştırdığı HistoryExport (CSV)
+  save_note                 1000 save_note + save_notes (diske yazım)
+  load_notes                load_notes
+
+--table N: N kayıtlık HistoryTable (seri metinleri dahil) ve yüzey indeksinin kayıt
+başına belleği; historyTable.MEMORY_BUDGET aşılırsa çıkış kodu 1.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import islice
+
+from benchmarks.generateData import write_files
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Regresyon: hem oran hem mutlak fark aşılmalı (küçük ölçümlerdeki gürültü için)
+TOLERANCE = 0.25
+MIN_DELTA_SECONDS = 0.005
+MIN_DELTA_MB = 1.0
+
+
+def _wait(app, condition, timeout=600):
+    deadline = time.monotonic() + timeout
+    while condition():
+        app.processEvents()
+        if time.monotonic() > deadline:
+            raise TimeoutError("Benchmark işlemi zaman aşımına uğradı")
+        time.sleep(0.001)
+
+
+def run_operations(memory):
+    """Çalışma dizinindeki dosyalarla tüm işlemleri sırayla ölç: {işlem: sonuç}"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, PACKAGE_DIR)
+    if memory:
+        import tracemalloc
+
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+
+    def measure(name, operation):
+        if memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        operation()
+        seconds = time.perf_counter() - started
+        if memory:
+            results[name] = {"peak_mb": tracemalloc.get_traced_memory()[1] / 1e6}
+            tracemalloc.stop()
+        else:
+            results[name] = {"seconds": seconds}
+
+    import historyUi
+    from historyExport import HistoryExport
+
+    holder = {}
+
+    def load_cold():
+        popup = holder["popup"] = historyUi.HistoryPopup()
+        popup.load_history()
+        _wait(app, popup.is_loading)
+
+    def load_full():
+        holder["popup"].load_history(incremental=False)
+        _wait(app, holder["popup"].is_loading)
+
+    def load_incremental():
+        popup = holder["popup"]
+        popup.store.put_lookups(
+            (f"BENCH{i:09d}", {"status_color": "green", "copy_model_payload": "Roborock S8"}, datetime.now())
+            for i in range(10)
+        )
+        popup.load_history()
+        _wait(app, popup.is_loading)
+
+    def filter_facets():
+        popup = holder["popup"]
+        popup.status_buttons["green"].setChecked(True)
+        popup.status_buttons["blue"].setChecked(True)
+        popup.show_notes_btn.setChecked(True)
+        popup.date_combo.setCurrentIndex(3)
+        popup.facet_mode_btn.setChecked(True)
+        popup.filter_devices("all")
+
+    def search():
+        holder["popup"].search_history("R58E")
+        holder["popup"].search_history("sonic")
+        holder["popup"].search_history("")
+
+    def export_csv():
+        HistoryExport(holder["popup"].store, "bench_export.csv").run()
+
+    def save_notes():
+        popup = holder["popup"]
+        serials = [record[0] for record in islice(popup.history_model.all_records(), 1000)]
+        for serial in serials:
+            popup.save_note(serial, "Benchmark notu")
+        popup.save_notes()
+
+    measure("load_history_cold", load_cold)
+    measure("load_history_full", load_full)
+    measure("load_history_incremental", load_incremental)
+    measure("filter_notes", lambda: holder["popup"].filter_devices("notes"))
+    measure("filter_all", lambda: holder["popup"].filter_devices("all"))
+    measure("filter_facets", filter_facets)
+    measure("search", search)
+    measure("export_csv", export_csv)
+    measure("save_note", save_notes)
+    measure("load_notes", holder["popup"].load_notes)
+
+    holder["popup"].close_popup()
+    return results
+
+
+def measure_table(count):
+    """HistoryTable + FacetIndex için kayıt başına bayt: {'table': ..., 'facets': ...}"""
+    import tracemalloc
+
+    from benchmarks.generateData import generate_cache
+    from historyFacets import FacetIndex
+    from historyTable import HistoryTable
+
+    cache = generate_cache(count)
+    rows = sorted(
+        ((serial, entry["result"]["status_color"], datetime.fromisoformat(entry["timestamp"]).timestamp(),
+          entry["result"]["copy_model_payload"] or None) for serial, entry in cache.items()),
+        key=lambda row: -row[2],
+    )
+    del cache
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    table = HistoryTable()
+    for start in range(0, len(rows), 2000):
+        # Seri metinleri ölçüme dahil olsun diye ölçüm sırasında kopyalanır
+        table.append([(serial.encode().decode(), status, epoch, model)
+                      for serial, status, epoch, model in rows[start:start + 2000]])
+    after_table = tracemalloc.get_traced_memory()[0]
+    facets = FacetIndex()
+    facets.build(table.iter_raw(), {})
+    after_facets = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {"table": (after_table - before) / count, "facets": (after_facets - after_table) / count}
+
+
+def run_worker(data_dir, memory):
+    """Tek bir geçişi taze bir süreçte, verilerin kopyasıyla çalıştır"""
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in ("warranty_cache.json", "device_notes.json"):
+            shutil.copy(os.path.join(data_dir, name), workdir)
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen",
+                   PYTHONPATH=PACKAGE_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        args = [sys.executable, "-m", "benchmarks.historyBench", "--worker"]
+        if memory:
+            args.append("--memory")
+        completed = subprocess.run(args, cwd=workdir, env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"Benchmark süreci başarısız:\n{completed.stderr[-3000:]}")
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_suite(sizes, with_memory=True):
+    results = {}
+    with tempfile.TemporaryDirectory() as data_root:
+        for size in sizes:
+            data_dir = os.path.join(data_root, str(size))
+            records, notes = write_files(data_dir, size)
+            print(f"== {records} kayıt, {notes} not", file=sys.stderr, flush=True)
+            timings = run_worker(data_dir, memory=False)
+            if with_memory:
+                for name, peak in run_worker(data_dir, memory=True).items():
+                    timings[name].update(peak)
+            results[str(size)] = timings
+    return results
+
+
+def print_results(results):
+    for size, operations in results.items():
+        print(f"[{size} kayıt]")
+        for name, result in operations.items():
+            memory = f"{result['peak_mb']:9.1f} MB" if "peak_mb" in result else ""
+            print(f"    {name:26s} {result['seconds'] * 1000:10.1f} ms {memory}")
+
+
+def compare(results, baseline):
+    """Baz sonuca göre yavaşlayan veya daha çok bellek kullanan işlemler"""
+    regressions = []
+    for size, operations in results.items():
+        for name, result in operations.items():
+            base = baseline.get(size, {}).get(name)
+            if not base:
+                continue
+            for key, min_delta in (("seconds", MIN_DELTA_SECONDS), ("peak_mb", MIN_DELTA_MB)):
+                if key not in result or key not in base:
+                    continue
+                delta = result[key] - base[key]
+                if delta > min_delta and delta > base[key] * TOLERANCE:
+                    regressions.append(f"{size}/{name} {key}: {base[key]:.3f} -> {result[key]:.3f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geçmiş ve kalıcılık benchmark'ı")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--no-memory", action="store_true", help="Tepe bellek geçişini atla")
+    parser.add_argument("--save", metavar="PATH", help="Sonucu baz olarak kaydet")
+    parser.add_argument("--compare", metavar="PATH", help="Baz sonuçla karşılaştır")
+    parser.add_argument("--table", type=int, metavar="N", help="N kayıtlık tablonun kayıt başına belleği")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_operations(args.memory)))
+        return 0
+
+    if args.table:
+        from historyTable import MEMORY_BUDGET
+        result = measure_table(args.table)
+        print(f"{args.table} kayıt: tablo {result['table']:.1f} B/kayıt, "
+              f"yüzey indeksi {result['facets']:.1f} B/kayıt (bütçe {MEMORY_BUDGET} B)")
+        return 1 if result["table"] + result["facets"] > MEMORY_BUDGET else 0
+
+    results = run_suite(args.sizes, with_memory=not args.no_memory)
+    print_results(results)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f))
+        for regression in regressions:
+            print(f"Yavaşlama: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Arka planda yeniden doğrulama zamanlayıcısının davranış kontrolü (sahte saatle).
+
+    python -m benchmarks.revalidationCheck
+
+Geçici bir depo ve ağa çıkmayan sahte bir istemciyle RevalidationScheduler
+çalıştırılır; saat ve boşta olma durumu elle ilerletilir. Kontrol edilenler:
+  sıra          notlu cihazlar önce, sonra geçerliliği en erken dolan
+  bütçe         saatlik sınır dolunca istek yapılmaz, pencere kayınca devam edilir
+  boşta olma    kullanıcı etkinken veya uygulamada etkinlik varken istek yapılmaz
+  yazım         sonuç hemen depoya yazılır, durumu değişen cihaz işaretlenir
+  hata          hata alan seri RETRY_SECONDS dolana kadar tekrar denenmez
+  tekrar sorgu  arşive taşınmış cihaz yeniden sorgulanınca istatistikler ve dışa
+                aktarım onu yine bir kez sayar; eski sonucu depoya geri gelmez
+
+Bir kontrol başarısız olursa çıkış kodu 1.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeClient:
+    """query_backends taklidi: verilen serilerin durumu değişir, bazıları hata verir"""
+
+    def __init__(self, changes=None, failing=()):
+        self.changes = changes or {}
+        self.failing = set(failing)
+        self.queried = []
+
+    def query_backends(self, serial):
+        self.queried.append(serial)
+        if serial in self.failing:
+            raise ConnectionError("sahte bağlantı hatası")
+        status = self.changes.get(serial, 'green')
+        return {'status_color': status, 'copy_model_payload': 'Roborock S8'}, 'recci'
+
+
+def make_store(directory):
+    """Süreleri farklı zamanlarda dolan (veya dolmayan) kayıtlarla geçici depo"""
+    from warrantyStore import CachePolicy, WarrantyStore
+
+    store = WarrantyStore(os.path.join(directory, "check.db"),
+                          CachePolicy({'green': 30, 'blue': 30, 'red': 90}))
+    now = datetime.now()
+    result = {'status_color': 'green', 'copy_model_payload': 'Roborock S8'}
+    store.put_lookups([
+        ("EXPIRED40", result, now - timedelta(days=40)),  # 10 gün önce doldu
+        ("EXPIRED35", result, now - timedelta(days=35)),  # 5 gün önce doldu
+        ("NOTED32", result, now - timedelta(days=32)),  # 2 gün önce doldu, notlu
+        ("SOON29", result, now - timedelta(days=29)),  # 1 gün içinde dolacak
+        ("FRESH1", result, now - timedelta(days=1)),  # ileriye bakış dışında
+    ])
+    store.set_notes({"NOTED32": "Müşteri tekrar arayacak"})
+    return store
+
+
+def make_scheduler(store, client, clock, idle_seconds, requests_per_hour=60):
+    from revalidationScheduler import IdleMonitor, RevalidationScheduler
+
+    idle = IdleMonitor(threshold_seconds=300, probe=lambda: idle_seconds[0], clock=clock)
+    clock.advance(300)  # oluşturulma anındaki "etkinlik" eşiği geçsin
+    return RevalidationScheduler(client, store, requests_per_hour=requests_per_hour,
+                                 idle=idle, lookahead_days=3, clock=clock)
+
+
+def run_checks():
+    """[(kontrol, başarılı mı, ayrıntı)]"""
+    results = []
+
+    def check(name, passed, detail=""):
+        results.append((name, bool(passed), detail))
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Sıra ve yazım
+        store = make_store(directory)
+        clock, idle_seconds = FakeClock(), [600]
+        client = FakeClient(changes={"EXPIRED35": 'red'})
+        scheduler = make_scheduler(store, client, clock, idle_seconds)
+        while scheduler.run_once():
+            clock.advance(1)
+        check("sıra", client.queried == ["NOTED32", "EXPIRED40", "EXPIRED35", "SOON29"],
+              f"{client.queried}")
+        check("yazım", store.get_cached("EXPIRED40")['timestamp'][:10] == datetime.now().date().isoformat(),
+              store.get_cached("EXPIRED40")['timestamp'])
+        marks = store.status_changes()
+        check("durum işareti", set(marks) == {"EXPIRED35"} and marks["EXPIRED35"][:2] == ('green', 'red'),
+              f"{marks}")
+        store.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Bütçe: saatte 2 istek, pencere kayınca devam
+        store = make_store(directory)
+        clock, idle_seconds = FakeClock(), [600]
+        client = FakeClient()
+        scheduler = make_scheduler(store, client, clock, idle_seconds, requests_per_hour=2)
+        done = [scheduler.run_once() for _ in range(3)]
+        check("bütçe sınırı", done == [True, True, False] and len(client.queried) == 2, f"{done}")
+        check("bekleme süresi", abs(scheduler.budget.wait_time() - 3600) < 1, f"{scheduler.budget.wait_time()}")
+        clock.advance(3600)
+        check("bütçe yenilenir", scheduler.run_once() and len(client.queried) == 3, f"{client.queried}")
+        store.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Boşta olma
+        store = make_store(directory)
+        clock, idle_seconds = FakeClock(), [10]
+        client = FakeClient()
+        scheduler = make_scheduler(store, client, clock, idle_seconds)
+        check("kullanıcı etkin", not scheduler.run_once() and not client.queried)
+        idle_seconds[0] = 600
+        scheduler.idle.mark_activity()
+        check("uygulamada etkinlik", not scheduler.run_once() and not client.queried)
+        clock.advance(300)
+        check("boşta çalışır", scheduler.run_once() and len(client.queried) == 1, f"{client.queried}")
+        store.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Hata alan seri tekrar denenmez
+        store = make_store(directory)
+        clock, idle_seconds = FakeClock(), [600]
+        client = FakeClient(failing={"NOTED32"})
+        scheduler = make_scheduler(store, client, clock, idle_seconds)
+        for _ in range(6):
+            scheduler.run_once()
+            clock.advance(1)
+        clock.advance(scheduler.REFILL_SECONDS)
+        scheduler.run_once()
+        check("hata sonrası bekleme", client.queried.count("NOTED32") == 1, f"{client.queried}")
+        store.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Arşivdeki cihaz tekrar sorgulanır
+        store = make_store(directory)
+        before = store.stats_snapshot()
+        store.roll_over(now=datetime.now() + timedelta(days=400))
+        archived = store.stats_snapshot()
+        check("arşivde sayaçlar", store.lookup_count() == 0 and archived['status'] == before['status']
+              and archived['models'] == before['models'], f"{archived['status']} {archived['models']}")
+
+        store.put_lookup("EXPIRED40", {'status_color': 'red', 'copy_model_payload': 'Roborock S8'})
+        stats = store.stats_snapshot()
+        exported = sum(1 for _row in store.iter_export_rows())
+        check("tekrar sorgu", stats['status'] == {'green': 4, 'red': 1} and stats['models'][0][1:] == (5, 1)
+              and exported == 5, f"{stats['status']} {stats['models']} dışa aktarılan: {exported}")
+
+        # JSON köprüsü arşivdeki eski sonucu geri getirmez
+        cache_file = os.path.join(directory, "warranty_cache.json")
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({"EXPIRED35": {'result': {'status_color': 'green'},
+                                     'timestamp': (datetime.now() - timedelta(days=35)).isoformat()}}, f)
+        store.import_json_cache(cache_file)
+        check("arşiv geri gelmez", store.lookup_count() == 1 and sum(store.status_counts().values()) == 5,
+              f"aktif: {store.lookup_count()} {store.status_counts()}")
+        store.close()
+
+    return results
+
+
+def main():
+    sys.path.insert(0, PACKAGE_DIR)
+    results = run_checks()
+    for name, passed, detail in results:
+        print(f"{'OK  ' if passed else 'HATA'} {name:22s} {'' if passed else detail}")
+    return 0 if all(passed for _name, passed, _detail in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""RecciTek ve KVK API'lerini taklit eden yerel sunucu (çevrimdışı deneme için).
+
+    python -m benchmarks.stubServer --port 8765 --latency 50
+
+Cevaplar seri önekine göre sabittir (README'deki test serileriyle uyumlu):
+    R58VBR...  RecciTek garantili
+    RCFVBY...  RecciTek sistemde, garanti dışı
+    R58EBR...  KVK garantili
+    diğerleri  iki sistemde de yok (garanti dışı)
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# önek -> {backend: (in_warranty, model)}
+STUB_ANSWERS = {
+    "R58VBR": {"recci": (True, "S8 Sonic")},
+    "RCFVBY": {"recci": (False, "Q7 Max")},
+    "R58EBR": {"kvk": (True, "S7 MaxV")},
+}
+
+
+class StubState:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = {"recci": 0, "kvk": 0}
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+
+def answer(backend, serial):
+    for prefix, answers in STUB_ANSWERS.items():
+        if serial.startswith(prefix) and backend in answers:
+            in_warranty, model = answers[backend]
+            return {"found": True, "in_warranty": in_warranty, "model": model,
+                    "brand": "Roborock", "color": "Siyah"}
+    return {"found": False}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Başlık ve gövde ayrı yazıldığından Nagle + gecikmeli ACK keep-alive'da ~40 ms ekler
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.state.lock:
+            self.server.state.connections += 1
+
+    def do_GET(self):
+        state = self.server.state
+        parsed = urllib.parse.urlparse(self.path)
+        backend = parsed.path.strip("/")
+
+        if backend == "stats":
+            with state.lock:
+                body = {"requests": dict(state.requests), "max_in_flight": state.max_in_flight,
+                        "connections": state.connections}
+            return self._send(200, body)
+        if backend not in state.requests:
+            return self._send(404, {"error": "unknown backend"})
+
+        serial = urllib.parse.parse_qs(parsed.query).get("serial", [""])[0].upper()
+        with state.lock:
+            state.requests[backend] += 1
+            state.in_flight += 1
+            state.max_in_flight = max(state.max_in_flight, state.in_flight)
+        try:
+            if state.latency:
+                time.sleep(state.latency)
+            self._send(200, answer(backend, serial))
+        finally:
+            with state.lock:
+                state.in_flight -= 1
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, latency=0.0):
+    """Sunucuyu arka plan thread'inde başlat; (server, base_url) döndür"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.state = StubState(latency)
+    thread = threading.Thread(target=server.serve_forever, name="StubServer", daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def backends_config(base_url, concurrency=4, rate=0):
+    """Stub sunucu için warranty_backends.json içeriği"""
+    return {name: {"url": f"{base_url}/{name}", "concurrency": concurrency, "rate": rate}
+            for name in ("recci", "kvk")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RecciTek/KVK stub API sunucusu")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=50, help="Cevap gecikmesi (ms)")
+    parser.add_argument("--write-config", metavar="PATH", help="Bu sunucu için backend ayar dosyası yaz")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.port, args.latency / 1000)
+    if args.write_config:
+        with open(args.write_config, "w", encoding="utf-8") as f:
+            json.dump(backends_config(base_url), f, indent=2)
+    print(f"Stub API: {base_url}/recci , {base_url}/kvk (Ctrl+C ile durdur)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""Birden çok uygulama ve iş istasyonu için paylaşılan önbellek servisi.
+
+    python cacheService.py --port 8766 --write-config cache_service.json
+    python cacheService.py --host 0.0.0.0 --token GIZLI     # ağdaki diğer masalar için
+
+Servis kendi SQLite deposunu (WAL, synchronous=FULL) tek yazan olarak tutar; çökme
+veya elektrik kesintisinde yarım yazılmış kayıt kalmaz. JSON üzerinden HTTP:
+
+    POST /get      {"serials": [...]}                      -> {"entries": {serial: kayıt}}
+    POST /put      {"entries": [[serial, result, zaman]]}  -> {"stored": n, "seq": s}
+    GET  /changes?since=s&wait=25                          -> {"seq": s, "entries": [...]}
+    GET  /health                                           -> {"seq": s, "count": n}
+
+/changes uzun yoklamadır (long poll): yeni kayıt yoksa `wait` saniyeye kadar bekler.
+
+İstemci tarafı (SharedCache) WarrantyStore'un önbellek arayüzünü sunar ve her sonucu
+yerel depoya da yazar; servis ulaşılamazsa yerel depoyla çalışmaya devam eder, servis
+geri geldiğinde arada yazılanları gönderir. cache_service.json yoksa servis kullanılmaz:
+
+    {"url": "http://127.0.0.1:8766", "token": ""}
+"""
+
+import argparse
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from perfMetrics import metrics
+from warrantyClient import ConnectionPool
+from warrantyStore import CachePolicy, WarrantyStore
+
+logger = logging.getLogger("garanti")
+
+SERVICE_CONFIG_FILE = "cache_service.json"
+SERVICE_DB_FILE = "shared_cache.db"
+DEFAULT_PORT = 8766
+
+TOKEN_HEADER = "X-Cache-Token"
+MAX_WAIT = 30.0  # /changes uzun yoklamasının üst sınırı (saniye)
+MAX_BATCH = 5000  # tek /get veya /put isteğindeki kayıt sınırı
+
+
+class CacheServiceError(Exception):
+    """Servise ulaşılamadı veya anlaşılmaz cevap verdi"""
+
+
+# --- servis ---
+
+class CacheService:
+    """Paylaşılan depo ve değişiklik bildirimi (HTTP katmanından bağımsız)"""
+
+    CHANGES_LIMIT = 1000
+
+    def __init__(self, store, token=None):
+        self.store = store
+        self.token = token or ""
+        self._changed = threading.Condition()
+        self._generation = 0  # her put'ta artar; bekleyen yoklama kaçırılan bildirimi anlar
+
+    def get(self, serials):
+        return self.store.get_many(serials)
+
+    def put(self, entries):
+        # Bir istemcinin eski kopyası daha yeni sonucu ezmesin
+        stored = self.store.put_lookups(
+            ((serial, result, timestamp) for serial, result, timestamp in entries), newer_only=True
+        )
+        with self._changed:
+            self._generation += 1
+            self._changed.notify_all()
+        return stored
+
+    def changes(self, since, wait=0.0):
+        """since'ten sonra değişen kayıtlar; yoksa en fazla wait saniye yenisini bekle"""
+        deadline = time.monotonic() + min(max(wait, 0.0), MAX_WAIT)
+        while True:
+            with self._changed:
+                generation = self._generation
+            # Sorgu kilit dışında: put() bildirimi beklemez
+            rows = self.store.lookups_since(since, self.CHANGES_LIMIT)
+            remaining = deadline - time.monotonic()
+            if rows or remaining <= 0:
+                break
+            with self._changed:
+                if self._generation == generation:
+                    self._changed.wait(remaining)
+        # Servis deposu sıfırlandıysa (since > son seq) istemci baştan okusun
+        seq = rows[-1][0] if rows else min(max(since, 0), self.store.change_seq())
+        return seq, [(serial, result, timestamp) for _seq, serial, result, timestamp in rows]
+
+    def authorized(self, token):
+        return not self.token or hmac.compare_digest(token or "", self.token)
+
+
+class CacheServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Başlık ve gövde ayrı yazıldığından Nagle + gecikmeli ACK keep-alive'da ~40 ms ekler
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if not self._check_token():
+            return
+        service = self.server.service
+        parsed = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(parsed.query)
+        try:
+            if parsed.path == "/changes":
+                since = int(query.get("since", ["0"])[0])
+                wait = float(query.get("wait", ["0"])[0])
+                seq, entries = service.changes(since, wait)
+                return self._send(200, {"seq": seq, "entries": entries})
+            if parsed.path == "/health":
+                return self._send(200, {"seq": service.store.change_seq(),
+                                        "count": service.store.lookup_count()})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self._check_token():
+            return
+        service = self.server.service
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if self.path == "/get":
+                serials = body["serials"][:MAX_BATCH]
+                return self._send(200, {"entries": service.get(serials)})
+            if self.path == "/put":
+                entries = body["entries"][:MAX_BATCH]
+                stored = service.put(entries)
+                return self._send(200, {"stored": stored, "seq": service.store.change_seq()})
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            return self._send(400, {"error": str(e)})
+        except Exception as e:
+            logger.exception(f"Cache service error: {e}")
+            return self._send(500, {"error": str(e)})
+        self._send(404, {"error": "not found"})
+
+    def _check_token(self):
+        if self.server.service.authorized(self.headers.get(TOKEN_HEADER)):
+            return True
+        # Gövde okunmadan cevap verildiği için bağlantı kapatılır
+        self.close_connection = True
+        self._send(403, {"error": "invalid token"})
+        return False
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_cache_service(store, host="127.0.0.1", port=0, token=None):
+    """Servisi arka plan thread'inde başlat; (server, base_url) döndür"""
+    server = ThreadingHTTPServer((host, port), CacheServiceHandler)
+    server.daemon_threads = True
+    server.service = CacheService(store, token)
+    thread = threading.Thread(target=server.serve_forever, name="CacheService", daemon=True)
+    thread.start()
+    shown_host = "127.0.0.1" if host in ("", "0.0.0.0") else host
+    return server, f"http://{shown_host}:{server.server_address[1]}"
+
+
+# --- istemci ---
+
+class SharedCache:
+    """Paylaşılan servisi kullanan, ulaşılamazsa yerel depoya düşen önbellek.
+
+    WarrantyClient ve batchLookup için WarrantyStore yerine geçer (get_cached,
+    get_many, put_lookup, put_lookups, policy). Her sonuç yerel depoya da yazılır:
+    geçmiş penceresi yerel depodan okur ve servis kapalıyken de veri kaybolmaz.
+    Yerelde yazılıp servise henüz gitmemiş kayıtlar yerel değişiklik sıra
+    numarasıyla izlenir (meta: shared_pushed_seq) ve bağlantı gelince gönderilir.
+    """
+
+    RETRY_SECONDS = 30.0  # ulaşılamayınca servisin tekrar deneneceği süre
+    PUSH_BATCH = 500
+    LONG_POLL = 25.0
+
+    def __init__(self, url, store, token=None, timeout=2.0):
+        self.url = url.rstrip("/")
+        self.store = store
+        self.token = token or ""
+        self._pool = ConnectionPool(self.url, 4, timeout)
+        self._down_until = 0.0
+        self._push_lock = threading.Lock()
+        self._listeners = []
+        self._watch_thread = None
+        self._closing = threading.Event()
+
+    @property
+    def policy(self):
+        return self.store.policy
+
+    # --- okuma ---
+
+    def get_cached(self, serial):
+        """Servisteki (yoksa yereldeki) kayıt, get_cached() biçiminde"""
+        entry = self._get_remote([serial]).get(serial)
+        return entry if entry is not None else self.store.get_cached(serial)
+
+    def get_many(self, serials):
+        """Birden çok seri, servise MAX_BATCH'lik isteklerle; servis bilmiyorsa yerelden"""
+        serials = list(dict.fromkeys(serials))
+        found = {}
+        for start in range(0, len(serials), MAX_BATCH):
+            found.update(self._get_remote(serials[start:start + MAX_BATCH]))
+        missing = [serial for serial in serials if serial not in found]
+        if missing:
+            found.update(self.store.get_many(missing))
+        return found
+
+    def _get_remote(self, serials):
+        if not self.available():
+            return {}
+        try:
+            with metrics.span("shared_cache", op="get"):
+                entries = self._call("POST", "/get", {"serials": serials})["entries"]
+        except CacheServiceError:
+            return {}
+        if entries:
+            self._mirror([(serial, entry["result"], entry["timestamp"]) for serial, entry in entries.items()])
+        return entries
+
+    # --- yazma ---
+
+    def put_lookup(self, serial, result, timestamp=None):
+        self.put_lookups([(serial, result, timestamp or datetime.now())])
+
+    def put_lookups(self, entries):
+        """Önce yerel depoya yaz (kalıcı), sonra servise gönder"""
+        count = self.store.put_lookups(entries)
+        self.push()
+        return count
+
+    def push(self):
+        """Yerelde yazılıp servise gitmemiş kayıtları gönder; gönderilemezse sonra denenir"""
+        if not self.available():
+            return 0
+        pushed_total = 0
+        with self._push_lock:
+            pushed = int(self.store.get_meta("shared_pushed_seq", 0))
+            while True:
+                rows = self.store.lookups_since(pushed, self.PUSH_BATCH)
+                if not rows:
+                    break
+                try:
+                    with metrics.span("shared_cache", op="put"):
+                        self._call("POST", "/put", {"entries": [
+                            [serial, result, timestamp] for _seq, serial, result, timestamp in rows
+                        ]})
+                except CacheServiceError:
+                    break
+                pushed = rows[-1][0]
+                pushed_total += len(rows)
+                self.store.set_meta("shared_pushed_seq", pushed)
+        return pushed_total
+
+    def _mirror(self, entries):
+        """Servisten gelen kayıtları yerel depoya yaz; servise geri gönderilmezler"""
+        with self._push_lock:
+            before = self.store.change_seq()
+            self.store.put_lookups(entries, newer_only=True)
+            # Bekleyen yerel kayıt yoksa ilerletilir; varsa aradakiler bir kez geri gider (zararsız)
+            if int(self.store.get_meta("shared_pushed_seq", 0)) >= before:
+                self.store.set_meta("shared_pushed_seq", self.store.change_seq())
+
+    # --- bildirim ---
+
+    def watch(self, callback):
+        """Servise yeni kayıt gelince callback(serials) çağır (arka plan thread'inden).
+
+        Gelen kayıtlar önce yerel depoya yazılır; callback'te store.changes_since()
+        ile okunabilirler.
+        """
+        self._listeners.append(callback)
+        if self._watch_thread is None:
+            self._watch_thread = threading.Thread(target=self._watch_loop, name="SharedCacheWatch", daemon=True)
+            self._watch_thread.start()
+
+    def _watch_loop(self):
+        # Uzun yoklama ayrı bir bağlantıda, bekleme süresinden uzun zaman aşımıyla yapılır
+        pool = ConnectionPool(self.url, 1, self.LONG_POLL + 10)
+        while not self._closing.is_set():
+            if not self.available():
+                self._closing.wait(max(1.0, self._down_until - time.monotonic()))
+                continue
+            self.push()
+            since = int(self.store.get_meta("shared_remote_seq", 0))
+            try:
+                data = self._call("GET", f"/changes?since={since}&wait={self.LONG_POLL:g}", pool=pool)
+            except CacheServiceError:
+                continue
+            if data["entries"]:
+                self._mirror(data["entries"])
+            if data["seq"] != since:
+                self.store.set_meta("shared_remote_seq", data["seq"])
+            if not data["entries"]:
+                continue
+            serials = [serial for serial, _result, _timestamp in data["entries"]]
+            for callback in list(self._listeners):
+                try:
+                    callback(serials)
+                except Exception as e:
+                    logger.exception(f"Shared cache listener error: {e}")
+        pool.close()
+
+    # --- bağlantı ---
+
+    def available(self):
+        """Servis son hatadan bu yana RETRY_SECONDS geçmeden tekrar denenmez"""
+        return time.monotonic() >= self._down_until
+
+    def _call(self, method, path, body=None, pool=None):
+        headers = {TOKEN_HEADER: self.token} if self.token else {}
+        data = None
+        if body is not None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            headers["Content-Type"] = "application/json; charset=utf-8"
+        try:
+            status, payload = (pool or self._pool).request(method, path, data, headers)
+            if status != 200:
+                raise CacheServiceError(f"HTTP {status}")
+            result = json.loads(payload.decode("utf-8"))
+        except (CacheServiceError, OSError, ValueError) as e:
+            if self.available():
+                logger.warning(f"Paylaşılan önbelleğe ulaşılamadı ({self.url}): {e} - yerel depo kullanılıyor")
+            metrics.inc("shared_cache_errors")
+            self._down_until = time.monotonic() + self.RETRY_SECONDS
+            raise CacheServiceError(str(e)) from e
+        return result
+
+    def close(self):
+        self._closing.set()
+        self._pool.close()
+
+
+def load_service_config(path=SERVICE_CONFIG_FILE):
+    """cache_service.json'ı oku; dosya yoksa veya url yoksa None"""
+    try:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            if config.get("url"):
+                return config
+    except Exception as e:
+        logger.exception(f"Cache service config load error: {e}")
+    return None
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache(store=None, path=SERVICE_CONFIG_FILE):
+    """Ayarlıysa paylaşılan SharedCache örneği, değilse None"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            config = load_service_config(path)
+            if config is None:
+                return None
+            if store is None:
+                from warrantyStore import get_store
+                store = get_store()
+            _shared = SharedCache(config["url"], store, config.get("token"),
+                                  timeout=config.get("timeout", 2.0))
+        return _shared
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paylaşılan garanti önbelleği servisi")
+    parser.add_argument("--host", default="127.0.0.1", help="Dinlenecek adres (ağ için 0.0.0.0)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--db", default=SERVICE_DB_FILE, help="Servisin SQLite dosyası")
+    parser.add_argument("--token", default=os.environ.get("GARANTI_CACHE_TOKEN", ""),
+                        help="İstemcilerin göndermesi gereken anahtar (boş = kontrol yok)")
+    parser.add_argument("--write-config", metavar="PATH", help="Bu servis için istemci ayar dosyası yaz")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    if args.host not in ("127.0.0.1", "localhost") and not args.token:
+        logger.warning("Servis ağa açık ve anahtarsız: --token verilmesi önerilir")
+
+    store = WarrantyStore(args.db, CachePolicy.load(), durable=True)
+    server, base_url = start_cache_service(store, args.host, args.port, args.token)
+    if args.write_config:
+        with open(args.write_config, "w", encoding="utf-8") as f:
+            json.dump({"url": base_url, "token": args.token}, f, indent=2)
+    print(f"Paylaşılan önbellek: {base_url} ({store.lookup_count()} kayıt, Ctrl+C ile durdur)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
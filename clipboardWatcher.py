@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Panoya kopyalanan seri numaralarını olay tabanlı algılar.
+
+Sadece QClipboard.dataChanged sinyali dinlenir (yoklama yok). Peş peşe gelen
+değişiklikler DEBOUNCE_MS içinde tek okumaya indirgenir; okunan metin önce uzunluk
+ve karakter kümesiyle ucuzca elenir, regex sadece seriye benzeyen kısa metinlerde
+çalışır. Aynı seri kısa süre içinde tekrar kopyalanırsa ikinci kez bildirilmez.
+"""
+
+import logging
+import re
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+logger = logging.getLogger("garanti")
+
+# Test serileri: R58EBR33801764, R58VBR41200741, RCFVBY51101472, R35EBD32102855
+SERIAL_LENGTH = 14
+SERIAL_RE = re.compile(r'[A-Z][A-Z0-9]{13}')
+
+# Bundan uzun metinler hiç taranmaz (kod, log, tablo kopyalamaları)
+MAX_TEXT_LENGTH = 256
+
+
+class SerialFilter:
+    """Pano metninden seri çıkaran, Qt'den bağımsız süzgeç ve sayaçları"""
+
+    DUPLICATE_SECONDS = 3.0
+
+    def __init__(self, duplicate_seconds=None, clock=time.monotonic):
+        self.duplicate_seconds = self.DUPLICATE_SECONDS if duplicate_seconds is None else duplicate_seconds
+        self._clock = clock
+        self._last_serial = None
+        self._last_time = 0.0
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.seen = 0  # okunan pano metni
+        self.oversized = 0  # taranmadan atlanan uzun metin
+        self.filtered = 0  # uzunluk/karakter/regex ile elenen
+        self.duplicates = 0  # az önce bildirilen seri
+        self.looked_up = 0  # sorguya gönderilen seri
+
+    def check(self, text):
+        """Metin yeni bir seriyse seriyi, değilse None döndür"""
+        self.seen += 1
+        if not text:
+            self.filtered += 1
+            return None
+        if len(text) > MAX_TEXT_LENGTH:
+            self.oversized += 1
+            return None
+
+        candidate = text.strip()
+        # Ucuz eleme: uzunluk, ASCII harf/rakam (regex'ten önce, C seviyesinde)
+        if (len(candidate) != SERIAL_LENGTH or not candidate.isascii()
+                or not candidate.isalnum()):
+            self.filtered += 1
+            return None
+        candidate = candidate.upper()
+        if SERIAL_RE.fullmatch(candidate) is None:
+            self.filtered += 1
+            return None
+
+        now = self._clock()
+        if candidate == self._last_serial and now - self._last_time < self.duplicate_seconds:
+            self._last_time = now
+            self.duplicates += 1
+            return None
+        self._last_serial = candidate
+        self._last_time = now
+        self.looked_up += 1
+        return candidate
+
+    def counters(self):
+        return {
+            'seen': self.seen,
+            'oversized': self.oversized,
+            'filtered': self.filtered,
+            'duplicates': self.duplicates,
+            'looked_up': self.looked_up,
+        }
+
+
+class ClipboardWatcher(QObject):
+    """QClipboard.dataChanged'i dinler, yeni seri kopyalanınca serialDetected yayar"""
+
+    serialDetected = pyqtSignal(str)
+
+    DEBOUNCE_MS = 150
+
+    def __init__(self, clipboard, debounce_ms=None, text_source=None, parent=None):
+        super().__init__(parent)
+        self.clipboard = clipboard
+        self.filter = SerialFilter()
+        self.events = 0  # dataChanged sayısı (debounce öncesi)
+        # Test/benchmark için pano yerine metin kaynağı verilebilir
+        self._text_source = text_source or clipboard.text
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS if debounce_ms is None else debounce_ms)
+        self._timer.timeout.connect(self._read_clipboard)
+        clipboard.dataChanged.connect(self._on_data_changed)
+
+    def _on_data_changed(self):
+        self.events += 1
+        self._timer.start()  # her değişiklik pencereyi yeniden başlatır
+
+    def _read_clipboard(self):
+        try:
+            serial = self.filter.check(self._text_source())
+        except Exception as e:
+            logger.exception(f"Clipboard read error: {e}")
+            return
+        if serial is not None:
+            self.serialDetected.emit(serial)
+
+    def counters(self):
+        counters = self.filter.counters()
+        counters['events'] = self.events
+        return counters
+
+    def stop(self):
+        self._timer.stop()
+        try:
+            self.clipboard.dataChanged.disconnect(self._on_data_changed)
+        except TypeError:
+            pass
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""Geçmişin aylık, sıkıştırılmış ve değişmez arşiv parçaları.
+
+Aktif parça depodaki lookups tablosudur (son CachePolicy.active_months ay). Daha eski
+aylar bir kez, bütün halinde arşive taşınır ve bir daha değiştirilmez:
+
+    <depo>_archive/2026-07.jsonl.gz    satır başına [serial, status_color, timestamp, model, result]
+    <depo>_archive/2026-07.idx.json    {"count", "first", "last", "status", "bloom", ...}
+
+Satırlar en yeni üstte sıralıdır. İndeks küçüktür: sayılar, zaman aralığı ve seriler
+için Bloom filtresi (kayıt başına ~1.2 bayt); bir seri aranırken sadece filtresi
+"olabilir" diyen parçalar açılır. Parça dosyası önce yazılıp diske senkronlanır, indeks
+en son yazılır; indeksi olmayan parça yarım kalmış sayılır ve yok sayılır.
+
+Aynı aya sonradan kayıt düşerse (ör. taşıma yarıda kaldı, eski bir kayıt başka bir
+depodan geri geldi) ayın parçaları yeni kayıtlarla birleştirilip tek bir yeni parça
+(2026-07_2) olarak yazılır; her seri ayda bir kez, en yeni haliyle bulunur. Yeni
+parçanın indeksi yerini aldığı parçaları "replaces" altında listeler, bu yüzden eski
+parçalar silinmeden kesilse bile iki kez okunmazlar.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger("garanti")
+
+SEGMENT_SUFFIX = ".jsonl.gz"
+INDEX_SUFFIX = ".idx.json"
+
+
+class BloomFilter:
+    """Seri kümesi için sabit boyutlu olasılıksal üyelik testi (yanlış negatif yok)"""
+
+    BITS_PER_ITEM = 10  # ~%1 yanlış pozitif
+    HASHES = 7
+
+    def __init__(self, size_bits, data=None):
+        self.size = max(8, size_bits)
+        self._data = data if data is not None else bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def build(cls, items):
+        items = list(items)
+        bloom = cls(len(items) * cls.BITS_PER_ITEM)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    @staticmethod
+    def hashes(item):
+        """Öğenin iki temel özeti - filtre boyutundan bağımsız, parçalar arasında tekrar kullanılır"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def _positions(self, hashes):
+        h1, h2 = hashes
+        return [(h1 + i * h2) % self.size for i in range(self.HASHES)]
+
+    def add(self, item):
+        data = self._data
+        for position in self._positions(self.hashes(item)):
+            data[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, hashes):
+        data = self._data
+        return all(data[position >> 3] >> (position & 7) & 1 for position in self._positions(hashes))
+
+    def __contains__(self, item):
+        return self.might_contain(self.hashes(item))
+
+    def to_text(self):
+        return base64.b64encode(bytes(self._data)).decode('ascii')
+
+    @classmethod
+    def from_text(cls, size_bits, text):
+        return cls(size_bits, bytearray(base64.b64decode(text)))
+
+
+class Segment:
+    """Tek bir arşiv parçasının indeksi"""
+
+    __slots__ = ('key', 'month', 'count', 'first', 'last', 'status', 'bloom')
+
+    def __init__(self, key, index):
+        self.key = key
+        self.month = index['month']
+        self.count = index['count']
+        self.first = index['first']  # en eski kayıt zamanı
+        self.last = index['last']  # en yeni kayıt zamanı
+        self.status = index.get('status', {})
+        self.bloom = BloomFilter.from_text(index['bloom_bits'], index['bloom'])
+
+    def overlaps(self, since=None, until=None):
+        """since < zaman <= until aralığıyla kesişiyor mu"""
+        return (since is None or self.last > since) and (until is None or self.first <= until)
+
+
+def _fsync_write(path, write):
+    """Geçici dosyaya yaz, diske senkronla ve yerine taşı"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class HistoryArchive:
+    """Arşiv dizinindeki parçalar; indeksler bellekte, parça içerikleri istendiğinde okunur"""
+
+    # Son açılan birkaç parçanın seri -> satır eşlemesi tutulur (art arda aramalar için)
+    CACHED_SEGMENTS = 2
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._segments = None  # en yeni önce
+        self._cache = OrderedDict()  # key -> {serial: satır}
+
+    # --- indeks ---
+
+    def segments(self):
+        """Parçalar, en yeni önce"""
+        with self._lock:
+            if self._segments is None:
+                self._segments = self._load_indexes()
+            return list(self._segments)
+
+    def _load_indexes(self):
+        segments = []
+        if not os.path.isdir(self.directory):
+            return segments
+        replaced = set()
+        for name in os.listdir(self.directory):
+            if not name.endswith(INDEX_SUFFIX):
+                continue
+            key = name[:-len(INDEX_SUFFIX)]
+            if not os.path.exists(self._segment_path(key)):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                segments.append(Segment(key, index))
+                replaced.update(index.get('replaces', ()))
+            except Exception as e:
+                logger.exception(f"Archive index load error ({name}): {e}")
+        if replaced:
+            # Birleştirme, eski parçalar silinmeden kesilmiş
+            segments = [segment for segment in segments if segment.key not in replaced]
+            self._remove_segments(replaced)
+        segments.sort(key=lambda segment: (segment.last, segment.key), reverse=True)
+        return segments
+
+    def count(self):
+        return sum(segment.count for segment in self.segments())
+
+    def count_between(self, since=None, until=None):
+        """Aralıkla kesişen parçaların kayıt sayısı (kısmen kesişenler tam sayılır)"""
+        return sum(segment.count for segment in self.segments() if segment.overlaps(since, until))
+
+    def _segment_path(self, key):
+        return os.path.join(self.directory, key + SEGMENT_SUFFIX)
+
+    # --- okuma ---
+
+    def read(self, key):
+        """Parçanın satırları: [serial, status_color, timestamp, model, result], en yeni önce"""
+        return list(self._iter_segment(key))
+
+    def _iter_segment(self, key):
+        with gzip.open(self._segment_path(key), 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def history_rows(self, key):
+        """Geçmiş görünümü için (serial, status_color, timestamp, model) satırları, en yeni önce"""
+        return [(serial, status_color, timestamp, model or None)
+                for serial, status_color, timestamp, model, _result in self.read(key)]
+
+    def _serial_map(self, key):
+        with self._lock:
+            rows = self._cache.get(key)
+            if rows is not None:
+                self._cache.move_to_end(key)
+                return rows
+        rows = {row[0]: row for row in self.read(key)}
+        with self._lock:
+            self._cache[key] = rows
+            while len(self._cache) > self.CACHED_SEGMENTS:
+                self._cache.popitem(last=False)
+        return rows
+
+    def find(self, serial):
+        """Serinin en yeni arşiv satırı veya None"""
+        return self.find_many([serial]).get(serial)
+
+    def find_many(self, serials):
+        """{serial: en yeni arşiv satırı} - sadece Bloom filtresi uyan parçalar açılır"""
+        segments = self.segments()
+        if not segments:
+            return {}
+        remaining = {serial: BloomFilter.hashes(serial) for serial in serials}
+        found = {}
+        for segment in segments:
+            candidates = [serial for serial, hashes in remaining.items() if segment.bloom.might_contain(hashes)]
+            if not candidates:
+                continue
+            rows = self._serial_map(segment.key)
+            for serial in candidates:
+                row = rows.get(serial)
+                if row is not None:
+                    found[serial] = row
+                    del remaining[serial]
+            if not remaining:
+                break
+        return found
+
+    def iter_rows(self, since=None, until=None):
+        """since < zaman <= until aralığındaki arşiv satırları, en yeni parça önce"""
+        for segment in self.segments():
+            if not segment.overlaps(since, until):
+                continue
+            for row in self._iter_segment(segment.key):
+                timestamp = row[2]
+                if (since is None or timestamp > since) and (until is None or timestamp <= until):
+                    yield row
+
+    # --- yazma ---
+
+    def write_segment(self, month, rows):
+        """(serial, status_color, timestamp, model, result metni) satırlarını ayın arşivine yaz.
+
+        Ayın parçası yoksa yeni parça yazılır. Varsa satırlar mevcut parçalarla
+        birleştirilir (seri başına en yeni satır kalır) ve ayın parçalarının yerini
+        alan tek bir parça yazılır; aynı satırları tekrar yazmak arşivi değiştirmez.
+        """
+        rows = {row[0]: [row[0], row[1], row[2], row[3], json.loads(row[4])] for row in rows}
+        if not rows:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            replaces = [segment.key for segment in self.segments() if segment.month == month]
+            for key in replaces:
+                for row in self._iter_segment(key):
+                    current = rows.get(row[0])
+                    if current is None or current[2] < row[2]:
+                        rows[row[0]] = row
+            rows = sorted(rows.values(), key=lambda row: -row[2])
+            key = self._new_key(month)
+
+            def write_lines(f):
+                with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=6) as gz:
+                    for row in rows:
+                        gz.write(json.dumps(row, ensure_ascii=False).encode('utf-8') + b"\n")
+
+            _fsync_write(self._segment_path(key), write_lines)
+
+            status = {}
+            for row in rows:
+                status[row[1]] = status.get(row[1], 0) + 1
+            bloom = BloomFilter.build(row[0] for row in rows)
+            index = {
+                'month': month,
+                'count': len(rows),
+                'first': rows[-1][2],
+                'last': rows[0][2],
+                'status': status,
+                'bloom_bits': bloom.size,
+                'bloom': bloom.to_text(),
+            }
+            if replaces:
+                index['replaces'] = replaces
+            # İndeks yazıldığı an parça geçerli olur (ve yerini aldığı parçalar geçersiz)
+            _fsync_write(os.path.join(self.directory, key + INDEX_SUFFIX),
+                         lambda f: f.write(json.dumps(index).encode('utf-8')))
+            self._remove_segments(replaces)
+            self._segments = None
+        return key
+
+    def _remove_segments(self, keys):
+        """Parçaları sil - önce indeks, böylece yarım silinen parça da yok sayılır"""
+        for key in keys:
+            self._cache.pop(key, None)
+            for path in (os.path.join(self.directory, key + INDEX_SUFFIX), self._segment_path(key)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _new_key(self, month):
+        """Ayın kullanılmamış en büyük parça numarası - anahtarlar tekrar kullanılmaz,
+        böylece bir parça sadece kendinden önce yazılmış parçaların yerini alabilir"""
+        last = 0
+        for name in os.listdir(self.directory):
+            key = name.split('.', 1)[0]
+            base, _sep, part = key.partition('_')
+            if base == month:
+                last = max(last, int(part) if part.isdigit() else 1)
+        return month if last == 0 else f"{month}_{last + 1}"
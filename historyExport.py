@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+import csv
+import json
+import logging
+import os
+
+from perfMetrics import metrics
+from warrantyStore import history_record, status_label_text
+
+logger = logging.getLogger("garanti")
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+# CSV başlıkları (alan adı -> görünen başlık)
+CSV_HEADERS = {
+    'serial': 'Seri Numarası',
+    'model': 'Model',
+    'color': 'Durum',
+    'timestamp': 'Zaman',
+    'note': 'Not',
+    'raw': 'Ham Veri',
+}
+
+WATERMARK_KEY = 'export_watermark'
+
+
+class HistoryExport:
+    """Geçmişi depodan akış halinde CSV veya JSON Lines dosyasına yazar.
+
+    Satırlar tek tek okunup yazıldığı için bellek kullanımı kayıt sayısından
+    bağımsızdır. Dosya önce geçici isimle yazılır, başarıyla bitince yerine taşınır.
+    """
+
+    PROGRESS_EVERY = 1000
+
+    def __init__(self, store, path, fmt="csv", predicate=None, include_notes=True,
+                 include_raw=False, since_last_export=False):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Bilinmeyen dışa aktarım biçimi: {fmt}")
+        self.store = store
+        self.path = path
+        self.fmt = fmt
+        self.predicate = predicate  # Görünümdeki filtre, None = hepsi
+        self.include_notes = include_notes
+        self.include_raw = include_raw
+        self.since_last_export = since_last_export
+
+    def fieldnames(self):
+        fields = ['serial', 'model', 'color', 'timestamp']
+        if self.include_notes:
+            fields.append('note')
+        if self.include_raw:
+            fields.append('raw')
+        return fields
+
+    def iter_rows(self, since=None, until=None, progress=None, is_cancelled=None):
+        """Filtreden geçen satırları dışa aktarım sözlükleri olarak üret"""
+        total = self.store.count_between(since, until) if progress else 0
+        scanned = 0
+        for serial, status_color, timestamp, model, result, note in self.store.iter_export_rows(since, until):
+            scanned += 1
+            if scanned % self.PROGRESS_EVERY == 0:
+                if is_cancelled and is_cancelled():
+                    return
+                if progress:
+                    progress(scanned, total)
+
+            record = history_record((serial, status_color, timestamp, model))
+            if self.predicate is not None and not self.predicate(record):
+                continue
+
+            row = {
+                'serial': serial,
+                'model': record[3],
+                'color': status_label_text(status_color),
+                'timestamp': record[2].strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            if self.include_notes:
+                row['note'] = note or ''
+            if self.include_raw:
+                row['raw'] = result
+            yield row
+
+        if progress:
+            progress(scanned, total)
+
+    @metrics.timed("export")
+    def run(self, progress=None, is_cancelled=None):
+        """Dışa aktarımı yap, yazılan satır sayısını döndür (iptalde None)"""
+        until = self.store.max_timestamp()
+        since = None
+        if self.since_last_export:
+            watermark = self.store.get_meta(WATERMARK_KEY)
+            since = float(watermark) if watermark is not None else None
+
+        rows = self.iter_rows(since, until, progress, is_cancelled)
+        tmp_path = self.path + ".tmp"
+        try:
+            if self.fmt == "csv":
+                count = self._write_csv(tmp_path, rows)
+            else:
+                count = self._write_jsonl(tmp_path, rows)
+
+            if is_cancelled and is_cancelled():
+                os.remove(tmp_path)
+                return None
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        # Filtreli dışa aktarımda atlanan satırlar bir sonraki "son dışa aktarımdan beri"
+        # dışa aktarımda kaybolmasın diye işaret sadece filtresiz aktarımda ilerler
+        if self.predicate is None and until is not None:
+            self.store.set_meta(WATERMARK_KEY, until)
+        logger.info(f"{count} satır dışa aktarıldı: {self.path}")
+        return count
+
+    def _write_csv(self, path, rows):
+        count = 0
+        fieldnames = self.fieldnames()
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer.writerow({field: CSV_HEADERS[field] for field in fieldnames})
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def _write_jsonl(self, path, rows):
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for row in rows:
+                line = {
+                    'serial': row['serial'],
+                    'model': row['model'],
+                    'status': row['color'],
+                    'timestamp': row['timestamp'],
+                }
+                if self.include_notes:
+                    line['note'] = row['note']
+                if self.include_raw:
+                    line['result'] = json.loads(row['raw'])
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+                count += 1
+        return count
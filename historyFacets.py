@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""Geçmiş görünümü için yüzeyli (faceted) filtreler.
+
+Her yüzey değeri (durum, model, notlu) için satır başına bir bit tutan bit kümeleri
+(Python int) bir kez hesaplanır; filtre değişince sadece bu tamsayılar AND/OR'lanır.
+Tarih aralığı kayıtlar en yeni üstte sıralı olduğu için ikili aramayla bulunan
+ardışık bir bit aralığıdır. Sayaçlar bit_count() ile anında hesaplanır.
+"""
+
+from array import array
+from bisect import bisect_right
+
+STATUS_VALUES = ('green', 'blue', 'red')
+
+# Bayt değeri -> içindeki 1 bitlerinin konumları (bit kümesini satır listesine çevirmek için)
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+def status_facet(status_color):
+    """Durum rengini yüzey değerine çevir (bilinmeyenler DIŞI sayılır)"""
+    return status_color if status_color in ('green', 'blue') else 'red'
+
+
+def bits_to_rows(bits):
+    """Bit kümesindeki 1 bitlerinin konumları, artan sırada"""
+    rows = []
+    if not bits:
+        return rows
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    append = rows.append
+    for offset, value in enumerate(data):
+        if value:
+            base = offset * 8
+            for bit in _BYTE_BITS[value]:
+                append(base + bit)
+    return rows
+
+
+def bits_test(bits):
+    """Satırın bit kümesinde olup olmadığını O(1) söyleyen fonksiyon"""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    size = len(data)
+    return lambda row: row >> 3 < size and data[row >> 3] >> (row & 7) & 1
+
+
+class FacetQuery:
+    """Seçili yüzeyler; None olan yüzey filtrelemez.
+
+    statuses: {'green', 'blue', 'red'} alt kümesi
+    models: model adları kümesi
+    since/until: datetime aralığı (since <= zaman < until)
+    has_note: True = sadece notlular
+    mode: 'and' (tüm yüzeyler sağlanmalı) veya 'or' (herhangi biri yeter)
+    """
+
+    FACETS = ('status', 'model', 'date', 'note')
+
+    def __init__(self, statuses=None, models=None, since=None, until=None, has_note=None, mode='and'):
+        self.statuses = set(statuses) if statuses else None
+        self.models = set(models) if models else None
+        self.since = since
+        self.until = until
+        self.has_note = has_note or None
+        self.mode = mode
+
+    def active(self):
+        """Seçili yüzeylerin adları"""
+        active = []
+        if self.statuses is not None:
+            active.append('status')
+        if self.models is not None:
+            active.append('model')
+        if self.since is not None or self.until is not None:
+            active.append('date')
+        if self.has_note:
+            active.append('note')
+        return active
+
+    def is_empty(self):
+        return not self.active()
+
+    def predicate(self, notes):
+        """Aynı filtrenin kayıt bazlı hali (ilerlemeli yükleme ve dışa aktarım için)"""
+        checks = []
+        if self.statuses is not None:
+            statuses = self.statuses
+            checks.append(lambda record: status_facet(record[1]) in statuses)
+        if self.models is not None:
+            models = self.models
+            checks.append(lambda record: record[3] in models)
+        if self.since is not None or self.until is not None:
+            since, until = self.since, self.until
+            checks.append(lambda record: (since is None or record[2] >= since)
+                          and (until is None or record[2] < until))
+        if self.has_note:
+            checks.append(lambda record: bool(notes.get(record[0], '').strip()))
+        if not checks:
+            return None
+        if len(checks) == 1:
+            return checks[0]
+        if self.mode == 'or':
+            return lambda record: any(check(record) for check in checks)
+        return lambda record: all(check(record) for check in checks)
+
+
+class FacetIndex:
+    """Kayıt listesi üzerindeki yüzey bit kümeleri (bit i = i. satır)"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.size = 0
+        self._status = {value: 0 for value in STATUS_VALUES}
+        self._models = {}
+        self._note = 0
+        self._neg_times = array('q')  # -epoch, artan (kayıtlar en yeni üstte)
+
+    def build(self, records, notes):
+        """Tüm bit kümelerini (serial, status_color, epoch, model) kayıtlarından baştan oluştur"""
+        self.clear()
+        self.extend(records, notes)
+
+    def extend(self, records, notes):
+        """Listenin sonuna eklenen kayıtları indekse ekle (ilerlemeli yükleme)"""
+        records = records if isinstance(records, list) else list(records)
+        if not records:
+            return
+        start = self.size
+        count = len(records)
+        nbytes = (count + 7) // 8
+        status_bytes = {value: bytearray(nbytes) for value in STATUS_VALUES}
+        model_bytes = {}
+        note_bytes = bytearray(nbytes)
+        neg_times = self._neg_times
+
+        for i, (serial, status_color, epoch, model) in enumerate(records):
+            byte, bit = i >> 3, 1 << (i & 7)
+            status_bytes[status_facet(status_color)][byte] |= bit
+            buffer = model_bytes.get(model)
+            if buffer is None:
+                buffer = model_bytes[model] = bytearray(nbytes)
+            buffer[byte] |= bit
+            if serial in notes and notes[serial].strip():
+                note_bytes[byte] |= bit
+            neg_times.append(-int(epoch))
+
+        for value, buffer in status_bytes.items():
+            self._status[value] |= int.from_bytes(buffer, 'little') << start
+        for model, buffer in model_bytes.items():
+            self._models[model] = self._models.get(model, 0) | int.from_bytes(buffer, 'little') << start
+        self._note |= int.from_bytes(note_bytes, 'little') << start
+        self.size = start + count
+
+    def insert(self, row, record, has_note):
+        """row konumuna bir kayıt ekle; sonraki satırların bitleri bir kayar"""
+        serial, status_color, epoch, model = record
+        low = (1 << row) - 1
+        bit = 1 << row
+
+        def shifted(bits, selected):
+            bits = (bits & low) | (bits >> row << (row + 1))
+            return bits | bit if selected else bits
+
+        status = status_facet(status_color)
+        for value, bits in self._status.items():
+            self._status[value] = shifted(bits, value == status)
+        if model not in self._models:
+            self._models[model] = 0
+        for value, bits in self._models.items():
+            self._models[value] = shifted(bits, value == model)
+        self._note = shifted(self._note, has_note)
+        self._neg_times.insert(row, -int(epoch))
+        self.size += 1
+
+    def remove(self, row):
+        """row konumundaki kaydı çıkar; sonraki satırların bitleri bir geri kayar"""
+        low = (1 << row) - 1
+
+        def shifted(bits):
+            return (bits & low) | (bits >> (row + 1) << row)
+
+        for value, bits in self._status.items():
+            self._status[value] = shifted(bits)
+        for value, bits in list(self._models.items()):
+            bits = shifted(bits)
+            if bits:
+                self._models[value] = bits
+            else:
+                del self._models[value]
+        self._note = shifted(self._note)
+        del self._neg_times[row]
+        self.size -= 1
+
+    def set_note(self, row, has_note):
+        if row is None or row >= self.size:
+            return
+        if has_note:
+            self._note |= 1 << row
+        else:
+            self._note &= ~(1 << row)
+
+    def _all(self):
+        return (1 << self.size) - 1
+
+    def _date_bits(self, since, until):
+        # Kayıtlar en yeni üstte: until'den yeni olanlar başta, since'ten eskiler sonda
+        start = 0 if until is None else bisect_right(self._neg_times, -until.timestamp())
+        stop = self.size if since is None else bisect_right(self._neg_times, -since.timestamp())
+        if stop <= start:
+            return 0
+        return ((1 << stop) - 1) ^ ((1 << start) - 1)
+
+    def _facet_bits(self, query, facet):
+        if facet == 'status':
+            bits = 0
+            for value in query.statuses:
+                bits |= self._status.get(value, 0)
+            return bits
+        if facet == 'model':
+            bits = 0
+            for model in query.models:
+                bits |= self._models.get(model, 0)
+            return bits
+        if facet == 'date':
+            return self._date_bits(query.since, query.until)
+        return self._note
+
+    def mask(self, query, exclude=None):
+        """Sorguya uyan satırların bit kümesi; exclude verilen yüzey hesaba katılmaz"""
+        facets = [facet for facet in query.active() if facet != exclude]
+        if not facets:
+            return self._all()
+        if query.mode == 'or':
+            bits = 0
+            for facet in facets:
+                bits |= self._facet_bits(query, facet)
+            return bits
+        bits = self._all()
+        for facet in facets:
+            bits &= self._facet_bits(query, facet)
+        return bits
+
+    def counts(self, query):
+        """Her yüzey değeri seçilseydi kaç satır görünürdü.
+
+        VE kipinde bir yüzeyin sayıları diğer seçili yüzeylerle kesişimdir
+        (yüzey kendisiyle kısıtlanmaz); VEYA kipinde değerlerin toplam sayısıdır.
+        """
+        if query.mode == 'or':
+            masks = {facet: self._all() for facet in FacetQuery.FACETS}
+        else:
+            masks = {facet: self.mask(query, exclude=facet) for facet in FacetQuery.FACETS}
+        return {
+            'status': {value: (bits & masks['status']).bit_count() for value, bits in self._status.items()},
+            'model': {model: (bits & masks['model']).bit_count() for model, bits in self._models.items()},
+            'note': (self._note & masks['note']).bit_count(),
+            'total': self.mask(query).bit_count(),
+        }
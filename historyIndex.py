@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+import threading
+from array import array
+from bisect import bisect_left, insort
+
+from warrantyStore import MODEL_NOT_FOUND
+
+
+# Türkçe I/İ/ı farkları aramada eşleşmeyi bozmasın
+_FOLD_TABLE = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+
+
+def fold_text(text):
+    """Büyük/küçük harf ve Türkçe noktalı/noktasız i farkını yok say"""
+    return text.translate(_FOLD_TABLE).casefold()
+
+
+class SearchIndex:
+    """Geçmiş araması için bellek içi indeks (seri, model, not).
+
+    - Seri önekleri: sıralı seri dizisi üzerinde ikili arama
+    - Seri alt dizgileri: üçlü harf (trigram) -> seri kimliği listeleri (array)
+    - Modeller: sadeleştirilmiş model adı -> seri kimlikleri (model sayısı az)
+    - Notlar: seri -> katlanmış not metni (not sayısı az, doğrudan taranır)
+
+    Kayıtlar eklendikçe güncellenir; sorgu sonucu eşleşen serilerin kümesidir.
+    """
+
+    MIN_SUBSTRING = 3
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._notes = {}  # serial -> not (fold_text), kayıtlardan bağımsız
+        self._folded = {}  # model -> fold_text(model), tüm seriler aynı nesneyi paylaşır
+        self._reset()
+
+    def clear(self):
+        """Kayıtları temizle (notlar korunur)"""
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self._ids = {}  # serial -> kimlik (trigram listelerinde kullanılır)
+        self._serials = []  # kimlik -> serial
+        self._keys = []  # kimlik -> büyük harfli serial (çoğunlukla aynı nesne)
+        self._sorted = []  # büyük harfli seriler, önek araması için sıralı
+        self._odd_keys = {}  # büyük harfe çevrilince değişen seriler: büyük harfli -> serial
+        self._trigrams = {}  # trigram -> array('I') kimlikler
+        self._models = {}  # model (fold_text) -> set(serial)
+        self._model_of = {}  # serial -> model (fold_text)
+
+    def __len__(self):
+        return len(self._model_of)
+
+    def add_records(self, records):
+        """(serial, status_color, timestamp, model) kayıtlarını ekle veya güncelle (model None olabilir)"""
+        with self._lock:
+            new_keys = []
+            for record in records:
+                self._add(record[0], record[3], new_keys)
+            if len(new_keys) > 32:
+                # Toplu eklemede tek tek insort yerine bir kez sırala (timsort sıralı parçaları birleştirir)
+                self._sorted.extend(new_keys)
+                self._sorted.sort()
+            else:
+                for key in new_keys:
+                    insort(self._sorted, key)
+
+    def _add(self, serial, model, new_keys):
+        if serial not in self._ids:
+            # Seri metni sadece ilk eklemede indekslenir, seri hiç değişmez
+            ident = len(self._serials)
+            self._ids[serial] = ident
+            self._serials.append(serial)
+            key = serial.upper()
+            if key != serial:
+                self._odd_keys[key] = serial
+            else:
+                key = serial
+            self._keys.append(key)
+            new_keys.append(key)
+            for gram in {key[i:i + 3] for i in range(len(key) - 2)}:
+                postings = self._trigrams.get(gram)
+                if postings is None:
+                    postings = self._trigrams[gram] = array('I')
+                postings.append(ident)
+
+        model = model or MODEL_NOT_FOUND
+        folded = self._folded.get(model)
+        if folded is None:
+            folded = self._folded[model] = fold_text(model)
+        model = folded
+        old_model = self._model_of.get(serial)
+        if old_model == model:
+            return
+        if old_model is not None:
+            self._models[old_model].discard(serial)
+        self._models.setdefault(model, set()).add(serial)
+        self._model_of[serial] = model
+
+    def set_notes(self, notes):
+        """Tüm notları yeniden indeksle"""
+        with self._lock:
+            self._notes = {}
+            for serial, note in notes.items():
+                self._set_note(serial, note)
+
+    def set_note(self, serial, note):
+        with self._lock:
+            self._set_note(serial, note)
+
+    def _set_note(self, serial, note):
+        # Henüz geçmişte olmayan serinin notu da tutulur, kayıt gelince eşleşir
+        if note and note.strip():
+            self._notes[serial] = fold_text(note)
+        else:
+            self._notes.pop(serial, None)
+
+    def search(self, query):
+        """Sorguya uyan serilerin kümesi; boş sorguda None (filtre yok)"""
+        query = query.strip()
+        if not query:
+            return None
+        upper = query.upper()
+        folded = fold_text(query)
+
+        with self._lock:
+            matches = set()
+
+            if len(upper) < self.MIN_SUBSTRING:
+                # Kısa sorgu: sadece seri öneki
+                start = bisect_left(self._sorted, upper)
+                stop = bisect_left(self._sorted, upper + '\uffff')
+                matches.update(self._sorted[start:stop])
+                if self._odd_keys:
+                    for key in self._odd_keys.keys() & matches:
+                        matches.discard(key)
+                        matches.add(self._odd_keys[key])
+            else:
+                # Seri alt dizgisi (önekleri de kapsar): en seyrek trigramın listesi + doğrulama
+                candidates = self._trigram_candidates(upper)
+                serials = self._serials
+                if len(upper) == 3:
+                    matches.update(map(serials.__getitem__, candidates))
+                else:
+                    keys = self._keys
+                    matches.update(serials[ident] for ident in candidates if upper in keys[ident])
+
+            # Model adı
+            for model, model_serials in self._models.items():
+                if folded in model:
+                    matches |= model_serials
+
+            # Not metni
+            matches.update(serial for serial, note in self._notes.items() if folded in note)
+
+            return matches
+
+    def _trigram_candidates(self, upper):
+        """Sorgunun en seyrek trigramını içeren kimlikler (kesin eşleşme ayrıca doğrulanır)"""
+        smallest = None
+        for gram in {upper[i:i + 3] for i in range(len(upper) - 2)}:
+            found = self._trigrams.get(gram)
+            if found is None:
+                return ()
+            if smallest is None or len(found) < len(smallest):
+                smallest = found
+        return smallest
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Geçmiş kayıtları için sütunlu, kompakt bellek içi tablo.
+
+Kayıtlar satır nesnesi (demet, sözlük, widget) olarak değil, sütun dizilerinde tutulur:
+
+    seri          metin listesi, arama indeksiyle aynı nesneler      8 bayt (+~63 paylaşılmıyorsa)
+    durum         küçük tamsayı kodu (array('B'))                   1 bayt
+    zaman         epoch saniye (array('q'))                         8 bayt
+    model         tekil model adları tablosunda kod (array('H'))    2 bayt
+    sıra          satır -> kayıt kimliği, en yeni üstte (array('I')) 4 bayt
+    seri indeksi  açık adresli hash tablosu (array('i'))            8-16 bayt
+
+Kayıt başına ~40 bayt (seri metinleri hariç, ~100 dahil); bütçe MEMORY_BUDGET
+(1M kayıtta 150 bayt/kayıt, seri metinleri dahil).
+Durum ve model metinleri paylaşılan tek nesnelerdir. (serial, status_color,
+datetime, model) demeti ve görüntü metinleri sadece satır çizilirken veya bir
+filtre kaydı incelerken üretilir.
+
+Girdi depo satırlarıdır: (serial, status_color, epoch, model); model None ise
+MODEL_NOT_FOUND gösterilir. Zaman saniyeye yuvarlanır (görünüm saniye gösterir).
+"""
+
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from itertools import compress, count
+from operator import itemgetter
+
+from warrantyStore import MODEL_NOT_FOUND
+
+MEMORY_BUDGET = 150  # bayt/kayıt, 1M kayıtta (bkz. benchmarks/historyBench.py --table)
+
+_EMPTY = -1
+_DELETED = -2
+
+
+class HistoryTable:
+    """Zamana göre sıralı (en yeni üstte), seriyle O(1) aranabilen kayıt tablosu"""
+
+    MIN_SLOTS = 8
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # Kimlik (id) -> sütun değerleri; silinen kimlikler _free ile yeniden kullanılır
+        self._serials = []
+        self._status = array('B')
+        self._times = array('q')
+        self._models = array('H')
+        self._order = array('I')  # satır -> kimlik
+        self._sequential = True  # sadece sona ekleme yapıldı: satır == kimlik
+        self._free = []
+        self._slots = array('i', [_EMPTY]) * self.MIN_SLOTS  # hash(seri) -> kimlik
+        self._filled = 0  # dolu + silinmiş işaretli yuva sayısı
+        self._status_names = []
+        self._status_codes = {}
+        self._model_names = [MODEL_NOT_FOUND]
+        self._model_codes = {MODEL_NOT_FOUND: 0, None: 0, '': 0}
+
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self):
+        record = self._record
+        for ident in self._order:
+            yield record(ident)
+
+    # --- okuma ---
+
+    def record(self, row):
+        """(serial, status_color, datetime, model) - istendiğinde üretilir"""
+        return self._record(self._order[row])
+
+    def _record(self, ident):
+        return (
+            self._serials[ident],
+            self._status_names[self._status[ident]],
+            datetime.fromtimestamp(self._times[ident]),
+            self._model_names[self._models[ident]],
+        )
+
+    def raw(self, row):
+        """(serial, status_color, epoch, model) - datetime üretmeden"""
+        ident = self._order[row]
+        return (
+            self._serials[ident],
+            self._status_names[self._status[ident]],
+            self._times[ident],
+            self._model_names[self._models[ident]],
+        )
+
+    def iter_raw(self, start=0):
+        serials, status_names, model_names = self._serials, self._status_names, self._model_names
+        status, times, models = self._status, self._times, self._models
+        for ident in self._order[start:]:
+            yield (serials[ident], status_names[status[ident]], times[ident], model_names[models[ident]])
+
+    def serial(self, row):
+        return self._serials[self._order[row]]
+
+    def epoch(self, row):
+        return self._times[self._order[row]]
+
+    # --- konum ---
+
+    def position(self, epoch):
+        """epoch'lu yeni bir kaydın ekleneceği satır (aynı saniyedekilerin üstü)"""
+        times = self._times
+        return bisect_left(self._order, -int(epoch), key=lambda ident: -times[ident])
+
+    def find_row(self, serial):
+        ident = self._find_id(serial)
+        if ident is None:
+            return None
+        epoch = self._times[ident]
+        row = self.position(epoch)
+        order, times = self._order, self._times
+        while row < len(order) and times[order[row]] == epoch:
+            if order[row] == ident:
+                return row
+            row += 1
+        return None
+
+    def rows_of(self, serials):
+        """Verilen serilerin (küme) satırları, artan sırada - tarama C düzeyinde yapılır"""
+        # Silinmiş kimlikler de eşleşebilir, ama sıra dizisinde olmadıkları için elenirler
+        hits = compress(count(), map(serials.__contains__, self._serials))
+        if self._sequential:
+            return list(hits)
+        hits = set(hits)
+        return list(compress(count(), map(hits.__contains__, self._order)))
+
+    def __contains__(self, serial):
+        return self._find_id(serial) is not None
+
+    # --- yazma ---
+
+    def append(self, records):
+        """Mevcut kayıtlardan eski, sıralı bir parçayı sona ekle"""
+        if self._free:
+            self._sequential = False
+            for record in records:
+                self._order.append(self._store(record))
+            return
+
+        # Yeni kimlikler sırayla verilir: sütunlar satır satır değil, toplu genişletilir
+        self._reserve(len(records))
+        for name in set(map(itemgetter(1), records)):
+            self._status_code(name)
+        for name in set(map(itemgetter(3), records)):
+            self._model_code(name)
+        start = len(self._times)
+        self._serials.extend(map(itemgetter(0), records))
+        self._status.extend(map(self._status_codes.__getitem__, map(itemgetter(1), records)))
+        self._times.extend(map(int, map(itemgetter(2), records)))
+        self._models.extend(map(self._model_codes.__getitem__, map(itemgetter(3), records)))
+        self._order.extend(range(start, len(self._times)))
+        link = self._link
+        for ident, serial in enumerate(self._serials[start:], start):
+            link(serial, ident)
+
+    def insert(self, row, record):
+        """Kaydı row satırına ekle (row = position(epoch)); seri tabloda olmamalı"""
+        ident = self._store(record)
+        self._order.insert(row, ident)
+        self._sequential = self._sequential and row == ident
+
+    def remove_row(self, row):
+        ident = self._order[row]
+        del self._order[row]
+        self._unlink(ident)
+        self._free.append(ident)
+        self._sequential = False
+
+    def _store(self, record):
+        serial, status_color, epoch, model = record
+        status = self._status_code(status_color)
+        model_code = self._model_code(model)
+        self._reserve(1)
+        if self._free:
+            ident = self._free.pop()
+            self._serials[ident] = serial
+            self._status[ident] = status
+            self._times[ident] = int(epoch)
+            self._models[ident] = model_code
+        else:
+            ident = len(self._times)
+            self._serials.append(serial)
+            self._status.append(status)
+            self._times.append(int(epoch))
+            self._models.append(model_code)
+        self._link(serial, ident)
+        return ident
+
+    def _status_code(self, name):
+        code = self._status_codes.get(name)
+        if code is None:
+            code = self._status_codes[name] = len(self._status_names)
+            self._status_names.append(name)
+        return code
+
+    def _model_code(self, name):
+        code = self._model_codes.get(name)
+        if code is None:
+            code = self._model_codes[name] = len(self._model_names)
+            self._model_names.append(name)
+            if code > 0xFFFF and self._models.typecode == 'H':
+                self._models = array('I', self._models)
+        return code
+
+    # --- seri hash tablosu (doğrusal yoklama) ---
+
+    def _find_id(self, serial):
+        slots = self._slots
+        mask = len(slots) - 1
+        index = hash(serial) & mask
+        serials = self._serials
+        while True:
+            ident = slots[index]
+            if ident == _EMPTY:
+                return None
+            if ident >= 0 and serials[ident] == serial:
+                return ident
+            index = (index + 1) & mask
+
+    def _link(self, serial, ident):
+        slots = self._slots
+        mask = len(slots) - 1
+        index = hash(serial) & mask
+        while slots[index] >= 0:
+            index = (index + 1) & mask
+        if slots[index] == _EMPTY:
+            self._filled += 1
+        slots[index] = ident
+
+    def _unlink(self, ident):
+        slots = self._slots
+        mask = len(slots) - 1
+        index = hash(self._serials[ident]) & mask
+        while slots[index] != ident:
+            index = (index + 1) & mask
+        slots[index] = _DELETED
+
+    def _reserve(self, extra):
+        # Doluluk %50'yi geçmesin; büyütürken silinmiş işaretleri de temizlenir
+        if (self._filled + extra) * 2 > len(self._slots):
+            self._rehash(len(self._order) + extra)
+
+    def _rehash(self, entries):
+        size = self.MIN_SLOTS
+        while size < entries * 4:
+            size *= 2
+        self._slots = array('i', [_EMPTY]) * size
+        self._filled = 0
+        serials = self._serials
+        for ident in self._order:
+            self._link(serials[ident], ident)
+
+    # --- bellek ---
+
+    def nbytes(self):
+        """Sütunların ve hash tablosunun bayt cinsinden boyutu (seri ve tekil metinler hariç)"""
+        return (len(self._serials) * 8 + len(self._status) * self._status.itemsize
+                + len(self._times) * self._times.itemsize + len(self._models) * self._models.itemsize
+                + len(self._order) * self._order.itemsize + len(self._slots) * self._slots.itemsize)
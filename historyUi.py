@@ -1,39 +1,751 @@
 #!/usr/bin/env python3
 
 import logging
-import json
-import csv
 import os
-from datetime import datetime
-from pathlib import Path
+import time
+from array import array
+from datetime import datetime, timedelta
 
 from PyQt6 import QtCore, QtGui, QtWidgets
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import (
-    QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QFrame, QGraphicsDropShadowEffect,
-    QListWidget, QListWidgetItem, QScrollArea, QTextEdit
+    QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QFrame, QListView, QStyledItemDelegate
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    filename=str(Path.home() / "garanti.log"),
-    filemode="a",
-    format="%(asctime)s [%(levelname)s] %(message)s",
-)
+from appLogging import configure_logging
+from cacheService import get_shared_cache
+from historyFacets import FacetIndex, FacetQuery, bits_test, bits_to_rows
+from historyIndex import SearchIndex
+from historyTable import HistoryTable
+from noteStore import NoteStore
+from perfMetrics import metrics
+from warrantyStore import get_store, status_label_text
+
 logger = logging.getLogger("garanti")
 
 def log_info(msg: str):
     logger.info(msg)
 
+def log_debug(msg: str, *args):
+    # Argümanlar sadece DEBUG açıkken biçimlendirilir
+    logger.debug(msg, *args)
+
 def log_exc(msg: str):
     logger.exception(msg)
 
 
+# Durum rengi -> (rozet metni, rozet rengi)
+STATUS_STYLES = {
+    'green': ("RECCI", QColor(34, 197, 94, 204)),
+    'blue': ("KVK", QColor(59, 130, 246, 204)),
+}
+STATUS_DEFAULT = ("DIŞI", QColor(239, 68, 68, 204))
+
+# Tarih yüzeyi: (etiket, kaç gün öncesinin başından beri; None = hepsi)
+DATE_RANGES = (
+    ("Tüm zamanlar", None),
+    ("Bugün", 0),
+    ("Son 7 gün", 7),
+    ("Son 30 gün", 30),
+    ("Son 1 yıl", 365),
+)
+
+FACET_BUTTON_STYLE = """
+    QPushButton {
+        background-color: #e9ecef;
+        color: #333;
+        border: 1px solid #ced4da;
+        padding: 4px 8px;
+        border-radius: 4px;
+    }
+    QPushButton:checked {
+        background-color: #094771;
+        color: white;
+        border-color: #094771;
+    }
+"""
+
+
+class HistoryModel(QtCore.QAbstractTableModel):
+    """Geçmiş kayıtları için model - satırlar widget değil, hafif tuple olarak tutulur"""
+    COLUMNS = ("serial", "status", "timestamp", "model", "note")
+    HEADERS = ("Seri Numarası", "Durum", "Zaman", "Model", "Not")
+
+    RecordRole = Qt.ItemDataRole.UserRole + 1
+    NoteRole = Qt.ItemDataRole.UserRole + 2
+    StatusChangeRole = Qt.ItemDataRole.UserRole + 3
+
+    # Kullanıcı bir notu düzenlediğinde (serial, not)
+    noteEdited = QtCore.pyqtSignal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._table = HistoryTable()  # sütunlu kayıt tablosu, en yeni üstte
+        self._visible = None  # Filtreden geçen satırlar (array), None = hepsi
+        self._predicate = None
+        self._serials_filter = None
+        self._facet_query = None
+        self._facets = FacetIndex()  # yüzey bit kümeleri, kayıtlarla birlikte güncellenir
+        self._facets_valid = True
+        self._notes = {}
+        self._status_changes = {}  # serial -> (eski durum, yeni durum, zaman)
+
+    def set_notes(self, notes):
+        """Not sözlüğünü bağla (popup ile paylaşılır)"""
+        self._notes = notes
+        self._facets_valid = False  # "notlu" bitleri yeni sözlükten kurulmalı
+
+    def set_status_changes(self, changes):
+        """Durumu değişen kayıtları işaretle: {serial: (eski durum, yeni durum, zaman)}"""
+        if changes == self._status_changes:
+            return
+        self._status_changes = changes
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, len(self.COLUMNS) - 1))
+
+    def set_records(self, records):
+        """Tüm kayıtları değiştir - (serial, status_color, epoch, model) depo satırları, en yeni üstte"""
+        self.beginResetModel()
+        self._table.clear()
+        self._table.append(records)
+        self._facets.build(self._table.iter_raw(), self._notes)
+        self._facets_valid = True
+        self._apply_filter()
+        self.endResetModel()
+
+    def upsert_records(self, records):
+        """Yeni/değişen kayıtları sıralı konumlarına yerleştir, diğer satırlara dokunma"""
+        table = self._table
+        if self._visible is not None:
+            # Filtre açıkken satır konumları değişir, görünür listeyi tek seferde yenile
+            self.beginResetModel()
+            for record in records:
+                row = table.find_row(record[0])
+                if row is not None:
+                    self._remove_row(row)
+                self._insert_record(table.position(record[2]), record)
+            self._apply_filter()
+            self.endResetModel()
+            return
+
+        for record in records:
+            row = table.find_row(record[0])
+            if row is not None:
+                self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+                self._remove_row(row)
+                self.endRemoveRows()
+            row = table.position(record[2])
+            self.beginInsertRows(QtCore.QModelIndex(), row, row)
+            self._insert_record(row, record)
+            self.endInsertRows()
+
+    def _insert_record(self, row, record):
+        self._table.insert(row, record)
+        if self._facets_valid:
+            self._facets.insert(row, self._table.raw(row), bool(self._notes.get(record[0], '').strip()))
+
+    def _remove_row(self, row):
+        self._table.remove_row(row)
+        if self._facets_valid:
+            self._facets.remove(row)
+
+    def append_records(self, records):
+        """Sıralı bir parçayı listenin sonuna ekle (ilerlemeli yükleme)"""
+        if not records:
+            return
+        table = self._table
+        first = len(table)
+        if self._visible is None:
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(records) - 1)
+            table.append(records)
+            self.endInsertRows()
+        else:
+            table.append(records)
+            predicate = self.current_filter()
+            matches = [row for row in range(first, len(table)) if predicate(table.record(row))]
+            if matches:
+                row = len(self._visible)
+                self.beginInsertRows(QtCore.QModelIndex(), row, row + len(matches) - 1)
+                self._visible.extend(matches)
+                self.endInsertRows()
+        if self._facets_valid:
+            self._facets.extend(table.iter_raw(first), self._notes)
+
+    def merge_older(self, records):
+        """Arşivden sayfalanan kayıtları ekle - listede zaten olan seriler atlanır.
+
+        Listenin sonundan eski olanlar toplu eklenir, daha yeniler sıralı konumlarına
+        yerleşir. Eklenen kayıtları döndürür.
+        """
+        table = self._table
+        records = [record for record in records if record[0] not in table]
+        if not records:
+            return records
+        split = 0
+        if len(table):
+            tail = table.epoch(len(table) - 1)
+            while split < len(records) and int(records[split][2]) > tail:
+                split += 1
+        if split:
+            self.upsert_records(records[:split])
+        self.append_records(records[split:])
+        return records
+
+    def set_filter(self, predicate, serials=None, facets=None):
+        """Görünen satırları tek geçişte belirle, hepsi None ise hepsi görünür.
+
+        serials: görünebilecek serilerin kümesi (ör. arama sonucu). Küçükse tüm
+        listeyi taramak yerine sadece bu serilerin konumlarına hash tablosundan bakılır.
+        facets: FacetQuery; kayıtlar taranmaz, bit kümeleri birleştirilir.
+        """
+        self.beginResetModel()
+        self._predicate = predicate
+        self._serials_filter = serials
+        self._facet_query = None if facets is None or facets.is_empty() else facets
+        self._apply_filter()
+        self.endResetModel()
+
+    def facet_index(self):
+        """Güncel yüzey indeksi (notlar değiştiyse önce yeniden kurulur)"""
+        if not self._facets_valid:
+            self._facets.build(self._table.iter_raw(), self._notes)
+            self._facets_valid = True
+        return self._facets
+
+    def facet_counts(self, facets=None):
+        return self.facet_index().counts(facets or FacetQuery())
+
+    def note_changed(self, serial):
+        """Notu değişen kaydın "notlu" bitini güncelle"""
+        if self._facets_valid:
+            self._facets.set_note(self._table.find_row(serial), bool(self._notes.get(serial, '').strip()))
+
+    # Aday seri sayısı kayıtların bu oranından azsa konumları hash tablosundan bul
+    CANDIDATE_RATIO = 32
+
+    def _apply_filter(self):
+        predicate = self._predicate
+        serials = self._serials_filter
+        facets = self._facet_query
+        table = self._table
+        if predicate is None and serials is None and facets is None:
+            self._visible = None
+            return
+
+        mask = None if facets is None else self.facet_index().mask(facets)
+        if serials is None:
+            if mask is None:
+                rows = [i for i, record in enumerate(table) if predicate(record)]
+            else:
+                rows = bits_to_rows(mask)
+                if predicate is not None:
+                    rows = [row for row in rows if predicate(table.record(row))]
+            self._visible = array('I', rows)
+            return
+
+        if len(serials) * self.CANDIDATE_RATIO < len(table):
+            rows = sorted(row for row in map(table.find_row, serials) if row is not None)
+        else:
+            rows = table.rows_of(serials)
+        if mask is not None:
+            in_mask = bits_test(mask)
+            rows = [row for row in rows if in_mask(row)]
+        if predicate is not None:
+            rows = [row for row in rows if predicate(table.record(row))]
+        self._visible = array('I', rows)
+
+    def current_filter(self):
+        """Aktif filtre tek bir koşul olarak, filtre yoksa None"""
+        serials = self._serials_filter
+        checks = [check for check in (
+            self._predicate,
+            None if serials is None else lambda record: record[0] in serials,
+            None if self._facet_query is None else self._facet_query.predicate(self._notes),
+        ) if check is not None]
+        if not checks:
+            return None
+        if len(checks) == 1:
+            return checks[0]
+        return lambda record: all(check(record) for check in checks)
+
+    def total_count(self):
+        return len(self._table)
+
+    def contains(self, serial):
+        return serial in self._table
+
+    def all_records(self):
+        """Filtreden bağımsız tüm kayıtlar"""
+        return iter(self._table)
+
+    def record(self, row):
+        if self._visible is None:
+            return self._table.record(row)
+        return self._table.record(self._visible[row])
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._table) if self._visible is None else len(self._visible)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self.rowCount():
+            return None
+        serial, status_color, timestamp, model_info = self.record(index.row())
+
+        if role == self.RecordRole:
+            return (serial, status_color, timestamp, model_info)
+        if role == self.NoteRole:
+            return self._notes.get(serial, '')
+        if role == self.StatusChangeRole:
+            return self._status_changes.get(serial)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            change = self._status_changes.get(serial)
+            if change is None:
+                return None
+            old_status, _new_status, changed_at = change
+            return (f"Durum değişti: {status_label_text(old_status)} → {status_label_text(status_color)} "
+                    f"({datetime.fromtimestamp(changed_at).strftime('%d.%m.%Y %H:%M')})")
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            column = self.COLUMNS[index.column()]
+            if column == "serial":
+                return serial
+            if column == "status":
+                return status_label_text(status_color)
+            if column == "timestamp":
+                return timestamp.strftime('%d.%m.%Y %H:%M:%S')
+            if column == "model":
+                return model_info
+            return self._notes.get(serial, '')
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role not in (self.NoteRole, Qt.ItemDataRole.EditRole):
+            return False
+        serial = self.record(index.row())[0]
+        self.noteEdited.emit(serial, value)
+        self.dataChanged.emit(index.siblingAtColumn(0), index.siblingAtColumn(len(self.COLUMNS) - 1))
+        return True
+
+
+class HistoryItemDelegate(QStyledItemDelegate):
+    """Geçmiş satırını çizer; not editörü sadece düzenleme istendiğinde oluşturulur"""
+    ROW_HEIGHT = 84
+    CHANGE_COLOR = QColor(245, 158, 11, 220)
+    NOTE_PLACEHOLDER = "Bu cihaz için not ekleyin..."
+    NOTE_EDITOR_STYLE = """
+        QLineEdit {
+            background-color: rgba(255, 255, 255, 0.9);
+            color: #333;
+            border: 1px solid #ccc;
+            border-radius: 4px;
+            padding: 4px 8px;
+            font-size: 10px;
+            font-family: 'JetBrains Mono', monospace;
+        }
+        QLineEdit:focus {
+            border: 1px solid #094771;
+            background-color: white;
+        }
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Fontlar bir kez oluşturulur, her satırda tekrar kullanılır
+        self.serial_font = self._mono_font(12, bold=True)
+        self.badge_font = self._mono_font(10, bold=True)
+        self.time_font = self._mono_font(10)
+        self.model_font = self._mono_font(11)
+        self.note_label_font = QtGui.QFont()
+        self.note_label_font.setPixelSize(10)
+        self.note_label_font.setBold(True)
+        self.note_font = self._mono_font(10)
+
+    @staticmethod
+    def _mono_font(pixel_size, bold=False):
+        font = QtGui.QFont("JetBrains Mono")
+        font.setStyleHint(QtGui.QFont.StyleHint.Monospace)
+        font.setPixelSize(pixel_size)
+        font.setBold(bold)
+        return font
+
+    def sizeHint(self, option, index):
+        return QtCore.QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def _card_rect(self, rect):
+        return rect.adjusted(2, 2, -2, -2)
+
+    def note_rect(self, rect):
+        """Not kutusunun satır içindeki konumu"""
+        card = self._card_rect(rect)
+        label_width = QtGui.QFontMetrics(self.note_label_font).horizontalAdvance("📝 Not:") + 8
+        return QtCore.QRect(card.left() + 10 + label_width, card.top() + 52,
+                            card.width() - 20 - label_width, 24)
+
+    def paint(self, painter, option, index):
+        record = index.data(HistoryModel.RecordRole)
+        if record is None:
+            return
+        serial, status_color, timestamp, model_info = record
+        note = index.data(HistoryModel.NoteRole) or ''
+        badge_text, badge_color = STATUS_STYLES.get(status_color, STATUS_DEFAULT)
+
+        painter.save()
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+
+        # Kart arka planı
+        card = self._card_rect(option.rect)
+        background = QColor(255, 255, 255, 26)
+        if option.state & QtWidgets.QStyle.StateFlag.State_Selected:
+            background = QColor(9, 71, 113, 90)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(background)
+        painter.drawRoundedRect(QtCore.QRectF(card), 8, 8)
+
+        # Üst satır: Seri numarası, durum rozeti, zaman
+        x = card.left() + 10
+        top = card.top() + 6
+        serial_text = f"Seri: {serial}"
+        painter.setFont(self.serial_font)
+        painter.setPen(QColor("white"))
+        width = QtGui.QFontMetrics(self.serial_font).horizontalAdvance(serial_text)
+        painter.drawText(QtCore.QRect(x, top, width, 20), Qt.AlignmentFlag.AlignVCenter, serial_text)
+        x += width + 8
+
+        badge_width = QtGui.QFontMetrics(self.badge_font).horizontalAdvance(badge_text) + 12
+        badge_rect = QtCore.QRect(x, top + 2, badge_width, 16)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(badge_color)
+        painter.drawRoundedRect(QtCore.QRectF(badge_rect), 4, 4)
+        painter.setFont(self.badge_font)
+        painter.setPen(QColor("white"))
+        painter.drawText(badge_rect, Qt.AlignmentFlag.AlignCenter, badge_text)
+        x += badge_width + 8
+
+        # Yeniden doğrulamada durumu değiştiyse önceki durum
+        change = index.data(HistoryModel.StatusChangeRole)
+        if change is not None:
+            change_text = f"↻ önce {STATUS_STYLES.get(change[0], STATUS_DEFAULT)[0]}"
+            change_width = QtGui.QFontMetrics(self.badge_font).horizontalAdvance(change_text) + 12
+            change_rect = QtCore.QRect(x, top + 2, change_width, 16)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self.CHANGE_COLOR)
+            painter.drawRoundedRect(QtCore.QRectF(change_rect), 4, 4)
+            painter.setPen(QColor("white"))
+            painter.drawText(change_rect, Qt.AlignmentFlag.AlignCenter, change_text)
+            x += change_width + 8
+
+        painter.setFont(self.time_font)
+        painter.setPen(QColor(255, 255, 255, 178))
+        painter.drawText(QtCore.QRect(x, top, card.right() - x, 20), Qt.AlignmentFlag.AlignVCenter,
+                         timestamp.strftime('%d.%m.%Y %H:%M:%S'))
+
+        # Orta satır: Model bilgisi
+        painter.setFont(self.model_font)
+        painter.setPen(QColor(255, 255, 255, 204))
+        painter.drawText(QtCore.QRect(card.left() + 10, card.top() + 28, card.width() - 20, 20),
+                         Qt.AlignmentFlag.AlignVCenter, f"Model: {model_info}")
+
+        # Alt satır: Not etiketi ve not kutusu
+        note_rect = self.note_rect(option.rect)
+        painter.setFont(self.note_label_font)
+        painter.drawText(QtCore.QRect(card.left() + 10, note_rect.top(), note_rect.left() - card.left() - 10,
+                                      note_rect.height()), Qt.AlignmentFlag.AlignVCenter, "📝 Not:")
+
+        painter.setPen(QColor("#ccc"))
+        painter.setBrush(QColor(255, 255, 255, 230))
+        painter.drawRoundedRect(QtCore.QRectF(note_rect), 4, 4)
+        painter.setFont(self.note_font)
+        painter.setPen(QColor("#333") if note else QColor("#999"))
+        painter.drawText(note_rect.adjusted(8, 0, -8, 0), Qt.AlignmentFlag.AlignVCenter,
+                         note if note else self.NOTE_PLACEHOLDER)
+
+        painter.restore()
+
+    def createEditor(self, parent, option, index):
+        editor = QtWidgets.QLineEdit(parent)
+        editor.setPlaceholderText(self.NOTE_PLACEHOLDER)
+        editor.setStyleSheet(self.NOTE_EDITOR_STYLE)
+        # Text değiştiğinde notu kaydet
+        editor.textChanged.connect(lambda _text, e=editor: self.commitData.emit(e))
+        return editor
+
+    def setEditorData(self, editor, index):
+        # Kaydedilen not kırpılmış halde; yazılan boşlukları ezme
+        note = index.data(HistoryModel.NoteRole) or ''
+        if editor.text().strip() != note:
+            editor.setText(note)
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.text(), HistoryModel.NoteRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(self.note_rect(option.rect))
+
+
+class DailyChart(QWidget):
+    """Günlük sorgu sayılarını durumlara göre yığılmış çubuklarla çizer"""
+    BAR_COLORS = (('green', QColor(34, 197, 94)), ('blue', QColor(59, 130, 246)), (None, QColor(239, 68, 68)))
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(80)
+        self._daily = []
+
+    def set_daily(self, daily):
+        self._daily = daily
+        self.update()
+
+    def paintEvent(self, event):
+        if not self._daily:
+            return
+        painter = QtGui.QPainter(self)
+        font = painter.font()
+        font.setPixelSize(9)
+        painter.setFont(font)
+
+        label_height = 12
+        chart_height = self.height() - label_height - 2
+        slot = self.width() / len(self._daily)
+        peak = max(sum(counts.values()) for _, counts in self._daily) or 1
+
+        for i, (day, counts) in enumerate(self._daily):
+            x = int(i * slot + slot * 0.15)
+            width = max(int(slot * 0.7), 1)
+            bottom = chart_height
+            for status_color, color in self.BAR_COLORS:
+                if status_color is None:
+                    value = sum(v for k, v in counts.items() if k not in ('green', 'blue'))
+                else:
+                    value = counts.get(status_color, 0)
+                height = int(value / peak * (chart_height - 4))
+                if height:
+                    painter.fillRect(x, bottom - height, width, height, color)
+                    bottom -= height
+
+            painter.setPen(QColor("#666"))
+            painter.drawText(QtCore.QRect(int(i * slot), chart_height + 2, int(slot), label_height),
+                             Qt.AlignmentFlag.AlignCenter, day[8:10] + "." + day[5:7])
+        painter.end()
+
+
+class StatsDashboard(QFrame):
+    """Günlük sorgu eğilimi, garanti dışı oranı ve en çok sorgulanan modeller.
+
+    Veriler depodaki hazır sayaçlardan gelir; önbellek hiç taranmaz.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("statsDashboard")
+        self.setStyleSheet("#statsDashboard { background-color: rgba(0, 0, 0, 0.04); border-radius: 6px; }")
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 6, 8, 6)
+        layout.setSpacing(4)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setStyleSheet("font-size: 11px; color: #444;")
+        layout.addWidget(self.summary_label)
+
+        self.chart = DailyChart()
+        layout.addWidget(self.chart)
+
+        self.models_label = QLabel("")
+        self.models_label.setStyleSheet("font-size: 10px; color: #666;")
+        layout.addWidget(self.models_label)
+
+    def set_stats(self, stats):
+        daily = stats['daily']
+        total = sum(sum(counts.values()) for _, counts in daily)
+        out_of_warranty = sum(
+            count for _, counts in daily for status_color, count in counts.items()
+            if status_color not in ('green', 'blue')
+        )
+        share = (out_of_warranty / total * 100) if total else 0
+        self.summary_label.setText(
+            f"Son {len(daily)} gün: {total} sorgu | Garanti dışı oranı: %{share:.1f}"
+        )
+        self.chart.set_daily(daily)
+        self.models_label.setText("En çok sorgulanan: " + ", ".join(
+            f"{model} ({total_count}, dışı %{out / total_count * 100:.0f})"
+            for model, total_count, out in stats['models']
+        ))
+
+
+class HistoryLoadSignals(QtCore.QObject):
+    started = QtCore.pyqtSignal(int)  # Tam yükleme başladı, toplam satır
+    batch = QtCore.pyqtSignal(object)  # Sıralı kayıt parçası
+    changes = QtCore.pyqtSignal(object, int)  # Değişen kayıtlar, depodaki toplam satır
+    finished = QtCore.pyqtSignal(int, object)  # Değişiklik sıra numarası, istatistik görüntüsü
+    failed = QtCore.pyqtSignal(str)
+
+
+class HistoryLoader(QtCore.QRunnable):
+    """Geçmişi GUI thread'i dışında okur, kayıtları hazırlayıp parça parça gönderir"""
+    BATCH_SIZE = 2000
+    # Durum değişikliği işaretleri bu kadar gün gösterilir
+    STATUS_CHANGE_DAYS = 14
+
+    def __init__(self, store, search_index, loaded_seq=None, incremental_limit=500):
+        super().__init__()
+        self.signals = HistoryLoadSignals()
+        self.store = store
+        self.search_index = search_index
+        self.loaded_seq = loaded_seq
+        self.incremental_limit = incremental_limit
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            # app.py'nin JSON önbelleğine yazdığı yeni kayıtları depoya al, aktif
+            # dönemden eski ayları arşive taşı (ay dönümünde bir kez iş yapar)
+            self.store.import_json_cache()
+            self.store.roll_over()
+            if self._cancelled:
+                return
+
+            seq = self.store.change_seq()
+            if self.loaded_seq is not None:
+                if seq == self.loaded_seq:
+                    self.signals.finished.emit(seq, None)
+                    return
+                changes = self.store.changes_since(self.loaded_seq)
+                if len(changes) <= self.incremental_limit:
+                    self.search_index.add_records(changes)
+                    self.signals.changes.emit(changes, self.store.lookup_count())
+                    self.signals.finished.emit(seq, self._snapshot())
+                    return
+
+            self.search_index.clear()
+            self.signals.started.emit(self.store.lookup_count())
+            for rows in self.store.iter_history_batches(self.BATCH_SIZE):
+                if self._cancelled:
+                    return
+                # Arama indeksi de parça parça, bu thread'de güncellenir; depo satırları
+                # olduğu gibi gönderilir, görünüm bunları sütunlu tabloya yazar
+                self.search_index.add_records(rows)
+                self.signals.batch.emit(rows)
+            self.signals.finished.emit(seq, self._snapshot())
+
+        except Exception as e:
+            log_exc(f"History load error: {e}")
+            self.signals.failed.emit(str(e))
+
+    def _snapshot(self):
+        """İstatistikler ve son STATUS_CHANGE_DAYS gündeki durum değişiklikleri"""
+        stats = self.store.stats_snapshot()
+        since = (datetime.now() - timedelta(days=self.STATUS_CHANGE_DAYS)).timestamp()
+        stats['status_changes'] = self.store.status_changes(since)
+        return stats
+
+
+class ArchivePageSignals(QtCore.QObject):
+    loaded = QtCore.pyqtSignal(str, object)  # Parça anahtarı, kayıtlar (en yeni üstte)
+    failed = QtCore.pyqtSignal(str)
+
+
+class ArchivePageLoader(QtCore.QRunnable):
+    """Bir arşiv parçasını GUI thread'i dışında açıp geçmiş satırlarına çevirir"""
+
+    def __init__(self, archive, key):
+        super().__init__()
+        self.signals = ArchivePageSignals()
+        self.archive = archive
+        self.key = key
+
+    def run(self):
+        try:
+            self.signals.loaded.emit(self.key, self.archive.history_rows(self.key))
+        except Exception as e:
+            log_exc(f"Archive page load error ({self.key}): {e}")
+            self.signals.failed.emit(str(e))
+
+
+class ExportSignals(QtCore.QObject):
+    progress = QtCore.pyqtSignal(int, int)  # Taranan satır, toplam satır
+    finished = QtCore.pyqtSignal(object)  # Yazılan satır sayısı, iptalde None
+    failed = QtCore.pyqtSignal(str)
+
+
+class HistoryExporter(QtCore.QRunnable):
+    """HistoryExport'u GUI thread'i dışında çalıştırır"""
+
+    def __init__(self, export):
+        super().__init__()
+        self.signals = ExportSignals()
+        self.export = export
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            count = self.export.run(progress=self.signals.progress.emit,
+                                    is_cancelled=lambda: self._cancelled)
+            self.signals.finished.emit(count)
+        except Exception as e:
+            log_exc(f"Export error: {e}")
+            self.signals.failed.emit(str(e))
+
+
+class ExportOptionsDialog(QtWidgets.QDialog):
+    """Dışa aktarım seçenekleri"""
+
+    def __init__(self, filtered=False, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Dışa Aktar")
+
+        layout = QVBoxLayout(self)
+        if filtered:
+            info = QLabel("Aktif filtre dışa aktarıma uygulanacak.")
+            info.setStyleSheet("color: #666;")
+            layout.addWidget(info)
+
+        self.notes_check = QtWidgets.QCheckBox("Notları dahil et")
+        self.notes_check.setChecked(True)
+        layout.addWidget(self.notes_check)
+
+        self.raw_check = QtWidgets.QCheckBox("Ham API alanlarını dahil et")
+        layout.addWidget(self.raw_check)
+
+        self.since_check = QtWidgets.QCheckBox("Sadece son dışa aktarımdan sonraki sorgular")
+        layout.addWidget(self.since_check)
+
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Ok | QtWidgets.QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+
 class HistoryPopup(QWidget):
     """Geçmiş sorgular için basit ve stabil pencere"""
+    # Depoya pencere dışından kayıt yazıldı: paylaşılan önbellek, arka plan doğrulama
+    # (arka plan thread'lerinden yayılır; yuva GUI thread'inde çalışır)
+    storeChanged = QtCore.pyqtSignal(object)
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        configure_logging()
 
         # Basit pencere ayarları - crash riski olmadan
         self.setWindowTitle("Geçmiş Sorgular")
@@ -66,20 +778,81 @@ class HistoryPopup(QWidget):
         self.stats_label.setStyleSheet("font-size: 12px; color: #666; padding: 5px;")
         main_layout.addWidget(self.stats_label)
 
-        # Liste için scroll area
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-
-        # Liste widget'ı
-        self.list_widget = QWidget()
-        self.list_layout = QVBoxLayout(self.list_widget)
-        self.list_layout.setContentsMargins(5, 5, 5, 5)
-        self.list_layout.setSpacing(2)
-        self.list_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-
-        scroll_area.setWidget(self.list_widget)
-        main_layout.addWidget(scroll_area)
+        # İstatistik panosu (varsayılan gizli)
+        self.dashboard = StatsDashboard()
+        self.dashboard.setVisible(False)
+        main_layout.addWidget(self.dashboard)
+
+        # Yükleme ilerlemesi
+        self.load_progress = QtWidgets.QProgressBar()
+        self.load_progress.setFormat("%v / %m yükleniyor")
+        self.load_progress.setFixedHeight(14)
+        self.load_progress.setVisible(False)
+        main_layout.addWidget(self.load_progress)
+
+        # Arama kutusu
+        self.search_edit = QtWidgets.QLineEdit()
+        self.search_edit.setPlaceholderText("🔎 Seri, model veya not ara...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self.search_history)
+        main_layout.addWidget(self.search_edit)
+
+        # Sanal liste: sadece görünen satırlar delegate tarafından çizilir
+        self.history_model = HistoryModel(self)
+        self.history_model.noteEdited.connect(self.save_note)
+
+        self.history_view = QListView()
+        self.history_view.setModel(self.history_model)
+        self.history_view.setItemDelegate(HistoryItemDelegate(self.history_view))
+        self.history_view.setUniformItemSizes(True)
+        self.history_view.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.history_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.history_view.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
+        # Not editörü sadece tıklanınca açılır
+        self.history_view.setEditTriggers(
+            QtWidgets.QAbstractItemView.EditTrigger.DoubleClicked
+            | QtWidgets.QAbstractItemView.EditTrigger.EditKeyPressed
+        )
+        self.history_view.clicked.connect(lambda index: self.history_view.edit(index))
+        # Liste sonuna gelince arşivden eski aylar yüklenir. canFetchMore kullanılmaz:
+        # True döndüğü sürece QListView her satır eklemede tüm satırları yeniden yerleştirir
+        self.history_view.verticalScrollBar().valueChanged.connect(self._load_more_if_at_end)
+        self.history_view.verticalScrollBar().rangeChanged.connect(self._load_more_if_at_end)
+        main_layout.addWidget(self.history_view)
+
+        # Yüzey filtreleri: durum, model, tarih aralığı ve VE/VEYA birleştirme
+        facet_layout = QHBoxLayout()
+        facet_layout.setSpacing(6)
+
+        self.status_buttons = {}
+        for status in ('green', 'blue', 'red'):
+            button = QPushButton()
+            button.setCheckable(True)
+            button.setStyleSheet(FACET_BUTTON_STYLE)
+            button.toggled.connect(self._on_facet_changed)
+            facet_layout.addWidget(button)
+            self.status_buttons[status] = button
+
+        self.model_combo = QtWidgets.QComboBox()
+        self.model_combo.setMinimumWidth(170)
+        self.model_combo.currentIndexChanged.connect(self._on_facet_changed)
+        facet_layout.addWidget(self.model_combo)
+
+        self.date_combo = QtWidgets.QComboBox()
+        for label, days in DATE_RANGES:
+            self.date_combo.addItem(label, days)
+        self.date_combo.currentIndexChanged.connect(self._on_facet_changed)
+        facet_layout.addWidget(self.date_combo)
+
+        self.facet_mode_btn = QPushButton("VE")
+        self.facet_mode_btn.setCheckable(True)
+        self.facet_mode_btn.setToolTip("VE: tüm seçili filtreler sağlanmalı\nVEYA: herhangi biri yeterli")
+        self.facet_mode_btn.setStyleSheet(FACET_BUTTON_STYLE)
+        self.facet_mode_btn.toggled.connect(self._on_facet_changed)
+        facet_layout.addWidget(self.facet_mode_btn)
+
+        facet_layout.addStretch()
+        main_layout.addLayout(facet_layout)
 
         # Filtreleme butonları
         filter_layout = QHBoxLayout()
@@ -103,9 +876,10 @@ class HistoryPopup(QWidget):
         """)
         filter_layout.addWidget(self.show_all_btn)
 
-        # Not alınanları göster butonu
+        # Not alınanları göster butonu (açılıp kapanan "notlu" yüzeyi)
         self.show_notes_btn = QPushButton("📝 Not Alınanları Göster")
-        self.show_notes_btn.clicked.connect(lambda: self.filter_devices("notes"))
+        self.show_notes_btn.setCheckable(True)
+        self.show_notes_btn.toggled.connect(self._on_facet_changed)
         self.show_notes_btn.setStyleSheet("""
             QPushButton {
                 background-color: #28a745;
@@ -118,10 +892,21 @@ class HistoryPopup(QWidget):
             QPushButton:hover {
                 background-color: #218838;
             }
+            QPushButton:checked {
+                background-color: #1e7e34;
+                border: 2px solid #155724;
+            }
         """)
         filter_layout.addWidget(self.show_notes_btn)
 
         filter_layout.addStretch()
+
+        # Pano göster/gizle butonu
+        self.dashboard_btn = QPushButton("📈 Pano")
+        self.dashboard_btn.setCheckable(True)
+        self.dashboard_btn.toggled.connect(self.dashboard.setVisible)
+        filter_layout.addWidget(self.dashboard_btn)
+
         main_layout.addLayout(filter_layout)
 
         # Butonlar
@@ -129,7 +914,7 @@ class HistoryPopup(QWidget):
         buttons_layout.setSpacing(10)
 
         # CSV dışa aktar butonu
-        self.export_btn = QPushButton("📊 CSV Dışa Aktar")
+        self.export_btn = QPushButton("📊 Dışa Aktar")
         self.export_btn.clicked.connect(self.export_to_csv)
         buttons_layout.addWidget(self.export_btn)
 
@@ -142,287 +927,304 @@ class HistoryPopup(QWidget):
         main_layout.addLayout(buttons_layout)
 
         # Geçmiş verileri
-        self.history_data = []
-        self.all_items = []  # Tüm öğeler için
-        self.notes_file = "device_notes.json"
+        self.store = get_store()
+        self._loaded_seq = None  # Görünümün yansıttığı son değişiklik sıra numarası
+        self._loader = None
+        self._load_started = 0.0  # süre ölçümü için
+        self._full_load_active = False
+        self._reload_pending = False
+        self._exporter = None
+        self._search_matches = None
+        # Arşiv parçaları görünüm sona gelince (veya arama için) birer birer yüklenir
+        self._archive_pages = []  # henüz yüklenmemiş parçalar, en yeni önce
+        self._page_loader = None
+        self._archive_rows = 0  # arşivden listeye eklenen kayıtlar
+        # Art arda not değişikliklerinde sayılar olay döngüsünde bir kez güncellenir
+        self._counts_timer = QTimer(self)
+        self._counts_timer.setSingleShot(True)
+        self._counts_timer.setInterval(0)
+        self._counts_timer.timeout.connect(self._update_facet_counts)
+        self.note_store = NoteStore(self.store)
         self.device_notes = self.load_notes()
-
-    def load_history(self):
-        """Geçmiş verilerini yükle ve göster"""
+        self.history_model.set_notes(self.device_notes)
+        self.search_index = SearchIndex()
+        self.search_index.set_notes(self.device_notes)
+        self._update_facet_counts()
+
+        self.storeChanged.connect(self._on_store_changed)
+        # Paylaşılan önbellek ayarlıysa diğer istemcilerin sorguları açık pencereye de gelir
+        self.shared_cache = get_shared_cache(self.store)
+        if self.shared_cache is not None:
+            self.shared_cache.watch(self.storeChanged.emit)
+
+    # Bu sayıdan fazla değişiklik varsa satır satır eklemek yerine tamamen yükle
+    INCREMENTAL_LIMIT = 500
+
+    def load_history(self, incremental=True):
+        """Geçmişi arka planda yükle - mümkünse sadece değişenleri uygula"""
         try:
-            cache_file = "warranty_cache.json"
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cache_data = json.load(f)
-
-                # Verileri tarihe göre sırala (en yeni üstte)
-                sorted_data = sorted(cache_data.items(),
-                                   key=lambda x: x[1]['timestamp'],
-                                   reverse=True)
-
-                self.history_data = []
-                total_queries = 0
-                recci_warranty = 0
-                kvk_warranty = 0
-                no_warranty = 0
-
-                # Mevcut list widget'larını temizle
-                for i in reversed(range(self.list_layout.count())):
-                    widget = self.list_layout.itemAt(i).widget()
-                    if widget:
-                        widget.setParent(None)
-
-                for serial, data in sorted_data:
-                    total_queries += 1
-                    result = data['result']
-                    timestamp = datetime.fromisoformat(data['timestamp'])
-
-                    # İstatistik hesapla
-                    if result.get('status_color') == 'green':
-                        recci_warranty += 1
-                    elif result.get('status_color') == 'blue':
-                        kvk_warranty += 1
-                    else:
-                        no_warranty += 1
-
-                    # Model bilgisini hazırla
-                    model_info = result.get('copy_model_payload', '')
-                    if not model_info or model_info.strip() == '':
-                        model_info = 'MODEL İSMİ BULUNAMADI'
-                    else:
-                        # "Sonic" kelimesini çıkar (örn: "S8 Sonic" → "S8")
-                        import re
-                        model_info = re.sub(r'\s+Sonic\s*', ' ', model_info, flags=re.IGNORECASE)
-                        model_info = model_info.strip()
-
-                    # History item oluştur
-                    item_widget = self.create_history_item(serial, result, timestamp, model_info)
-                    self.list_layout.addWidget(item_widget)
-
-                    # Öğeyi all_items listesine ekle
-                    self.all_items.append({
-                        'widget': item_widget,
-                        'serial': serial
-                    })
-
-                    # Durum metnini hazırla
-                    status_color = result.get('status_color', '')
-                    if status_color == 'green':
-                        status_text = 'RECCI GARANTİLİ'
-                    elif status_color == 'blue':
-                        status_text = 'KVK GARANTİLİ'
-                    else:
-                        status_text = 'GARANTİ DIŞI'
-
-                    # CSV için veri hazırla
-                    self.history_data.append({
-                        'serial': serial,
-                        'model': model_info,
-                        'color': status_text,
-                        'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S')
-                    })
-
-                # İstatistikleri güncelle
-                self.stats_label.setText(
-                    f"Toplam: {total_queries} | Recci Garantili: {recci_warranty} | "
-                    f"KVK Garantili: {kvk_warranty} | Garanti Dışı: {no_warranty}"
-                )
-
-                # Boşluk ekle
-                self.list_layout.addStretch()
-
-            else:
-                self.stats_label.setText("Henüz sorgu geçmişi bulunmuyor.")
-                self.export_btn.setVisible(False)
+            self.cancel_loading()
+            self._reload_pending = False
+
+            loader = HistoryLoader(self.store, self.search_index,
+                                   self._loaded_seq if incremental else None, self.INCREMENTAL_LIMIT)
+            loader.signals.started.connect(self._on_load_started)
+            loader.signals.batch.connect(self._on_load_batch)
+            loader.signals.changes.connect(self._on_load_changes)
+            loader.signals.finished.connect(self._on_load_finished)
+            loader.signals.failed.connect(self._on_load_failed)
+            self._loader = loader
+            self._load_started = time.perf_counter()
+            QtCore.QThreadPool.globalInstance().start(loader)
 
         except Exception as e:
             log_exc(f"History load error: {e}")
             self.stats_label.setText("Geçmiş yüklenirken hata oluştu.")
 
-    def create_history_item(self, serial, result, timestamp, model_info):
-        """Tek bir geçmiş öğesi oluştur"""
-        item_frame = QFrame()
-        item_frame.setStyleSheet("""
-            QFrame {
-                background-color: rgba(255, 255, 255, 0.1);
-                border-radius: 8px;
-                padding: 8px;
-                margin: 2px 0px;
-            }
-        """)
-
-        layout = QVBoxLayout(item_frame)
-        layout.setContentsMargins(10, 5, 10, 5)
-
-        # Üst satır: Seri numarası ve durum
-        top_layout = QHBoxLayout()
-
-        # Seri numarası
-        serial_label = QLabel(f"Seri: {serial}")
-        serial_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 12px;
-                font-weight: bold;
-                font-family: 'JetBrains Mono', monospace;
-            }
-        """)
-        top_layout.addWidget(serial_label)
-
-        # Durum göstergesi
-        status_color = result.get('status_color', 'red')
-        if status_color == 'green':
-            status_text = "RECCI"
-            bg_color = "rgba(34, 197, 94, 0.8)"
-        elif status_color == 'blue':
-            status_text = "KVK"
-            bg_color = "rgba(59, 130, 246, 0.8)"
+    def is_loading(self):
+        return self._loader is not None
+
+    def cancel_loading(self):
+        """Süren yüklemeyi iptal et (pencere kapanırken)"""
+        if self._loader is None:
+            return
+        self._loader.cancel()
+        self._loader = None
+        if self._full_load_active:
+            # Tam yükleme yarıda kaldı, bir sonraki açılış baştan yüklemeli
+            self._full_load_active = False
+            self._loaded_seq = None
+        self.load_progress.setVisible(False)
+
+    def _is_current_loader(self):
+        return self._loader is not None and self.sender() is self._loader.signals
+
+    def _on_load_started(self, total):
+        if not self._is_current_loader():
+            return
+        self._full_load_active = True
+        self._reset_archive_pages()
+        self.history_model.set_records([])
+        self.load_progress.setRange(0, total)
+        self.load_progress.setValue(0)
+        self.load_progress.setVisible(total > 0)
+
+    def _on_load_batch(self, records):
+        if not self._is_current_loader():
+            return
+        self.history_model.append_records(records)
+        self.load_progress.setValue(self.history_model.total_count())
+
+    def _on_load_changes(self, records, lookup_count):
+        if not self._is_current_loader():
+            return
+        self.history_model.upsert_records(records)
+        # Silinen kayıt varsa (ör. aylar arşive taşındı) sayılar tutmaz
+        if self.history_model.total_count() - self._archive_rows != lookup_count:
+            self._reload_pending = True
+
+    def _on_load_finished(self, seq, stats):
+        if not self._is_current_loader():
+            return
+        full_load = self._full_load_active
+        metrics.observe("load_history", time.perf_counter() - self._load_started,
+                        mode="full" if full_load else "incremental")
+        self._loader = None
+        self._full_load_active = False
+        self.load_progress.setVisible(False)
+        if self._reload_pending:
+            self.load_history(incremental=False)
+            return
+
+        self._loaded_seq = seq
+        if full_load:
+            # Aktif parça yüklendi; eski aylar görünüm sona geldikçe sayfalanır
+            self._archive_pages = self.store.archive.segments()
+        if self._search_matches is not None:
+            # Yeni gelen kayıtlar da aramaya dahil olsun
+            self.search_history(self.search_edit.text())
         else:
-            status_text = "DIŞI"
-            bg_color = "rgba(239, 68, 68, 0.8)"
-
-        status_label = QLabel(status_text)
-        status_label.setStyleSheet(f"""
-            QLabel {{
-                background-color: {bg_color};
-                color: white;
-                font-size: 10px;
-                font-weight: bold;
-                padding: 2px 6px;
-                border-radius: 4px;
-                font-family: 'JetBrains Mono', monospace;
-            }}
-        """)
-        top_layout.addWidget(status_label)
-
-        # Zaman (Tarih ve Saat)
-        time_label = QLabel(timestamp.strftime('%d.%m.%Y %H:%M:%S'))
-        time_label.setStyleSheet("""
-            QLabel {
-                color: rgba(255, 255, 255, 0.7);
-                font-size: 10px;
-                font-family: 'JetBrains Mono', monospace;
-            }
-        """)
-        top_layout.addWidget(time_label)
-
-        top_layout.addStretch()
-        layout.addLayout(top_layout)
-
-        # Alt satır: Model bilgisi
-        model_label = QLabel(f"Model: {model_info}")
-        model_label.setStyleSheet("""
-            QLabel {
-                color: rgba(255, 255, 255, 0.8);
-                font-size: 11px;
-                font-family: 'JetBrains Mono', monospace;
-            }
-        """)
-        layout.addWidget(model_label)
-
-        # Not alma bölümü
-        notes_layout = QHBoxLayout()
-
-        # Not etiketi
-        notes_label = QLabel("📝 Not:")
-        notes_label.setStyleSheet("""
-            QLabel {
-                color: rgba(255, 255, 255, 0.8);
-                font-size: 10px;
-                font-weight: bold;
-            }
-        """)
-        notes_layout.addWidget(notes_label)
-
-        # Not text box'ı
-        notes_text = QtWidgets.QLineEdit()
-        notes_text.setPlaceholderText("Bu cihaz için not ekleyin...")
-        notes_text.setStyleSheet("""
-            QLineEdit {
-                background-color: rgba(255, 255, 255, 0.9);
-                color: #333;
-                border: 1px solid #ccc;
-                border-radius: 4px;
-                padding: 4px 8px;
-                font-size: 10px;
-                font-family: 'JetBrains Mono', monospace;
-            }
-            QLineEdit:focus {
-                border: 1px solid #094771;
-                background-color: white;
-            }
-        """)
-
-        # Mevcut notu yükle
-        if serial in self.device_notes:
-            notes_text.setText(self.device_notes[serial])
-
-        # Text değiştiğinde notu kaydet
-        notes_text.textChanged.connect(lambda text, s=serial: self.save_note(s, text))
-
-        notes_layout.addWidget(notes_text)
-        layout.addLayout(notes_layout)
-
-        return item_frame
+            self._update_facet_counts()
+        if stats is not None:
+            self.history_model.set_status_changes(stats['status_changes'])
+            self.update_stats(stats['status'], stats['archived'])
+            self.dashboard.set_stats(stats)
+        self._load_more_if_at_end()
+
+    def _reset_archive_pages(self):
+        self._archive_pages = []
+        self._page_loader = None  # süren parça okuması yok sayılır
+        self._archive_rows = 0
+
+    def load_archive_page(self):
+        """Sıradaki arşiv parçasını arka planda okuyup listeye ekle"""
+        if self._page_loader is not None or self._full_load_active or not self._archive_pages:
+            return
+        try:
+            segment = self._archive_pages.pop(0)
+            loader = ArchivePageLoader(self.store.archive, segment.key)
+            loader.signals.loaded.connect(self._on_archive_page)
+            loader.signals.failed.connect(self._on_archive_page_failed)
+            self._page_loader = loader
+            QtCore.QThreadPool.globalInstance().start(loader)
+        except Exception as e:
+            log_exc(f"Archive page error: {e}")
+
+    def _is_current_page_loader(self):
+        return self._page_loader is not None and self.sender() is self._page_loader.signals
+
+    def _on_archive_page(self, key, records):
+        if not self._is_current_page_loader():
+            return
+        self._page_loader = None
+        added = self.history_model.merge_older(records)
+        self._archive_rows += len(added)
+        self.search_index.add_records(added)
+        log_debug("Archive page %s: %d records", key, len(added))
+        if self._search_matches is not None:
+            self.search_history(self.search_edit.text())
+        else:
+            self._update_facet_counts()
+            self._load_more_if_at_end()
+
+    def _on_archive_page_failed(self, message):
+        if not self._is_current_page_loader():
+            return
+        self._page_loader = None
+
+    def _load_more_if_at_end(self, *_args):
+        """Pencere açıkken liste sonu görünüyorsa (filtre sonucu kısa kaldıysa da) sıradaki parçayı yükle"""
+        view = self.history_view
+        if not self._archive_pages or not view.isVisible():
+            return
+        scroll_bar = view.verticalScrollBar()
+        rows = self.history_model.rowCount()
+        # Kaydırma aralığı yerleşimden sonra güncellenir; kısa liste satır yüksekliğinden anlaşılır
+        short = not rows or rows * view.sizeHintForRow(0) <= view.viewport().height()
+        if short or (scroll_bar.maximum() > 0 and scroll_bar.value() >= scroll_bar.maximum()):
+            self.load_archive_page()
+
+    def _on_store_changed(self, serials):
+        # Kayıtlar yerel depoya yazıldı; gizliyken bir sonraki açılışta yüklenir
+        if self.isVisible() and not self._full_load_active:
+            self.load_history()
+
+    def _on_load_failed(self, message):
+        if not self._is_current_loader():
+            return
+        self._loader = None
+        self._full_load_active = False
+        self._loaded_seq = None
+        self.load_progress.setVisible(False)
+        self.stats_label.setText("Geçmiş yüklenirken hata oluştu.")
+
+    def update_stats(self, counts, archived=0):
+        """İstatistik satırını durum sayımlarından güncelle (archived: sayımların arşivdeki kısmı)"""
+        total_queries = sum(counts.values())
+        if not total_queries and not archived:
+            self.stats_label.setText("Henüz sorgu geçmişi bulunmuyor.")
+            self.export_btn.setVisible(False)
+            return
+
+        recci_warranty = counts.get('green', 0)
+        kvk_warranty = counts.get('blue', 0)
+        no_warranty = total_queries - recci_warranty - kvk_warranty
+        self.stats_label.setText(
+            f"Toplam: {total_queries} | Recci Garantili: {recci_warranty} | "
+            f"KVK Garantili: {kvk_warranty} | Garanti Dışı: {no_warranty}"
+            + (f" | Arşiv: {archived}" if archived else "")
+        )
+        self.export_btn.setVisible(True)
 
     def export_to_csv(self):
-        """Geçmiş verilerini CSV olarak dışa aktar - Kullanıcı konum seçsin"""
+        """Geçmişi CSV veya JSON Lines olarak arka planda dışa aktar - Kullanıcı konum seçsin"""
         try:
-            if not self.history_data:
+            if not self.history_model.total_count() and not self.store.archive_count():
                 show_simple_message("UYARI", "Dışa aktarılacak veri bulunmuyor.", "blue")
                 return
+            if self._exporter is not None:
+                show_simple_message("UYARI", "Bir dışa aktarma zaten sürüyor.", "blue")
+                return
+
+            # Aktif filtre (ör. sadece not alınanlar) dışa aktarıma da uygulanır
+            predicate = self.history_model.current_filter()
+            options = ExportOptionsDialog(predicate is not None, self)
+            if options.exec() != QtWidgets.QDialog.DialogCode.Accepted:
+                return
 
             # Kullanıcıdan dosya konumunu seçmesini iste
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             default_filename = f"warranty_history_{timestamp}.csv"
 
-            # QFileDialog ile dosya kaydetme dialog'u
-            filename, _ = QtWidgets.QFileDialog.getSaveFileName(
+            filename, selected_filter = QtWidgets.QFileDialog.getSaveFileName(
                 self,
-                "CSV Dosyasını Kaydet",
+                "Dışa Aktarım Dosyasını Kaydet",
                 default_filename,
-                "CSV Dosyaları (*.csv);;Tüm Dosyalar (*)"
+                "CSV Dosyaları (*.csv);;JSON Lines (*.jsonl);;Tüm Dosyalar (*)"
             )
 
             # Kullanıcı vazgeçtiyse çık
             if not filename:
                 return
 
-            # CSV dosyasını yaz
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['serial', 'model', 'color', 'timestamp']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-                # Başlıkları yaz
-                writer.writerow({
-                    'serial': 'Seri Numarası',
-                    'model': 'Model',
-                    'color': 'Durum',
-                    'timestamp': 'Zaman'
-                })
-
-                # Verileri yaz
-                for row in self.history_data:
-                    writer.writerow(row)
-
-            log_info(f"CSV dışa aktarıldı: {filename}")
-
-            # Başarılı mesajı göster
-            show_simple_message("BAŞARILI", f"Veriler '{os.path.basename(filename)}' dosyasına kaydedildi.", "green")
+            fmt = "jsonl" if filename.lower().endswith(".jsonl") or selected_filter.startswith("JSON") else "csv"
+            from historyExport import HistoryExport  # sadece dışa aktarımda gerekli
+            export = HistoryExport(
+                self.store, filename, fmt,
+                predicate=predicate,
+                include_notes=options.notes_check.isChecked(),
+                include_raw=options.raw_check.isChecked(),
+                since_last_export=options.since_check.isChecked(),
+            )
+            self._start_export(export)
 
         except Exception as e:
-            log_exc(f"CSV export error: {e}")
+            log_exc(f"Export error: {e}")
 
             # Hata mesajı göster
-            show_simple_message("HATA", "CSV dışa aktarma sırasında hata oluştu.", "red")
+            show_simple_message("HATA", "Dışa aktarma sırasında hata oluştu.", "red")
+
+    def _start_export(self, export):
+        exporter = HistoryExporter(export)
+
+        progress = QtWidgets.QProgressDialog("Dışa aktarılıyor...", "İptal", 0, 0, self)
+        progress.setWindowTitle("Dışa Aktar")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.setAutoReset(False)
+        progress.canceled.connect(exporter.cancel)
+
+        def on_progress(done, total):
+            progress.setMaximum(total)
+            progress.setValue(min(done, total))
+
+        def on_finished(count):
+            self._exporter = None
+            progress.close()
+            if count is None:
+                log_info(f"Dışa aktarma iptal edildi: {export.path}")
+                return
+            show_simple_message("BAŞARILI", f"{count} kayıt '{os.path.basename(export.path)}' dosyasına kaydedildi.", "green")
 
+        def on_failed(message):
+            self._exporter = None
+            progress.close()
+            show_simple_message("HATA", "Dışa aktarma sırasında hata oluştu.", "red")
+
+        exporter.signals.progress.connect(on_progress)
+        exporter.signals.finished.connect(on_finished)
+        exporter.signals.failed.connect(on_failed)
+        self._exporter = exporter
+        QtCore.QThreadPool.globalInstance().start(exporter)
+
+    @metrics.timed("history_show")
     def show_at_center(self):
         """Popup'u ekranın merkezinde göster - Güvenli yöntem"""
         try:
-            log_info("=== SHOW_AT_CENTER METODU BAŞLATILDI ===")
+            log_debug("=== SHOW_AT_CENTER METODU BAŞLATILDI ===")
 
             # Basit ve güvenli pozisyon hesaplama
-            log_info("Pozisyon hesaplanıyor...")
+            log_debug("Pozisyon hesaplanıyor...")
             screen_geometry = QtCore.QRect(0, 0, 1920, 1080)  # Varsayılan ekran boyutu
             w = self.width()
             h = self.height()
@@ -431,25 +1233,25 @@ class HistoryPopup(QWidget):
             x = (screen_geometry.width() - w) // 2
             y = (screen_geometry.height() - h) // 2
 
-            log_info(f"Popup boyutları - Width: {w}, Height: {h}")
-            log_info(f"Hesaplanan pozisyon - X: {x}, Y: {y}")
+            log_debug("Popup boyutları - Width: %s, Height: %s", w, h)
+            log_debug("Hesaplanan pozisyon - X: %s, Y: %s", x, y)
 
             # Pozisyonu ayarla
             self.move(x, y)
-            log_info("Pozisyon ayarlandı")
+            log_debug("Pozisyon ayarlandı")
 
             # Pencereyi göster
             self.show()
-            log_info("Pencere gösterildi")
+            log_debug("Pencere gösterildi")
 
             # Timer'ı başlat (daha sonra)
             try:
                 self.autoclose_timer.start()
-                log_info("Timer başlatıldı")
+                log_debug("Timer başlatıldı")
             except:
-                log_info("Timer başlatılamadı (normal)")
+                log_debug("Timer başlatılamadı (normal)")
 
-            log_info("=== SHOW_AT_CENTER METODU BAŞARIYLA TAMAMLANDI ===")
+            log_debug("=== SHOW_AT_CENTER METODU BAŞARIYLA TAMAMLANDI ===")
             return True
 
         except Exception as e:
@@ -466,69 +1268,154 @@ class HistoryPopup(QWidget):
             return False
 
     def load_notes(self):
-        """Cihaz notlarını yükle"""
+        """Cihaz notlarını depodan yükle"""
         try:
-            if os.path.exists(self.notes_file):
-                with open(self.notes_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except:
-            pass
-        return {}
+            return self.note_store.load()
+        except Exception as e:
+            log_exc(f"Notes load error: {e}")
+        return self.note_store.notes
 
     def save_note(self, serial, note_text):
-        """Tek bir cihaz notunu kaydet"""
+        """Tek bir cihaz notunu kaydet - disk yazımı ertelenir ve birleştirilir"""
         try:
-            # Notu güncelle
-            if note_text.strip():
-                self.device_notes[serial] = note_text.strip()
-            else:
-                # Boş not ise sil
-                if serial in self.device_notes:
-                    del self.device_notes[serial]
-
-            # Tüm notları kaydet
-            self.save_notes()
-
+            self.note_store.set(serial, note_text)
+            self.search_index.set_note(serial, note_text)
+            self.history_model.note_changed(serial)
+            self._counts_timer.start()
         except Exception as e:
             log_exc(f"Save note error: {e}")
 
     def save_notes(self):
-        """Cihaz notlarını kaydet"""
+        """Bekleyen not değişikliklerini hemen diske yaz"""
         try:
-            with open(self.notes_file, 'w', encoding='utf-8') as f:
-                json.dump(self.device_notes, f, ensure_ascii=False, indent=2)
+            self.note_store.flush()
         except Exception as e:
             log_exc(f"Notes save error: {e}")
 
     def filter_devices(self, filter_type):
-        """Cihazları filtrele"""
+        """Cihazları filtrele: "notes" notlu yüzeyini açar, "all" tüm yüzeyleri temizler"""
         try:
-            # Mevcut öğeleri gizle/göster
-            for item_info in self.all_items:
-                widget = item_info['widget']
-                serial = item_info['serial']
-
-                if filter_type == "all":
-                    widget.show()
-                elif filter_type == "notes":
-                    # Notu olanları göster
-                    if serial in self.device_notes and self.device_notes[serial].strip():
-                        widget.show()
-                    else:
-                        widget.hide()
+            self._set_facet_controls(clear=filter_type == "all", has_note=filter_type == "notes")
+            self._apply_filters()
+        except Exception as e:
+            log_exc(f"Filter error: {e}")
 
+    def _set_facet_controls(self, clear=False, has_note=None):
+        # Sinyaller kapalı: birden çok kontrol değişse de filtre bir kez uygulanır
+        controls = [*self.status_buttons.values(), self.model_combo, self.date_combo,
+                    self.facet_mode_btn, self.show_notes_btn]
+        for control in controls:
+            control.blockSignals(True)
+        try:
+            if clear:
+                for button in self.status_buttons.values():
+                    button.setChecked(False)
+                self.model_combo.setCurrentIndex(0)
+                self.date_combo.setCurrentIndex(0)
+                self.facet_mode_btn.setChecked(False)
+            if has_note is not None:
+                self.show_notes_btn.setChecked(has_note)
+        finally:
+            for control in controls:
+                control.blockSignals(False)
+
+    def _on_facet_changed(self, *_args):
+        try:
+            self.facet_mode_btn.setText("VEYA" if self.facet_mode_btn.isChecked() else "VE")
+            self._apply_filters()
         except Exception as e:
             log_exc(f"Filter error: {e}")
 
+    def facet_query(self):
+        """Kontrollerde seçili yüzeyler"""
+        days = self.date_combo.currentData()
+        since = None
+        if days is not None:
+            since = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+        model = self.model_combo.currentData()
+        return FacetQuery(
+            statuses=[status for status, button in self.status_buttons.items() if button.isChecked()],
+            models=None if model is None else [model],
+            since=since,
+            has_note=self.show_notes_btn.isChecked(),
+            mode='or' if self.facet_mode_btn.isChecked() else 'and',
+        )
+
+    def _update_facet_counts(self, query=None):
+        """Yüzey kontrollerindeki sayıları güncelle (bit sayımı, kayıt taranmaz)"""
+        query = query or self.facet_query()
+        counts = self.history_model.facet_counts(query)
+        for status, button in self.status_buttons.items():
+            label = STATUS_STYLES.get(status, STATUS_DEFAULT)[0]
+            button.setText(f"{label} ({counts['status'].get(status, 0)})")
+        self.show_notes_btn.setText(f"📝 Not Alınanları Göster ({counts['note']})")
+
+        models = sorted(counts['model'].items(), key=lambda item: (-item[1], item[0]))
+        combo = self.model_combo
+        if [combo.itemData(i) for i in range(1, combo.count())] == [model for model, _count in models]:
+            # Aynı modeller aynı sırada: sadece sayıları güncelle
+            for i, (model, count) in enumerate(models, 1):
+                combo.setItemText(i, f"{model or '(Model yok)'} ({count})")
+            return
+        selected = combo.currentData()
+        combo.blockSignals(True)
+        try:
+            combo.clear()
+            combo.addItem("Tüm modeller", None)
+            for model, count in models:
+                combo.addItem(f"{model or '(Model yok)'} ({count})", model)
+            index = combo.findData(selected) if selected is not None else 0
+            combo.setCurrentIndex(max(index, 0))
+        finally:
+            combo.blockSignals(False)
+
+    def search_history(self, text):
+        """Seri, model ve notlarda ara - indeks üzerinden, satırlar yeniden oluşturulmaz"""
+        try:
+            self._search_matches = self.search_index.search(text)
+            self._apply_filters()
+            self._page_for_serial(text)
+        except Exception as e:
+            log_exc(f"Search error: {e}")
+
+    def _page_for_serial(self, text):
+        """Aranan tam bir seriyse ve listede yoksa, onu içerebilecek arşiv parçasını öne al"""
+        serials = {text.strip(), text.strip().upper()}
+        if not text.strip() or ' ' in text.strip() or not self._archive_pages:
+            return
+        if any(self.history_model.contains(serial) for serial in serials):
+            return
+        for segment in self._archive_pages:
+            if any(serial in segment.bloom for serial in serials):
+                self._archive_pages.remove(segment)
+                self._archive_pages.insert(0, segment)
+                self.load_archive_page()
+                return
+
+    def _apply_filters(self):
+        """Yüzey filtreleri ve aramayı birleştirip görünüme tek seferde uygula"""
+        query = self.facet_query()
+        with metrics.span("facet_filter"):
+            self.history_model.set_filter(None, serials=self._search_matches, facets=query)
+            self._update_facet_counts(query)
+        self._load_more_if_at_end()
+
     def close_popup(self):
         """Popup'u kapat"""
         try:
+            self.cancel_loading()
+            self.save_notes()
             self.hide()
             self.autoclose_timer.stop()
         except Exception as e:
             log_exc(f"History popup close error: {e}")
 
 
+    def closeEvent(self, event):
+        self.cancel_loading()
+        super().closeEvent(event)
+
+
 # Basit mesaj gösterme fonksiyonu
 def show_simple_message(title: str, message: str, status_color: str = "blue"):
     """Basit mesaj popup'ı göster"""
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Hızlı açılış için geçmiş penceresinin gecikmeli kurulumu.
+
+Tepsi simgesi açılışta hemen görünsün diye historyUi (ve QtWidgets'ın geri kalanı,
+depo, arama indeksi, notlar) açılışta import edilmez. HistoryPopup ilk kullanımda
+kurulur; önbellek ısıtma tepsi göründükten sonra arka planda yapılır. Isıtmadan
+sonra arka plan yeniden doğrulaması (bkz. revalidationScheduler.py) başlatılır.
+
+    history = LazyHistory()
+    tray.show()
+    history.warm_up()          # tepsi göründükten sonra
+    ...
+    history.show()             # "Geçmiş Sorgular" menüsü
+"""
+
+import logging
+import threading
+
+from PyQt6.QtCore import QTimer
+
+from appLogging import configure_logging
+
+logger = logging.getLogger("garanti")
+
+
+class LazyHistory:
+    """HistoryPopup'ı ilk kullanımda oluşturan vekil"""
+
+    # Tepsi gösterildikten sonra ısıtmaya başlamadan önce beklenen süre
+    WARM_DELAY_MS = 2000
+
+    def __init__(self, parent=None):
+        configure_logging()
+        self._parent = parent
+        self._popup = None
+        self._warm_thread = None
+        self.warmed = threading.Event()
+        self.revalidation = None  # RevalidationScheduler, ayarlı değilse None
+
+    @property
+    def created(self):
+        return self._popup is not None
+
+    def popup(self):
+        """HistoryPopup örneği (gerekirse şimdi oluşturulur)"""
+        if self._popup is None:
+            from historyUi import HistoryPopup
+            self._popup = HistoryPopup(self._parent)
+        return self._popup
+
+    def show(self):
+        """Geçmişi yükle ve pencereyi göster"""
+        popup = self.popup()
+        if self.revalidation is not None:
+            self.revalidation.idle.mark_activity()
+        popup.load_history()
+        popup.show_at_center()
+        return popup
+
+    def warm_up(self, delay_ms=None, preload_ui=True):
+        """Olay döngüsü başladıktan (tepsi göründükten) sonra önbelleği arka planda ısıt"""
+        QTimer.singleShot(self.WARM_DELAY_MS if delay_ms is None else delay_ms,
+                          lambda: self._start_warm(preload_ui))
+
+    def _start_warm(self, preload_ui):
+        if self._warm_thread is not None or self._popup is not None:
+            return
+        self._warm_thread = threading.Thread(
+            target=self._warm, args=(preload_ui,), name="HistoryWarmUp", daemon=True
+        )
+        self._warm_thread.start()
+
+    def _warm(self, preload_ui):
+        try:
+            from warrantyStore import get_store
+
+            # Depoyu aç (ilk açılışta JSON geçişi), JSON önbelleğini içe aktar, aktif
+            # dönemden eski ayları arşive taşı, istatistik tablolarını sayfa önbelleğine al
+            store = get_store()
+            store.import_json_cache()
+            store.roll_over()
+            store.stats_snapshot()
+            if preload_ui:
+                # Sadece modül yüklenir; widget'lar GUI thread'inde ilk kullanımda kurulur
+                import historyUi  # noqa: F401
+        except Exception as e:
+            logger.exception(f"History warm-up error: {e}")
+        finally:
+            self.warmed.set()
+
+        try:
+            from revalidationScheduler import start_revalidation
+
+            self.revalidation = start_revalidation()
+            if self.revalidation is not None:
+                self.revalidation.add_listener(self._on_revalidated)
+        except Exception as e:
+            logger.exception(f"Revalidation start error: {e}")
+
+    def _on_revalidated(self, serial, old_status, new_status):
+        # Arka plan thread'inden: sinyal açık pencerede kuyruklu çalışır
+        if self._popup is not None:
+            self._popup.storeChanged.emit([serial])
+
+    def __getattr__(self, name):
+        # app.py'nin HistoryPopup üzerinde çağırdığı diğer metotlar için
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.popup(), name)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+from perfMetrics import metrics
+
+logger = logging.getLogger("garanti")
+
+
+def read_notes_file(path):
+    """Eski device_notes.json snapshot'ını oku ve üzerine journal'ı uygula"""
+    notes = {}
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                notes = json.load(f)
+    except Exception as e:
+        logger.exception(f"Notes snapshot load error: {e}")
+
+    journal_path = path + ".journal"
+    try:
+        if os.path.exists(journal_path):
+            with open(journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Yarım kalmış son satır (ör. çökme) - atla
+                        continue
+                    if entry.get('note'):
+                        notes[entry['serial']] = entry['note']
+                    else:
+                        notes.pop(entry['serial'], None)
+    except Exception as e:
+        logger.exception(f"Notes journal replay error: {e}")
+    return notes
+
+
+class NoteStore:
+    """Cihaz notları için yazma-arkası (write-behind) depo.
+
+    Notlar bellekte tutulur; düzenlemeler kısa bir bekleme süresinde birleştirilip
+    arka plan thread'inde tek transaction ile WarrantyStore'a yazılır.
+    """
+
+    def __init__(self, store, debounce_seconds=0.5):
+        self.store = store
+        self.debounce_seconds = debounce_seconds
+
+        self.notes = {}
+        self._pending = {}  # serial -> not (None = sil), henüz diske yazılmadı
+        self._last_edit = 0.0
+        self._closing = False
+
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._thread = None
+        atexit.register(self.close)
+
+    def load(self):
+        """Notları depodan oku"""
+        notes = self.store.load_notes()
+        with self._cond:
+            self.notes.clear()
+            self.notes.update(notes)
+            # Henüz yazılmamış düzenlemeler diskteki halden yenidir
+            for serial, note in self._pending.items():
+                if note:
+                    self.notes[serial] = note
+                else:
+                    self.notes.pop(serial, None)
+        return self.notes
+
+    def set(self, serial, note_text):
+        """Notu bellekte hemen güncelle, diske yazımı ertele"""
+        note = note_text.strip() if note_text else ''
+        with self._cond:
+            if note:
+                self.notes[serial] = note
+            else:
+                self.notes.pop(serial, None)
+            self._pending[serial] = note or None
+            self._last_edit = time.monotonic()
+            self._ensure_thread()
+            self._cond.notify()
+
+    def flush(self):
+        """Bekleyen düzenlemeleri hemen yaz"""
+        self._drain()
+
+    def close(self):
+        """Thread'i durdur ve bekleyenleri yaz"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self._drain()
+
+    def _ensure_thread(self):
+        if self._thread is None and not self._closing:
+            self._thread = threading.Thread(target=self._run, name="NoteStoreWriter", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+                # Tuş vuruşu dalgası bitene kadar bekle
+                while not self._closing:
+                    remaining = self._last_edit + self.debounce_seconds - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closing:
+                    return
+            self._drain()
+
+    def _drain(self):
+        with self._io_lock:
+            with self._cond:
+                batch = self._pending
+                self._pending = {}
+            if not batch:
+                return
+            try:
+                with metrics.span("note_save"):
+                    self.store.set_notes(batch)
+            except Exception as e:
+                logger.exception(f"Notes save error: {e}")
+                # Yazılamayanları bir sonraki denemeye bırak
+                with self._cond:
+                    for serial, note in batch.items():
+                        self._pending.setdefault(serial, note)
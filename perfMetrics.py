@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""Hafif performans ölçümü: zamanlanmış bölümler (span), histogramlar ve sayaçlar.
+
+    from perfMetrics import metrics
+
+    with metrics.span("api_request", backend="recci"):
+        ...
+
+    @metrics.timed("cache_read")
+    def get_cached(self, serial): ...
+
+    metrics.inc("cache_requests", result="hit")
+
+Ölçüm varsayılan olarak kapalıdır; kapalıyken span() paylaşılan boş bir bağlam
+döndürür ve inc()/observe() hemen döner. GARANTI_METRICS=1 ortam değişkeni veya
+metrics.enable() ile açılır; açıkken anlık görüntü periyodik olarak Prometheus
+metin biçiminde METRICS_FILE dosyasına yazılır. "Performans" paneli için bkz.
+add_performance_action().
+"""
+
+import atexit
+import functools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+logger = logging.getLogger("garanti")
+
+METRICS_FILE = Path.home() / "garanti_metrics.prom"
+METRICS_PREFIX = "garanti"
+
+# Histogram kova üst sınırları (saniye)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Sabit kovalı gecikme histogramı"""
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # son kova: +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Kova üst sınırından yaklaşık yüzdelik (son kovada None)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKETS[index] if index < len(BUCKETS) else None
+        return None
+
+
+class _NullSpan:
+    """Ölçüm kapalıyken kullanılan, hiçbir şey yapmayan bağlam"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('_metrics', '_name', '_labels', '_started')
+
+    def __init__(self, metrics, name, labels):
+        self._metrics = metrics
+        self._name = name
+        self._labels = labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._metrics._observe(self._name, time.perf_counter() - self._started, self._labels)
+        if exc_type is not None:
+            self._metrics._inc(self._name + "_errors", 1, self._labels)
+        return False
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+class Metrics:
+    """Histogram ve sayaç kayıt defteri; açık/kapalı anahtarı ve anlık görüntü yazıcısı"""
+
+    SNAPSHOT_INTERVAL = 15.0
+
+    def __init__(self):
+        self.enabled = False
+        self._histograms = {}  # (ad, etiketler) -> Histogram
+        self._counters = {}  # (ad, etiketler) -> sayı
+        self._lock = threading.Lock()
+        self._path = METRICS_FILE
+        self._stop = None  # çalışan yazıcının durdurma olayı
+
+    # --- kayıt ---
+
+    def span(self, name, **labels):
+        """`with` ile kullanılan zamanlanmış bölüm; hata olursa <ad>_errors sayacı artar"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, labels)
+
+    def timed(self, name, **labels):
+        """Fonksiyon süresini `name` histogramına yazan dekoratör (kapalıyken doğrudan çağırır)"""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with _Span(self, name, labels):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def observe(self, name, seconds, **labels):
+        if self.enabled:
+            self._observe(name, seconds, labels)
+
+    def inc(self, name, amount=1, **labels):
+        if self.enabled:
+            self._inc(name, amount, labels)
+
+    def _observe(self, name, seconds, labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def _inc(self, name, amount, labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    # --- açma/kapama ---
+
+    def enable(self, path=None, interval=None):
+        """Ölçümü aç ve anlık görüntü yazıcısını başlat"""
+        if path is not None:
+            self._path = Path(path)
+        self.enabled = True
+        if self._stop is None:
+            self._stop = threading.Event()
+            threading.Thread(
+                target=self._write_loop, args=(self._stop, interval or self.SNAPSHOT_INTERVAL),
+                name="MetricsWriter", daemon=True,
+            ).start()
+
+    def disable(self):
+        """Ölçümü kapat (toplanan değerler korunur)"""
+        self.enabled = False
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    # --- okuma ---
+
+    def snapshot(self):
+        """{'histograms': [(ad, etiketler, Histogram kopyası)], 'counters': [(ad, etiketler, sayı)]}"""
+        with self._lock:
+            histograms = []
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                copy = Histogram()
+                copy.counts = list(histogram.counts)
+                copy.total = histogram.total
+                copy.count = histogram.count
+                histograms.append((name, dict(labels), copy))
+            counters = [(name, dict(labels), value) for (name, labels), value in sorted(self._counters.items())]
+        return {'histograms': histograms, 'counters': counters}
+
+    def render_prometheus(self):
+        """Anlık görüntüyü Prometheus metin biçiminde döndür"""
+        snapshot = self.snapshot()
+        lines = []
+        declared = set()
+        for name, labels, histogram in snapshot['histograms']:
+            metric = f"{METRICS_PREFIX}_{name}_seconds"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} histogram")
+                declared.add(metric)
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (None,), histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound is None else repr(bound)
+                lines.append(f"{metric}_bucket{_format_labels(labels, le=le)} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.total:.6f}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+        for name, labels, value in snapshot['counters']:
+            metric = f"{METRICS_PREFIX}_{name}_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path=None):
+        """Anlık görüntüyü dosyaya yaz (geçici dosya + yer değiştirme, okuyan yarım görmez)"""
+        path = Path(path or self._path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+    def _write_loop(self, stop, interval):
+        while not stop.wait(interval):
+            try:
+                self.write_snapshot()
+            except Exception as e:
+                logger.warning(f"Metrics snapshot error: {e}")
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, **extra):
+    items = list(labels.items()) + list(extra.items())
+    if not items:
+        return ""
+    body = ",".join(f'{key}="{_escape_label(value)}"' for key, value in items)
+    return "{" + body + "}"
+
+
+metrics = Metrics()
+
+
+def _write_at_exit():
+    if metrics.enabled:
+        try:
+            metrics.write_snapshot()
+        except Exception:
+            pass
+
+
+atexit.register(_write_at_exit)
+
+if os.environ.get("GARANTI_METRICS", "") not in ("", "0"):
+    metrics.enable()
+
+
+# --- "Performans" paneli (Qt sadece panel açılırken import edilir) ---
+
+def _format_ms(seconds):
+    if seconds is None:
+        return "> 10 sn"
+    return f"{seconds * 1000:.1f} ms"
+
+
+def create_performance_panel(parent=None):
+    """Histogram ve sayaçları gösteren, kendini yenileyen pencere"""
+    from PyQt6.QtCore import Qt, QTimer
+    from PyQt6.QtWidgets import QCheckBox, QLabel, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+
+    class PerformancePanel(QWidget):
+        REFRESH_MS = 2000
+
+        def __init__(self, parent=None):
+            super().__init__(parent)
+            self.setWindowTitle("Performans")
+            self.setWindowFlags(Qt.WindowType.Window)
+            self.resize(620, 420)
+
+            layout = QVBoxLayout(self)
+            self.enabled_check = QCheckBox("Ölçüm açık")
+            self.enabled_check.setChecked(metrics.enabled)
+            self.enabled_check.toggled.connect(self._toggle)
+            layout.addWidget(self.enabled_check)
+
+            self.span_table = QTableWidget(0, 6)
+            self.span_table.setHorizontalHeaderLabels(["İşlem", "Etiket", "Sayı", "Ort.", "p50", "p95"])
+            self.span_table.verticalHeader().setVisible(False)
+            layout.addWidget(self.span_table)
+
+            self.counter_label = QLabel("")
+            self.counter_label.setWordWrap(True)
+            layout.addWidget(self.counter_label)
+
+            self._timer = QTimer(self)
+            self._timer.setInterval(self.REFRESH_MS)
+            self._timer.timeout.connect(self.refresh)
+
+        def _toggle(self, checked):
+            if checked:
+                metrics.enable()
+            else:
+                metrics.disable()
+
+        def refresh(self):
+            snapshot = metrics.snapshot()
+            histograms = snapshot['histograms']
+            self.span_table.setRowCount(len(histograms))
+            for row, (name, labels, histogram) in enumerate(histograms):
+                average = histogram.total / histogram.count if histogram.count else 0.0
+                values = (
+                    name,
+                    ", ".join(f"{key}={value}" for key, value in labels.items()),
+                    str(histogram.count),
+                    _format_ms(average),
+                    _format_ms(histogram.quantile(0.5)),
+                    _format_ms(histogram.quantile(0.95)),
+                )
+                for column, value in enumerate(values):
+                    self.span_table.setItem(row, column, QTableWidgetItem(value))
+            self.span_table.resizeColumnsToContents()
+
+            counters = [
+                f"{name}{'(' + ', '.join(f'{k}={v}' for k, v in labels.items()) + ')' if labels else ''}: {value}"
+                for name, labels, value in snapshot['counters']
+            ]
+            self.counter_label.setText("\n".join(counters) or "Henüz sayaç yok")
+
+        def showEvent(self, event):
+            self.refresh()
+            self._timer.start()
+            super().showEvent(event)
+
+        def hideEvent(self, event):
+            self._timer.stop()
+            super().hideEvent(event)
+
+    return PerformancePanel(parent)
+
+
+def add_performance_action(menu, parent=None):
+    """Tepsi menüsüne "Performans" girdisini ekle; panel ilk tıklamada oluşturulur"""
+    action = menu.addAction("Performans")
+    panel = {}
+
+    def show_panel():
+        if 'widget' not in panel:
+            panel['widget'] = create_performance_panel(parent)
+        widget = panel['widget']
+        widget.show()
+        widget.raise_()
+        widget.activateWindow()
+
+    action.triggered.connect(show_panel)
+    return action
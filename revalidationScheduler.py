@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""Süresi dolmak üzere olan önbellek sonuçlarının arka planda yeniden doğrulanması.
+
+Önbellekteki "RECCI GARANTİLİ" bir cihazın garantisi sonradan bitmiş olabilir. Sonucun
+tahmini geçerlilik sonu, sorgu zamanı + durumun önbellek süresidir (bkz. CachePolicy);
+süresi LOOKAHEAD_DAYS içinde dolacak kayıtlar bir öncelik kuyruğuna alınır:
+
+    1. notu olan cihazlar (üzerinde çalışılan cihazlar)
+    2. tahmini geçerlilik sonu en yakın olan
+    3. en uzun süredir bakılmayan
+
+Kuyruk sadece makine boştayken (IdleMonitor) ve saatlik istek bütçesi (HourlyBudget)
+içinde işlenir. Her sonuç hemen depoya yazılır; durumu değişen kayıtlar depodaki
+tetikleyiciyle işaretlenir ve geçmiş penceresinde gösterilir.
+
+revalidation.json (isteğe bağlı; warranty_backends.json yoksa çalışmaz):
+
+    {"enabled": true, "requests_per_hour": 60, "idle_seconds": 300, "lookahead_days": 3}
+"""
+
+import heapq
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from perfMetrics import metrics
+
+logger = logging.getLogger("garanti")
+
+REVALIDATION_FILE = "revalidation.json"
+
+DEFAULT_REQUESTS_PER_HOUR = 60
+DEFAULT_IDLE_SECONDS = 300
+DEFAULT_LOOKAHEAD_DAYS = 3
+
+
+def user_idle_seconds():
+    """Kullanıcının son klavye/fare girdisinden beri geçen süre; bilinemiyorsa None"""
+    if sys.platform != "win32":
+        return None
+    try:
+        import ctypes
+
+        class LASTINPUTINFO(ctypes.Structure):
+            _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+        info = LASTINPUTINFO()
+        info.cbSize = ctypes.sizeof(info)
+        if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+            return None
+        # Her iki sayaç da 32 bit milisaniye; ~49 günde bir başa döner
+        return ((ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF) / 1000.0
+    except Exception:
+        return None
+
+
+def cpu_busy():
+    """Son bir dakikanın yük ortalaması çekirdek sayısının yarısını aşıyor mu (bilinmiyorsa False)"""
+    try:
+        return os.getloadavg()[0] > (os.cpu_count() or 1) * 0.5
+    except (AttributeError, OSError):
+        return False
+
+
+class IdleMonitor:
+    """Makine boşta mı: kullanıcı girdisi (Windows) veya CPU yükü ile uygulama içi etkinlik"""
+
+    def __init__(self, threshold_seconds=DEFAULT_IDLE_SECONDS, probe=user_idle_seconds,
+                 busy=cpu_busy, clock=time.monotonic):
+        self.threshold = threshold_seconds
+        self._probe = probe
+        self._busy = busy
+        self._clock = clock
+        self._last_activity = clock()
+
+    def mark_activity(self):
+        """Uygulamada kullanıcı etkinliği oldu (ör. geçmiş penceresi açıldı)"""
+        self._last_activity = self._clock()
+
+    def is_idle(self):
+        if self._clock() - self._last_activity < self.threshold:
+            return False
+        idle = self._probe()
+        if idle is not None:
+            return idle >= self.threshold
+        return not self._busy()
+
+
+class HourlyBudget:
+    """Son bir saatteki istek sayısını sınırlayan kayan pencere"""
+
+    WINDOW = 3600.0
+
+    def __init__(self, limit, clock=time.monotonic):
+        self.limit = int(limit)
+        self._clock = clock
+        self._used = deque()
+
+    def _expire(self, now):
+        while self._used and now - self._used[0] >= self.WINDOW:
+            self._used.popleft()
+
+    def remaining(self):
+        self._expire(self._clock())
+        return max(0, self.limit - len(self._used))
+
+    def consume(self):
+        self._used.append(self._clock())
+
+    def wait_time(self):
+        """Bir sonraki isteğe kadar beklenecek süre (saniye)"""
+        now = self._clock()
+        self._expire(now)
+        if len(self._used) < self.limit:
+            return 0.0
+        if not self._used:
+            return self.WINDOW
+        return self._used[0] + self.WINDOW - now
+
+
+class RevalidationQueue:
+    """(notsuz mu, geçerlilik sonu, son sorgu zamanı) sırasıyla çıkan seri kuyruğu"""
+
+    def __init__(self):
+        self._heap = []
+        self._queued = set()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, serial, status_color, timestamp, expires, has_note):
+        if serial in self._queued:
+            return
+        self._queued.add(serial)
+        heapq.heappush(self._heap, (not has_note, expires, timestamp, serial, status_color))
+
+    def pop(self):
+        """(serial, status_color) veya kuyruk boşsa None"""
+        if not self._heap:
+            return None
+        _without_note, _expires, _timestamp, serial, status_color = heapq.heappop(self._heap)
+        self._queued.discard(serial)
+        return serial, status_color
+
+    def clear(self):
+        self._heap.clear()
+        self._queued.clear()
+
+
+class RevalidationScheduler:
+    """Kuyruğu boşta ve bütçe içinde işleyen arka plan thread'i.
+
+    client: warrantyClient.WarrantyClient (query_backends kullanılır, önbelleğe bakılmaz)
+    store: WarrantyStore (adaylar ve geçerlilik süreleri buradan)
+    writer: sonuçların yazılacağı depo (paylaşılan önbellek veya store)
+    """
+
+    REFILL_SECONDS = 900  # kuyruk bu aralıkla depodan tazelenir
+    IDLE_POLL_SECONDS = 30
+    RETRY_SECONDS = 3600  # hata alan seri bu süre kuyruğa alınmaz
+
+    def __init__(self, client, store, writer=None, requests_per_hour=DEFAULT_REQUESTS_PER_HOUR,
+                 idle=None, lookahead_days=DEFAULT_LOOKAHEAD_DAYS, clock=time.monotonic):
+        self.client = client
+        self.store = store
+        self.writer = writer or store
+        self.budget = HourlyBudget(requests_per_hour, clock)
+        self.idle = idle or IdleMonitor()
+        self.lookahead = lookahead_days * 86400
+        self.queue = RevalidationQueue()
+        self.checked = 0
+        self.changed = 0
+        self._clock = clock
+        self._refilled_at = None
+        self._refilled_count = 0
+        self._failed = {}  # serial -> tekrar denenebileceği an
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_listener(self, callback):
+        """Her doğrulamadan sonra callback(serial, eski durum, yeni durum) (arka plan thread'inden)"""
+        self._listeners.append(callback)
+
+    # --- kuyruk ---
+
+    def refill(self):
+        """Süresi yakında dolacak kayıtları depodan kuyruğa al; kuyruk boyunu döndür"""
+        now = self._clock()
+        self._failed = {serial: until for serial, until in self._failed.items() if until > now}
+        due_before = datetime.now().timestamp() + self.lookahead
+        # Bir saatte işlenebilecekten fazlasını tutmaya gerek yok
+        limit = max(self.budget.limit * 2, 50)
+        self.queue.clear()
+        candidates = self.store.revalidation_candidates(due_before, limit)
+        for serial, status_color, timestamp, expires, has_note in candidates:
+            if serial not in self._failed:
+                self.queue.push(serial, status_color, timestamp, expires, has_note)
+        self._refilled_at = now
+        self._refilled_count = len(self.queue)
+        return self._refilled_count
+
+    def _refill_due(self):
+        if self._refilled_at is None or self._clock() - self._refilled_at >= self.REFILL_SECONDS:
+            return True
+        # Kuyruk bittiyse ve son tazelemede iş vardıysa sıradakiler hemen alınır;
+        # hiç aday yoksa tablo REFILL_SECONDS dolmadan tekrar taranmaz
+        return not self.queue and self._refilled_count > 0
+
+    # --- çalışma ---
+
+    def run_once(self):
+        """Koşullar uygunsa kuyruktan bir seriyi doğrula; doğrulandıysa True"""
+        if not self.idle.is_idle() or self.budget.remaining() <= 0:
+            return False
+        if self._refill_due():
+            self.refill()
+        entry = self.queue.pop()
+        if entry is None:
+            return False
+        serial, old_status = entry
+
+        self.budget.consume()
+        try:
+            with metrics.span("revalidation"):
+                result, _source = self.client.query_backends(serial)
+            # Yeni sonuç hemen yazılır; durum değiştiyse depo işareti koyar
+            self.writer.put_lookups([(serial, result, datetime.now())])
+        except Exception as e:
+            logger.warning(f"Yeniden doğrulama hatası ({serial}): {e}")
+            self._failed[serial] = self._clock() + self.RETRY_SECONDS
+            metrics.inc("revalidations", result="error")
+            return False
+
+        new_status = result.get('status_color', '')
+        self.checked += 1
+        if new_status != old_status:
+            self.changed += 1
+            logger.info(f"Garanti durumu değişti: {serial} {old_status} -> {new_status}")
+        metrics.inc("revalidations", result="changed" if new_status != old_status else "unchanged")
+        for callback in list(self._listeners):
+            try:
+                callback(serial, old_status, new_status)
+            except Exception as e:
+                logger.exception(f"Revalidation listener error: {e}")
+        return True
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="Revalidation", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                logger.exception(f"Revalidation error: {e}")
+            if self.idle.is_idle() and self.budget.remaining() <= 0:
+                delay = self.budget.wait_time()
+            else:
+                delay = self.IDLE_POLL_SECONDS
+            self._stop.wait(max(1.0, min(delay, self.REFILL_SECONDS)))
+
+    def summary(self):
+        return (f"Yeniden doğrulama: {self.checked} cihaz, {self.changed} durum değişikliği, "
+                f"kuyrukta {len(self.queue)}, bu saat kalan bütçe {self.budget.remaining()}")
+
+
+def load_revalidation_config(path=REVALIDATION_FILE):
+    config = {"enabled": True, "requests_per_hour": DEFAULT_REQUESTS_PER_HOUR,
+              "idle_seconds": DEFAULT_IDLE_SECONDS, "lookahead_days": DEFAULT_LOOKAHEAD_DAYS}
+    try:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                config.update(json.load(f))
+    except Exception as e:
+        logger.exception(f"Revalidation config load error: {e}")
+    return config
+
+
+def start_revalidation(store=None, config_path=REVALIDATION_FILE):
+    """Ayarlara göre zamanlayıcıyı kur ve başlat; kapalıysa veya backend ayarı yoksa None"""
+    from warrantyClient import BACKEND_ORDER, BACKENDS_FILE, WarrantyClient, load_backends
+
+    config = load_revalidation_config(config_path)
+    if not config.get("enabled") or not os.path.exists(BACKENDS_FILE):
+        return None
+
+    from cacheService import get_shared_cache
+    from serialRouting import RoutingTable
+    from warrantyStore import get_store
+
+    store = store or get_store()
+    router = RoutingTable(BACKEND_ORDER)
+    router.learn_from_store(store)
+    client = WarrantyClient(load_backends(BACKENDS_FILE), store, router=router)
+    scheduler = RevalidationScheduler(
+        client, store, writer=get_shared_cache(store) or store,
+        requests_per_hour=config["requests_per_hour"],
+        idle=IdleMonitor(config["idle_seconds"]),
+        lookahead_days=config["lookahead_days"],
+    )
+    scheduler.start()
+    logger.info(f"Arka plan yeniden doğrulama başladı ({config['requests_per_hour']} istek/saat)")
+    return scheduler
+
+
+def add_revalidation_action(menu, scheduler):
+    """Tepsi menüsüne açılıp kapatılabilen "Arka Planda Doğrula" girdisini ekle"""
+    action = menu.addAction("Arka Planda Doğrula")
+    action.setCheckable(True)
+    action.setChecked(scheduler.running)
+    action.setToolTip(scheduler.summary())
+
+    def toggle(checked):
+        if checked:
+            scheduler.start()
+        else:
+            scheduler.stop()
+
+    action.toggled.connect(toggle)
+    menu.aboutToShow.connect(lambda: action.setToolTip(scheduler.summary()))
+    return action
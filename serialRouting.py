@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Seri önekine göre hangi backend'in cevap vereceğini geçmiş sonuçlardan öğrenir.
+
+README'deki test serilerinde görüldüğü gibi önek çoğunlukla sistemi belirler
+(R58EBR... KVK, R58VBR.../RCFVBY... RecciTek). Tablo, önek ve model kodu
+(önekin ilk harfleri) düzeyinde hangi backend'in kaç kez cevap verdiğini sayar;
+yeterince emin olduğu serileri önce o backend'e yönlendirir, cevap alınamazsa
+diğerlerine sırayla düşülür.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger("garanti")
+
+# Sonucu kaynak bilgisi olmayan eski kayıtlar için durum rengi -> backend
+STATUS_BACKEND = {
+    'green': 'recci',
+    'blue': 'kvk',
+}
+
+# 'none': iki backend de tanımadı (yönlendirmeye katılmaz ama güveni düşürür)
+NO_BACKEND = 'none'
+
+
+def outcome_backend(result):
+    """Kayıtlı sonucu hangi backend'in verdiği (bilinmiyorsa None)"""
+    source = result.get('source')
+    if source:
+        return source
+    return STATUS_BACKEND.get(result.get('status_color', ''))
+
+
+class RoutingTable:
+    """Önek -> backend sayaçları ve yönlendirme kararları.
+
+    Önce uzun önek (PREFIX_LEN), görülmemişse model kodu (MODEL_CODE_LEN) kullanılır.
+    Bir backend en az MIN_SAMPLES gözlemde MIN_CONFIDENCE oranında cevap verdiyse
+    seri önce ona sorulur.
+    """
+
+    PREFIX_LEN = 6
+    MODEL_CODE_LEN = 3
+    MIN_SAMPLES = 5
+    MIN_CONFIDENCE = 0.8
+
+    def __init__(self, default_order):
+        self.default_order = tuple(default_order)
+        self._counts = {}  # anahtar -> {backend: sayı}
+        self._lock = threading.Lock()
+        self.routed = 0
+        self.mispredicted = 0
+        self.calls = 0
+        self.calls_avoided = 0
+
+    def _keys(self, serial):
+        serial = serial.upper()
+        return (serial[:self.PREFIX_LEN], serial[:self.MODEL_CODE_LEN] + '*')
+
+    def observe(self, serial, backend):
+        """Bir sorgunun sonucunu (cevap veren backend veya 'none') tabloya ekle"""
+        if not backend:
+            return
+        with self._lock:
+            for key in self._keys(serial):
+                counts = self._counts.setdefault(key, {})
+                counts[backend] = counts.get(backend, 0) + 1
+
+    def learn_from_store(self, store):
+        """Depodaki tüm sorgu sonuçlarından öğren; öğrenilen kayıt sayısını döndür"""
+        learned = 0
+        for serial, result in store.iter_results():
+            backend = outcome_backend(result)
+            if backend:
+                self.observe(serial, backend)
+                learned += 1
+        logger.info(f"Yönlendirme tablosu {learned} sorgudan öğrenildi ({len(self._counts)} önek)")
+        return learned
+
+    def predict(self, serial):
+        """(backend, güven) veya yeterince emin değilse (None, güven)"""
+        with self._lock:
+            for key in self._keys(serial):
+                counts = self._counts.get(key)
+                if not counts:
+                    continue
+                total = sum(counts.values())
+                backend, count = max(counts.items(), key=lambda item: item[1])
+                confidence = count / total
+                if (total >= self.MIN_SAMPLES and confidence >= self.MIN_CONFIDENCE
+                        and backend in self.default_order):
+                    return backend, confidence
+                return None, confidence
+        return None, 0.0
+
+    def route(self, serial):
+        """Backend sorgu sırası; tahmin edilen backend varsa başa alınır"""
+        backend, _confidence = self.predict(serial)
+        if backend is None:
+            return self.default_order, False
+        return (backend,) + tuple(name for name in self.default_order if name != backend), True
+
+    def record(self, serial, routed, order, answered, calls, baseline_calls):
+        """Yönlendirilmiş/yönlendirilmemiş bir sorgunun sonucunu ve yapılan çağrı sayısını kaydet"""
+        with self._lock:
+            self.calls += calls
+            self.calls_avoided += baseline_calls - calls
+            if routed:
+                self.routed += 1
+                if answered != order[0]:
+                    self.mispredicted += 1
+        self.observe(serial, answered)
+
+    def report(self):
+        with self._lock:
+            accuracy = 1 - self.mispredicted / self.routed if self.routed else 0.0
+            return (f"Yönlendirme: {self.routed} seri tahminle yönlendirildi "
+                    f"(%{accuracy * 100:.1f} doğru), {self.calls} API çağrısı yapıldı, "
+                    f"{self.calls_avoided} çağrı önlendi")
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""RecciTek ve KVK garanti API'leri için arayüz bağımsız istemci.
+
+Her backend `url?serial=...` adresine GET isteği atar ve şu JSON'u bekler:
+
+    {"found": true, "in_warranty": true, "model": "S8 Sonic", "brand": "...", "color": "..."}
+
+Backend adresleri warranty_backends.json dosyasından okunur (bkz. load_backends);
+çevrimdışı deneme için benchmarks/stubServer.py aynı sözleşmeyi sunar.
+
+Her backend kalıcı (keep-alive) bağlantı havuzu kullanır; aynı seri için eşzamanlı
+sorgular tek istekte birleştirilir. parallel=True ile iki backend aynı anda sorulur.
+"""
+
+import http.client
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.parse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from perfMetrics import metrics
+from warrantyStore import CachePolicy
+
+logger = logging.getLogger("garanti")
+
+BACKENDS_FILE = "warranty_backends.json"
+
+# Sorgu sırası: önce RecciTek, cevap vermezse KVK
+BACKEND_ORDER = ("recci", "kvk")
+
+# Backend garantili derse kullanılacak durum rengi
+BACKEND_STATUS = {
+    "recci": "green",
+    "kvk": "blue",
+}
+
+
+class BackendError(Exception):
+    """Backend'e ulaşılamadı veya anlaşılmaz cevap verdi"""
+
+
+class RateLimiter:
+    """Basit token bucket: saniyede `rate` istek, en fazla `burst` birikir"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class ConnectionPool:
+    """Tek bir sunucuya açık tutulan HTTP bağlantıları (keep-alive)"""
+
+    def __init__(self, url, size, timeout):
+        parsed = urllib.parse.urlsplit(url)
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def get(self, path):
+        """GET isteği at, (durum kodu, gövde) döndür"""
+        return self.request('GET', path)
+
+    def request(self, method, path, body=None, headers=None):
+        """İstek at, (durum kodu, gövde) döndür"""
+        headers = dict(headers or {}, Connection='keep-alive')
+        try:
+            conn, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self._connect(), False
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if not reused:
+                raise
+            # Sunucu boştaki bağlantıyı kapatmış olabilir: yeni bağlantıyla bir kez dene
+            return self._retry(method, path, body, headers)
+        self._release(conn, response)
+        return response.status, data
+
+    def _retry(self, method, path, body, headers):
+        conn = self._connect()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except Exception:
+            conn.close()
+            raise
+        self._release(conn, response)
+        return response.status, data
+
+    def _release(self, conn, response):
+        if response.will_close:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class Backend:
+    """Tek bir garanti API'si; eşzamanlı istek ve saniyelik istek sınırı ile"""
+
+    def __init__(self, name, url, concurrency=4, rate=5.0, timeout=10.0):
+        self.name = name
+        self.url = url
+        self.status_color = BACKEND_STATUS.get(name, "green")
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate)
+        self.concurrency = max(1, int(concurrency))
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._pool = ConnectionPool(url, self.concurrency, timeout)
+        self._path = urllib.parse.urlsplit(url).path or '/'
+
+    def query(self, serial):
+        """Seriyi sorgula; backend cihazı tanımıyorsa None"""
+        with self._slots:
+            self.limiter.acquire()
+            with metrics.span("api_request", backend=self.name):
+                data = self._request(serial)
+
+        if not data.get('found'):
+            return None
+        return {
+            'status_color': self.status_color if data.get('in_warranty') else 'red',
+            'copy_model_payload': data.get('model', '') or '',
+            'brand': data.get('brand', '') or '',
+            'color': data.get('color', '') or '',
+            'source': self.name,
+        }
+
+    def _request(self, serial):
+        path = f"{self._path}?{urllib.parse.urlencode({'serial': serial})}"
+        try:
+            status, body = self._pool.get(path)
+        except Exception as e:
+            raise BackendError(f"{self.name}: {e}") from e
+        if status != 200:
+            raise BackendError(f"{self.name}: HTTP {status}")
+        try:
+            return json.loads(body.decode('utf-8'))
+        except ValueError as e:
+            raise BackendError(f"{self.name}: {e}") from e
+
+    def close(self):
+        self._pool.close()
+
+
+def load_backends(path=BACKENDS_FILE):
+    """Backend ayarlarını oku:
+
+        {"recci": {"url": "...", "concurrency": 4, "rate": 5},
+         "kvk": {"url": "...", "concurrency": 4, "rate": 5}}
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return {
+        name: Backend(name, options['url'],
+                      concurrency=options.get('concurrency', 4),
+                      rate=options.get('rate', 5.0),
+                      timeout=options.get('timeout', 10.0))
+        for name, options in config.items()
+    }
+
+
+class CacheStats:
+    """Önbellek isabet sayaçları; her LOG_EVERY sorguda isabet oranını loglar"""
+
+    LOG_EVERY = 100
+
+    def __init__(self):
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, kind):
+        with self._lock:
+            if kind == 'hit':
+                self.hits += 1
+            elif kind == 'stale':
+                self.stale += 1
+            else:
+                self.misses += 1
+            total = self.hits + self.stale + self.misses
+        metrics.inc("cache_requests", result=kind)
+        if total % self.LOG_EVERY == 0:
+            logger.info(self.summary())
+
+    def hit_ratio(self):
+        total = self.hits + self.stale + self.misses
+        return (self.hits + self.stale) / total if total else 0.0
+
+    def summary(self):
+        return (f"Önbellek: %{self.hit_ratio() * 100:.1f} isabet "
+                f"({self.hits} güncel, {self.stale} eski, {self.misses} yok)")
+
+
+class LatencyStats:
+    """Uçtan uca sorgu süreleri; son WINDOW ölçümden p50/p95"""
+
+    WINDOW = 2000
+
+    def __init__(self):
+        self._samples = deque(maxlen=self.WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+    def summary(self):
+        return (f"Sorgu süresi: p50 {self.percentile(50) * 1000:.0f} ms, "
+                f"p95 {self.percentile(95) * 1000:.0f} ms ({len(self._samples)} ölçüm)")
+
+
+class SingleFlight:
+    """Aynı anahtar için eşzamanlı çağrıları tek çalıştırmada birleştirir"""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class WarrantyClient:
+    """Önbelleği kullanarak seriyi backend'lere sırayla soran istemci.
+
+    Süresi dolmuş (bkz. CachePolicy) önbellek kaydı hemen döndürülür ve arka planda
+    yeniden sorgulanır (stale-while-revalidate); yeni sonuç geçmişe yazılır.
+    """
+
+    REFRESH_WORKERS = 2
+
+    def __init__(self, backends, store=None, policy=None, parallel=False, router=None):
+        self.backends = backends
+        self.store = store
+        self.policy = policy or getattr(store, 'policy', None) or CachePolicy()
+        self.parallel = parallel
+        self.router = router  # serialRouting.RoutingTable veya None
+        self.stats = CacheStats()
+        self.latency = LatencyStats()
+        self._flight = SingleFlight()
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self._refresh_pool = None
+        self._parallel_pool = None
+
+    def lookup(self, serial, use_cache=True):
+        """(sonuç, kaynak) döndür; kaynak 'cache', 'stale' (eski, yenileniyor) veya backend adı.
+
+        Aynı seri için süren bir sorgu varsa yenisi başlatılmaz, onun sonucu beklenir.
+        """
+        started = time.monotonic()
+        try:
+            return self._flight.do((serial, use_cache), lambda: self._lookup(serial, use_cache))
+        finally:
+            elapsed = time.monotonic() - started
+            self.latency.record(elapsed)
+            metrics.observe("lookup", elapsed)
+
+    def _lookup(self, serial, use_cache):
+        if use_cache and self.store is not None:
+            cached = self.store.get_cached(serial)
+            if cached is not None:
+                if self.policy.is_fresh(cached):
+                    self.stats.record('hit')
+                    return cached['result'], 'cache'
+                self.stats.record('stale')
+                self._schedule_refresh(serial)
+                return cached['result'], 'stale'
+            self.stats.record('miss')
+
+        return self.query_backends(serial)
+
+    def query_backends(self, serial):
+        """Önbelleğe bakmadan backend'lere sor (yönlendirme tablosu varsa tahmin edilen önce)"""
+        names = [name for name in BACKEND_ORDER if name in self.backends]
+        routed = False
+        if self.router is not None:
+            order, routed = self.router.route(serial)
+            names = [name for name in order if name in self.backends]
+
+        # Emin olunan seride paralel sorgu yapılmaz: tahmin doğruysa tek çağrı yeter
+        if self.parallel and not routed and len(names) > 1:
+            result, source = self._query_parallel(serial, [(name, self.backends[name]) for name in names])
+            calls = len(names)
+        else:
+            result, source, calls = self._query_sequential(serial, names)
+
+        if self.router is not None:
+            self.router.record(serial, routed, names, source, calls, self._baseline_calls(source))
+        return result, source
+
+    def _query_sequential(self, serial, names):
+        """Backend'leri sırayla sor; (sonuç, kaynak, çağrı sayısı)"""
+        for calls, name in enumerate(names, start=1):
+            result = self.backends[name].query(serial)
+            if result is not None:
+                return result, name, calls
+        return (*self._not_found(), len(names))
+
+    def _baseline_calls(self, source):
+        """Yönlendirme olmasaydı bu sonuç için kaç çağrı yapılacaktı"""
+        names = [name for name in BACKEND_ORDER if name in self.backends]
+        if self.parallel or source not in names:
+            return len(names)
+        return names.index(source) + 1
+
+    def _query_parallel(self, serial, backends):
+        """Backend'leri aynı anda sor; cihazı tanıyan ilk cevabı al"""
+        with self._refresh_lock:
+            if self._parallel_pool is None:
+                workers = sum(backend.concurrency for _name, backend in backends)
+                self._parallel_pool = ThreadPoolExecutor(workers, thread_name_prefix="BackendQuery")
+            pool = self._parallel_pool
+
+        pending = {pool.submit(backend.query, serial): name for name, backend in backends}
+        error = None
+        while pending:
+            done, _not_done = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except BackendError as e:
+                    error = e
+                    continue
+                if result is not None:
+                    # Geç kalan backend'in cevabı beklenmez (istek yine de tamamlanır)
+                    return result, name
+        if error is not None:
+            # Tanıyan olmadı ve en az biri hata verdi: "garanti dışı" demek yanlış olur
+            raise error
+        return self._not_found()
+
+    @staticmethod
+    def _not_found():
+        # Hiçbir backend tanımadı: garanti dışı
+        return {'status_color': 'red', 'copy_model_payload': '', 'source': 'none'}, 'none'
+
+    def _schedule_refresh(self, serial):
+        with self._refresh_lock:
+            if serial in self._refreshing:
+                return
+            self._refreshing.add(serial)
+            if self._refresh_pool is None:
+                self._refresh_pool = ThreadPoolExecutor(self.REFRESH_WORKERS, thread_name_prefix="CacheRefresh")
+            pool = self._refresh_pool
+        pool.submit(self._refresh, serial)
+
+    def _refresh(self, serial):
+        try:
+            result, _source = self.query_backends(serial)
+            self.store.put_lookup(serial, result, datetime.now())
+        except Exception as e:
+            logger.warning(f"Önbellek yenileme hatası ({serial}): {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(serial)
+
+    def wait_refreshes(self):
+        """Bekleyen arka plan yenilemelerinin bitmesini bekle"""
+        with self._refresh_lock:
+            pool, self._refresh_pool = self._refresh_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def close(self):
+        """Yenilemeleri bekle, thread havuzlarını ve açık bağlantıları kapat"""
+        self.wait_refreshes()
+        with self._refresh_lock:
+            pool, self._parallel_pool = self._parallel_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        for backend in self.backends.values():
+            backend.close()
@@ -0,0 +1,898 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from historyArchive import HistoryArchive
+from noteStore import read_notes_file
+from perfMetrics import metrics
+
+logger = logging.getLogger("garanti")
+
+DB_FILE = "warranty_store.db"
+CACHE_FILE = "warranty_cache.json"
+NOTES_FILE = "device_notes.json"
+POLICY_FILE = "cache_policy.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lookups (
+    serial TEXT PRIMARY KEY,
+    status_color TEXT NOT NULL DEFAULT '',
+    model TEXT NOT NULL DEFAULT '',
+    result TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_lookups_timestamp ON lookups(timestamp);
+CREATE INDEX IF NOT EXISTS idx_lookups_status_color ON lookups(status_color);
+CREATE INDEX IF NOT EXISTS idx_lookups_model ON lookups(model);
+
+CREATE TABLE IF NOT EXISTS notes (
+    serial TEXT PRIMARY KEY,
+    note TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# İstatistik sayaçları lookups tablosuna yazılırken tetikleyicilerle güncellenir;
+# istatistik satırı ve pano hiçbir zaman tüm önbelleği taramaz. status_totals ve
+# model_stats her seriyi son haliyle bir kez sayar: arşive taşınan seriler sayaçlarda
+# kalır, arşivdeki bir seri yeniden sorgulanınca arşiv satırı düşülür.
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS status_totals (
+    status_color TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS daily_stats (
+    day TEXT NOT NULL,
+    status_color TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, status_color)
+);
+CREATE TABLE IF NOT EXISTS model_stats (
+    model TEXT NOT NULL,
+    status_color TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (model, status_color)
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_lookups_stats_insert AFTER INSERT ON lookups BEGIN
+    INSERT INTO status_totals(status_color, count) VALUES (NEW.status_color, 1)
+        ON CONFLICT(status_color) DO UPDATE SET count = count + 1;
+    INSERT INTO model_stats(model, status_color, count) VALUES (NEW.model, NEW.status_color, 1)
+        ON CONFLICT(model, status_color) DO UPDATE SET count = count + 1;
+    INSERT INTO daily_stats(day, status_color, count)
+        VALUES (date(NEW.timestamp, 'unixepoch', 'localtime'), NEW.status_color, 1)
+        ON CONFLICT(day, status_color) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_lookups_stats_update AFTER UPDATE OF status_color, model ON lookups BEGIN
+    UPDATE status_totals SET count = count - 1 WHERE status_color = OLD.status_color;
+    INSERT INTO status_totals(status_color, count) VALUES (NEW.status_color, 1)
+        ON CONFLICT(status_color) DO UPDATE SET count = count + 1;
+    UPDATE model_stats SET count = count - 1 WHERE model = OLD.model AND status_color = OLD.status_color;
+    INSERT INTO model_stats(model, status_color, count) VALUES (NEW.model, NEW.status_color, 1)
+        ON CONFLICT(model, status_color) DO UPDATE SET count = count + 1;
+END;
+
+-- Günlük kovalar sorgu olaylarını sayar: tekrar sorgulanan seri yeni gününe eklenir
+CREATE TRIGGER IF NOT EXISTS trg_lookups_stats_relookup AFTER UPDATE OF timestamp ON lookups
+WHEN NEW.timestamp != OLD.timestamp BEGIN
+    INSERT INTO daily_stats(day, status_color, count)
+        VALUES (date(NEW.timestamp, 'unixepoch', 'localtime'), NEW.status_color, 1)
+        ON CONFLICT(day, status_color) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_lookups_stats_delete AFTER DELETE ON lookups BEGIN
+    UPDATE status_totals SET count = count - 1 WHERE status_color = OLD.status_color;
+    UPDATE model_stats SET count = count - 1 WHERE model = OLD.model AND status_color = OLD.status_color;
+END;
+"""
+
+# Durumu değişen kayıtlar (ör. garantisi bitti): geçmiş penceresi bunları işaretler.
+# old_status ilk değişiklikten önceki durumdur; durum eski haline dönerse işaret kalkar.
+STATUS_CHANGE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS status_changes (
+    serial TEXT PRIMARY KEY,
+    old_status TEXT NOT NULL,
+    new_status TEXT NOT NULL,
+    changed_at REAL NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_lookups_status_change AFTER UPDATE OF status_color ON lookups
+WHEN NEW.status_color != OLD.status_color BEGIN
+    INSERT INTO status_changes(serial, old_status, new_status, changed_at)
+        VALUES (NEW.serial, OLD.status_color, NEW.status_color, NEW.timestamp)
+        ON CONFLICT(serial) DO UPDATE SET new_status = excluded.new_status, changed_at = excluded.changed_at;
+    DELETE FROM status_changes WHERE serial = NEW.serial AND old_status = new_status;
+END;
+"""
+
+MODEL_NOT_FOUND = 'MODEL İSMİ BULUNAMADI'
+
+# Durum rengi -> uzun durum metni
+STATUS_TEXTS = {
+    'green': 'RECCI GARANTİLİ',
+    'blue': 'KVK GARANTİLİ',
+}
+STATUS_TEXT_DEFAULT = 'GARANTİ DIŞI'
+
+_SONIC_RE = re.compile(r'\s+Sonic\s*', flags=re.IGNORECASE)
+
+
+def status_label_text(status_color):
+    """Durum rengine karşılık gelen uzun durum metni"""
+    return STATUS_TEXTS.get(status_color, STATUS_TEXT_DEFAULT)
+
+
+def clean_model_name(model_info):
+    """Model adını listeleme için sadeleştir (örn: "S8 Sonic" → "S8")"""
+    if not model_info or not model_info.strip():
+        return ''
+    return _SONIC_RE.sub(' ', model_info).strip()
+
+
+def history_record(row):
+    """(serial, status_color, timestamp, model) depo satırını görünüm kaydına çevir"""
+    serial, status_color, timestamp, model = row
+    return (serial, status_color, datetime.fromtimestamp(timestamp), model or MODEL_NOT_FOUND)
+
+
+def _split_sql(script):
+    """Tetikleyici gövdelerini bölmeden SQL betiğini ifadelere ayır"""
+    statement = ''
+    for line in script.splitlines(keepends=True):
+        if line.strip().startswith('--'):
+            continue
+        statement += line
+        if sqlite3.complete_statement(statement):
+            if statement.strip():
+                yield statement.strip()
+            statement = ''
+
+
+def _archived_entry(row):
+    """Arşiv satırını get_cached() kaydı biçimine çevir"""
+    if row is None:
+        return None
+    return {'result': dict(row[4]), 'timestamp': datetime.fromtimestamp(row[2]).isoformat()}
+
+
+def _month_start(moment):
+    return datetime(moment.year, moment.month, 1)
+
+
+def _next_month(month):
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+class CachePolicy:
+    """Önbellek geçerlilik süreleri (durum rengine göre), kayıt sınırı ve aktif dönem.
+
+    cache_policy.json örneği:
+        {"ttl_days": {"green": 30, "blue": 30, "red": 90}, "max_entries": 100000, "active_months": 3}
+
+    active_months: içinde bulunulan ay dahil bu kadar ay depoda (aktif parça) kalır,
+    daha eskiler aylık arşiv parçalarına taşınır (bkz. historyArchive).
+    """
+
+    DEFAULT_TTL_DAYS = {'green': 30, 'blue': 30, 'red': 90}
+    DEFAULT_ACTIVE_MONTHS = 3
+    EVICT_TARGET = 0.9
+
+    def __init__(self, ttl_days=None, max_entries=0, active_months=None):
+        self.ttl_days = dict(self.DEFAULT_TTL_DAYS)
+        self.ttl_days.update(ttl_days or {})
+        self.max_entries = int(max_entries or 0)  # 0 = sınırsız
+        self.active_months = max(1, int(active_months or self.DEFAULT_ACTIVE_MONTHS))
+
+    @classmethod
+    def load(cls, path=POLICY_FILE):
+        try:
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                return cls(config.get('ttl_days'), config.get('max_entries', 0), config.get('active_months'))
+        except Exception as e:
+            logger.exception(f"Cache policy load error: {e}")
+        return cls()
+
+    def ttl(self, status_color):
+        """Durum için geçerlilik süresi (saniye); bilinmeyen durumlar garanti dışı sayılır"""
+        days = self.ttl_days.get(status_color, self.ttl_days.get('red'))
+        return days * 86400
+
+    def is_fresh(self, cached, now=None):
+        """get_cached() kaydı hâlâ geçerli mi"""
+        timestamp = datetime.fromisoformat(cached['timestamp']).timestamp()
+        now = now if now is not None else datetime.now().timestamp()
+        return now - timestamp <= self.ttl(cached['result'].get('status_color', ''))
+
+    def active_since(self, now=None):
+        """Aktif dönemin başlangıcı: active_months ay önceki ayın ilk günü (epoch)"""
+        now = now or datetime.now()
+        total = now.year * 12 + now.month - 1 - (self.active_months - 1)
+        return datetime(total // 12, total % 12 + 1, 1).timestamp()
+
+
+class WarrantyStore:
+    """Sorgu önbelleği ve cihaz notları için gömülü SQLite deposu (WAL modu).
+
+    durable=True ile her transaction diske senkronlanır (synchronous=FULL): elektrik
+    kesintisinde bile son yazılanlar kaybolmaz. Paylaşılan önbellek servisi böyle açar.
+
+    lookups tablosu geçmişin aktif parçasıdır; eski aylar roll_over() ile yanındaki
+    <depo>_archive dizinine sıkıştırılmış aylık parçalar olarak taşınır.
+    """
+
+    def __init__(self, path=DB_FILE, policy=None, durable=False):
+        self.path = path
+        self.policy = policy or CachePolicy()
+        self.archive = HistoryArchive(os.path.splitext(path)[0] + "_archive")
+        self._lock = threading.RLock()
+        self._archive_lock = threading.Lock()  # aynı ay iki kez taşınmasın
+        self._archive_ready = False  # önceki sürümlerden kalan arşiv hazırlandı mı
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if durable else 'NORMAL'}")
+        self._upgrade_schema()
+        self._conn.executescript(SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_lookups_seq ON lookups(seq)")
+        self._init_stats()
+        for statement in _split_sql(STATUS_CHANGE_SCHEMA):
+            self._conn.execute(statement)
+
+    def _init_stats(self):
+        """Sayaç tablolarını ve tetikleyicileri kur; eski veritabanında bir kez doldur"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for statement in _split_sql(STATS_SCHEMA):
+                    self._conn.execute(statement)
+                if self.get_meta('stats_ready') is None:
+                    self._conn.execute("DELETE FROM status_totals")
+                    self._conn.execute("DELETE FROM model_stats")
+                    self._conn.execute("DELETE FROM daily_stats")
+                    self._conn.execute(
+                        "INSERT INTO status_totals(status_color, count) "
+                        "SELECT status_color, COUNT(*) FROM lookups GROUP BY status_color"
+                    )
+                    self._conn.execute(
+                        "INSERT INTO model_stats(model, status_color, count) "
+                        "SELECT model, status_color, COUNT(*) FROM lookups GROUP BY model, status_color"
+                    )
+                    self._conn.execute(
+                        "INSERT INTO daily_stats(day, status_color, count) "
+                        "SELECT date(timestamp, 'unixepoch', 'localtime'), status_color, COUNT(*) "
+                        "FROM lookups GROUP BY 1, 2"
+                    )
+                    self.set_meta('stats_ready', 1)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _upgrade_schema(self):
+        """Eski sürümde oluşturulmuş tabloya eksik kolonları ekle"""
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(lookups)")]
+        if columns and 'seq' not in columns:
+            self._conn.execute("ALTER TABLE lookups ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- meta ---
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta(key, value) VALUES(?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, str(value)),
+            )
+
+    # --- sorgu önbelleği ---
+
+    @staticmethod
+    def _lookup_row(serial, result, timestamp, seq):
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        return (
+            serial,
+            result.get('status_color', '') or '',
+            clean_model_name(result.get('copy_model_payload', '')),
+            json.dumps(result, ensure_ascii=False),
+            timestamp.timestamp(),
+            seq,
+        )
+
+    def put_lookup(self, serial, result, timestamp=None):
+        """Bir sorgu sonucunu kaydet (varsa üzerine yaz)"""
+        self.put_lookups([(serial, result, timestamp or datetime.now())])
+
+    @metrics.timed("cache_write")
+    def put_lookups(self, entries, newer_only=False):
+        """Birden çok sorgu sonucunu tek transaction'da kaydet: (serial, result, timestamp)
+
+        Her eklenen veya değişen kayıt yeni bir değişiklik sıra numarası (seq) alır;
+        aynen tekrar yazılan kayıtlar değişmez. newer_only=True ile (başka bir depodan
+        birleştirirken) mevcut kayıttan eski sonuçlar yok sayılır. Aktif parçada olmayıp
+        arşivde aynı veya daha yeni haliyle bulunan seriler yazılmaz: JSON köprüsü veya
+        paylaşılan önbellek arşive taşınmış kayıtları geri getirmez.
+        """
+        self._prepare_archive()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                base_seq = self.change_seq()
+                rows = [
+                    self._lookup_row(serial, result, timestamp, base_seq + i)
+                    for i, (serial, result, timestamp) in enumerate(entries, start=1)
+                ]
+                archived = self._archived_rows(row[0] for row in rows)
+                if archived:
+                    rows = [row for row in rows if row[0] not in archived or row[4] > archived[row[0]][2]]
+                    # Arşivdeki seri yeniden aktif parçaya geliyor: eski hali sayaçlardan düşülür
+                    shadowed = {row[0] for row in rows} & archived.keys()
+                    self._adjust_stats([archived[serial] for serial in shadowed], -1)
+                self._conn.executemany(
+                    "INSERT INTO lookups(serial, status_color, model, result, timestamp, seq) "
+                    "VALUES(?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(serial) DO UPDATE SET status_color = excluded.status_color, "
+                    "model = excluded.model, result = excluded.result, timestamp = excluded.timestamp, "
+                    "seq = excluded.seq "
+                    "WHERE (lookups.result != excluded.result OR lookups.timestamp != excluded.timestamp)"
+                    + (" AND excluded.timestamp >= lookups.timestamp" if newer_only else ""),
+                    rows,
+                )
+                # Sıra numarası sadece gerçekten yazılan satırlar kadar ilerler: aynen
+                # tekrar yazılan (ör. paylaşılan önbellekten geri gelen) kayıtlar değişiklik sayılmaz
+                written, last_seq = self._conn.execute(
+                    "SELECT COUNT(*), MAX(seq) FROM lookups WHERE seq > ?", (base_seq,)
+                ).fetchone()
+                if written and last_seq != base_seq + written:
+                    # Atlanan satırların bıraktığı boşlukları kapat
+                    serials = self._conn.execute(
+                        "SELECT serial FROM lookups WHERE seq > ? ORDER BY seq", (base_seq,)
+                    ).fetchall()
+                    self._conn.executemany("UPDATE lookups SET seq = ? WHERE serial = ?",
+                                           [(base_seq + i, serial) for i, (serial,) in enumerate(serials, start=1)])
+                self.set_meta('lookup_seq', base_seq + written)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.evict()
+        return len(rows)
+
+    def _adjust_stats(self, rows, delta):
+        """(serial, status_color, timestamp, model, ...) satırlarını sayaçlara ekle/çıkar"""
+        status, models = {}, {}
+        for row in rows:
+            status[row[1]] = status.get(row[1], 0) + delta
+            key = (row[3] or '', row[1])
+            models[key] = models.get(key, 0) + delta
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO status_totals(status_color, count) VALUES (?, ?) "
+                "ON CONFLICT(status_color) DO UPDATE SET count = count + excluded.count",
+                status.items(),
+            )
+            self._conn.executemany(
+                "INSERT INTO model_stats(model, status_color, count) VALUES (?, ?, ?) "
+                "ON CONFLICT(model, status_color) DO UPDATE SET count = count + excluded.count",
+                [(model, status_color, count) for (model, status_color), count in models.items()],
+            )
+
+    def _archived_rows(self, serials):
+        """Aktif parçada olmayan serilerin en yeni arşiv satırları: {serial: satır}"""
+        if not self.archive.segments():
+            return {}
+        serials = list(dict.fromkeys(serials))
+        present = set()
+        with self._lock:
+            for start in range(0, len(serials), self.IN_BATCH):
+                chunk = serials[start:start + self.IN_BATCH]
+                marks = ",".join("?" * len(chunk))
+                present.update(serial for serial, in self._conn.execute(
+                    f"SELECT serial FROM lookups WHERE serial IN ({marks})", chunk
+                ))
+        return self.archive.find_many([serial for serial in serials if serial not in present])
+
+    def evict(self):
+        """Kayıt sınırı aşıldıysa en eski ayları aktif dönem dolmadan arşive taşı.
+
+        Aylar bütün halinde taşınır, içinde bulunulan ay taşınmaz. Notu olan kayıtlar
+        da taşınır; geçmiş penceresinde sayfalanarak ve aramayla erişilebilir kalır.
+        Her seferinde sınırın altına (EVICT_TARGET oranı) inilir ki her yeni sorguda
+        tekrar taşıma yapılmasın.
+        """
+        limit = self.policy.max_entries
+        if not limit:
+            return 0
+        count = self.lookup_count()
+        if count <= limit:
+            return 0
+        target = round(limit * self.policy.EVICT_TARGET)
+        self._prepare_archive()
+        until = _month_start(datetime.now()).timestamp()
+        moved = 0
+        for month, start, end in self._archivable_months(until):
+            if count - moved <= target:
+                break
+            moved += self._archive_month(month, start, end)
+        if moved:
+            logger.info(f"{moved} eski sorgu arşive taşındı (sınır: {limit})")
+        return moved
+
+    # --- arşiv ---
+
+    def roll_over(self, now=None):
+        """Aktif dönemden (CachePolicy.active_months) eski ayları arşiv parçalarına taşı.
+
+        Taşınacak bir şey yoksa tek bir indeks sorgusuyla döner; pencere her
+        yüklemede çağırabilir. Taşınan kayıt sayısını döndürür.
+        """
+        moved = self._prepare_archive()
+        until = self.policy.active_since(now)
+        for month, start, end in self._archivable_months(until):
+            moved += self._archive_month(month, start, end)
+        if moved:
+            logger.info(f"{moved} sorgu aylık arşiv parçalarına taşındı")
+        return moved
+
+    def _archivable_months(self, until):
+        """until'den önce kaydı olan aylar, eskiden yeniye: (ay, başlangıç, bitiş)"""
+        with self._lock:
+            oldest = self._conn.execute("SELECT MIN(timestamp) FROM lookups").fetchone()[0]
+        if oldest is None or oldest >= until:
+            return
+        month = _month_start(datetime.fromtimestamp(oldest))
+        while month.timestamp() < until:
+            following = _next_month(month)
+            yield month.strftime('%Y-%m'), month.timestamp(), min(following.timestamp(), until)
+            month = following
+
+    def _archive_month(self, month, start, end):
+        """start <= zaman < end kayıtlarını ayın arşiv parçasına yaz, sonra depodan sil.
+
+        Parça diske yazılmadan satırlar silinmez; yazım sırasında depo kilitli değildir.
+        Arada değişen (yeniden sorgulanan) satır depoda kalır. Taşınan seriler
+        sayaçlarda kalır. Silme yeni bir sıra numarası alır ki açık geçmiş penceresi
+        kayıtların taşındığını görsün.
+        """
+        with self._archive_lock:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT serial, status_color, timestamp, model, result FROM lookups "
+                    "WHERE timestamp >= ? AND timestamp < ?",
+                    (start, end),
+                ).fetchall()
+            if not rows:
+                return 0
+            self.archive.write_segment(month, rows)
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    deleted = [
+                        row for row in rows
+                        if self._conn.execute("DELETE FROM lookups WHERE serial = ? AND timestamp = ?",
+                                              (row[0], row[2])).rowcount
+                    ]
+                    # Silme tetikleyicisinin düşürdüğü sayıları geri ekle
+                    self._adjust_stats(deleted, 1)
+                    self._advance_archived_until(end)
+                    self.set_meta('lookup_seq', self.change_seq() + 1)
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        return len(rows)
+
+    def _prepare_archive(self):
+        """Önceki sürümlerden kalan arşivi bir kez hazırla; taşınan kayıt sayısını döndür"""
+        if self._archive_ready:
+            return 0
+        moved = self._migrate_archive_table()
+        self._count_archived_stats()
+        self._archive_ready = True
+        return moved
+
+    def _count_archived_stats(self):
+        """Arşivde olup aktif parçada olmayan serileri sayaçlara bir kez ekle.
+
+        Önceki sürümler kayıtları arşive taşırken sayaçlardan düşüyordu. Her seri
+        en yeni arşiv satırıyla sayılır.
+        """
+        with self._lock:
+            if self.get_meta('archive_stats_ready') is not None:
+                return
+            active = {serial for serial, in self._conn.execute("SELECT serial FROM lookups")}
+            newest = {}
+            for row in self.archive.iter_rows():
+                if row[0] not in active and (row[0] not in newest or newest[row[0]][2] < row[2]):
+                    newest[row[0]] = row
+            self._conn.execute("BEGIN")
+            try:
+                self._adjust_stats(newest.values(), 1)
+                self.set_meta('archive_stats_ready', 1)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _migrate_archive_table(self):
+        """Önceki sürümün lookup_archive tablosunu arşiv parçalarına taşı (bir kez)"""
+        with self._lock:
+            if self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'lookup_archive'"
+            ).fetchone() is None:
+                return 0
+            rows = self._conn.execute(
+                "SELECT serial, status_color, timestamp, model, result FROM lookup_archive"
+            ).fetchall()
+        months = {}
+        for row in rows:
+            months.setdefault(datetime.fromtimestamp(row[2]).strftime('%Y-%m'), []).append(row)
+        with self._archive_lock:
+            for month, month_rows in sorted(months.items()):
+                self.archive.write_segment(month, month_rows)
+        with self._lock:
+            self._conn.execute("DROP TABLE lookup_archive")
+        return len(rows)
+
+    def _advance_archived_until(self, timestamp):
+        """Bu zamandan önceki aylar arşivde: JSON köprüsü o kayıtları geri getirmez"""
+        if float(self.get_meta('archived_until', 0)) < timestamp:
+            self.set_meta('archived_until', timestamp)
+
+    def change_seq(self):
+        """Son yazılan değişikliğin sıra numarası"""
+        return int(self.get_meta('lookup_seq', 0))
+
+    def changes_since(self, seq):
+        """Verilen sıra numarasından sonra eklenen/değişen satırlar (seq sırasıyla)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT serial, status_color, timestamp, model FROM lookups WHERE seq > ? ORDER BY seq",
+                (seq,),
+            ).fetchall()
+
+    @metrics.timed("cache_read")
+    def get_cached(self, serial):
+        """Önbellekteki sonucu warranty_cache.json kaydı biçiminde döndür.
+
+        Önce aktif parçaya, bulunamazsa arşiv parçalarına bakılır.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, timestamp FROM lookups WHERE serial = ?", (serial,)
+            ).fetchone()
+        if row is None:
+            return _archived_entry(self.archive.find(serial))
+        return {
+            'result': json.loads(row[0]),
+            'timestamp': datetime.fromtimestamp(row[1]).isoformat(),
+        }
+
+    # SQLite'ın tek ifadedeki parametre sınırının altında kalmak için
+    IN_BATCH = 500
+
+    @metrics.timed("cache_read", mode="batch")
+    def get_many(self, serials):
+        """Birden çok seriyi toplu oku: {serial: get_cached() kaydı}, olmayanlar yok.
+
+        Aktif parçada olmayanlar toplu olarak arşiv parçalarında aranır.
+        """
+        serials = list(dict.fromkeys(serials))
+        found = {}
+        with self._lock:
+            for start in range(0, len(serials), self.IN_BATCH):
+                chunk = serials[start:start + self.IN_BATCH]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT serial, result, timestamp FROM lookups WHERE serial IN ({marks})", chunk
+                ).fetchall()
+                for serial, result, timestamp in rows:
+                    found[serial] = {
+                        'result': json.loads(result),
+                        'timestamp': datetime.fromtimestamp(timestamp).isoformat(),
+                    }
+        missing = [serial for serial in serials if serial not in found]
+        if missing:
+            for serial, row in self.archive.find_many(missing).items():
+                found[serial] = _archived_entry(row)
+        return found
+
+    def lookups_since(self, seq, limit=1000):
+        """seq'ten sonra değişen kayıtlar, tam sonuçlarıyla: [(seq, serial, result, timestamp)]
+
+        Zaman ISO biçiminde döner; (serial, result, timestamp) put_lookups'a aynen verilebilir.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, serial, result, timestamp FROM lookups WHERE seq > ? ORDER BY seq LIMIT ?",
+                (seq, limit),
+            ).fetchall()
+        return [(row_seq, serial, json.loads(result), datetime.fromtimestamp(timestamp).isoformat())
+                for row_seq, serial, result, timestamp in rows]
+
+    def revalidation_candidates(self, due_before, limit=500):
+        """Önbellek süresi (bkz. CachePolicy) due_before'dan önce dolan kayıtlar.
+
+        [(serial, status_color, timestamp, expires, has_note)], notlular önce, sonra
+        süresi en erken dolan. Ayrı bir okuma bağlantısıyla tüm tablo taranır; paylaşılan
+        bağlantı beklemez.
+        """
+        ttl_days = self.policy.ttl_days
+        known = [status for status in ttl_days if status != 'red']
+        cases = "".join(" WHEN ? THEN ?" for _status in known)
+        params = [value for status in known for value in (status, self.policy.ttl(status))]
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(
+                "SELECT l.serial, l.status_color, l.timestamp, "
+                f"l.timestamp + CASE l.status_color{cases} ELSE ? END AS expires, "
+                "n.serial IS NOT NULL AS has_note "
+                "FROM lookups l LEFT JOIN notes n ON n.serial = l.serial "
+                "WHERE expires <= ? ORDER BY has_note DESC, expires, l.timestamp LIMIT ?",
+                [*params, self.policy.ttl('red'), due_before, limit],
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def status_changes(self, since=None):
+        """Durumu değişen kayıtlar: {serial: (eski durum, yeni durum, değişme zamanı)}
+
+        since verilirse ondan eski işaretler silinir ve döndürülmez.
+        """
+        with self._lock:
+            if since is not None:
+                self._conn.execute("DELETE FROM status_changes WHERE changed_at < ?", (since,))
+            rows = self._conn.execute(
+                "SELECT serial, old_status, new_status, changed_at FROM status_changes"
+            ).fetchall()
+        return {serial: (old, new, changed_at) for serial, old, new, changed_at in rows}
+
+    def iter_history_batches(self, batch_size=2000):
+        """(serial, status_color, timestamp, model) parçaları, en yeni üstte - timestamp indeksiyle.
+
+        Ayrı bir okuma bağlantısı kullanır; WAL sayesinde yazmaları ve paylaşılan
+        bağlantıyı bekletmez.
+        """
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(
+                "SELECT serial, status_color, timestamp, model FROM lookups ORDER BY timestamp DESC"
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def iter_export_rows(self, since=None, until=None, batch_size=2000):
+        """Dışa aktarım için (serial, status_color, timestamp, model, result, note) satırları.
+
+        since < timestamp <= until aralığını en yeni üstte, ayrı bir okuma
+        bağlantısından parça parça okur; ardından aralıkla kesişen arşiv parçaları
+        sırayla okunur. Her seri bir kez, en yeni haliyle yazılır.
+        """
+        where, params = self._time_range(since, until)
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(
+                "SELECT l.serial, l.status_color, l.timestamp, l.model, l.result, n.note "
+                "FROM lookups l LEFT JOIN notes n ON n.serial = l.serial"
+                f"{where} ORDER BY l.timestamp DESC",
+                params,
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
+            if not any(segment.overlaps(since, until) for segment in self.archive.segments()):
+                return
+            # Aktif parçadaki seriler arşivdeki eski hallerinden yenidir
+            seen = {serial for (serial,) in conn.execute("SELECT serial FROM lookups")}
+        finally:
+            conn.close()
+
+        notes = self.load_notes()
+        for serial, status_color, timestamp, model, result in self.archive.iter_rows(since, until):
+            if serial in seen:
+                continue
+            seen.add(serial)
+            yield (serial, status_color, timestamp, model, json.dumps(result, ensure_ascii=False),
+                   notes.get(serial))
+
+    def iter_results(self, batch_size=2000):
+        """Tüm sorguların (serial, result) çiftleri - önce aktif parça, sonra arşiv parçaları.
+
+        Not birleştirmesi ve sıralama yapılmaz; sonuçtan öğrenen kodlar (ör. seri
+        yönlendirme) için.
+        """
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute("SELECT serial, result FROM lookups")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for serial, result in rows:
+                    yield serial, json.loads(result)
+        finally:
+            conn.close()
+        for serial, _status, _timestamp, _model, result in self.archive.iter_rows():
+            yield serial, result
+
+    @staticmethod
+    def _time_range(since, until):
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("l.timestamp > ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("l.timestamp <= ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count_between(self, since=None, until=None):
+        """Aralıktaki kayıt sayısı - arşiv parçaları indeksten, yaklaşık sayılır"""
+        where, params = self._time_range(since, until)
+        with self._lock:
+            count = self._conn.execute(f"SELECT COUNT(*) FROM lookups l{where}", params).fetchone()[0]
+        return count + self.archive.count_between(since, until)
+
+    def max_timestamp(self):
+        with self._lock:
+            return self._conn.execute("SELECT MAX(timestamp) FROM lookups").fetchone()[0]
+
+    def lookup_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM lookups").fetchone()[0]
+
+    def status_counts(self):
+        """Durum rengine göre seri sayıları (arşiv dahil) - hazır sayaçlardan"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status_color, count FROM status_totals WHERE count > 0"
+            ).fetchall()
+        return dict(rows)
+
+    def stats_snapshot(self, days=14, top_models=5):
+        """İstatistik satırı ve pano için sayaçların anlık görüntüsü.
+
+        status ve models arşivdekiler dahil her seriyi son haliyle bir kez sayar.
+        daily: son `days` günün (gün, {durum: sayı}) listesi, eskiden yeniye
+        models: en çok sorgulanan modeller için (model, toplam, garanti dışı)
+        archived: arşiv parçalarındaki kayıt sayısı
+        """
+        today = datetime.now().date()
+        day_keys = [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+        daily = {day: {} for day in day_keys}
+        with self._lock:
+            for day, status_color, count in self._conn.execute(
+                "SELECT day, status_color, count FROM daily_stats WHERE day >= ?", (day_keys[0],)
+            ):
+                if day in daily:
+                    daily[day][status_color] = count
+            models = self._conn.execute(
+                "SELECT model, SUM(count), SUM(CASE WHEN status_color IN ('green', 'blue') THEN 0 ELSE count END) "
+                "FROM model_stats GROUP BY model HAVING SUM(count) > 0 ORDER BY 2 DESC LIMIT ?",
+                (top_models,),
+            ).fetchall()
+        return {
+            'status': self.status_counts(),
+            'daily': [(day, daily[day]) for day in day_keys],
+            'models': [(model or MODEL_NOT_FOUND, total, out) for model, total, out in models],
+            'archived': self.archive_count(),
+        }
+
+    def archive_count(self):
+        return self.archive.count()
+
+    # --- notlar ---
+
+    def load_notes(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT serial, note FROM notes").fetchall())
+
+    def set_notes(self, batch):
+        """Not değişikliklerini tek transaction'da uygula: {serial: not veya None (sil)}"""
+        now = datetime.now().timestamp()
+        upserts = [(serial, note, now) for serial, note in batch.items() if note]
+        deletes = [(serial,) for serial, note in batch.items() if not note]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                if upserts:
+                    self._conn.executemany(
+                        "INSERT INTO notes(serial, note, updated_at) VALUES(?, ?, ?) "
+                        "ON CONFLICT(serial) DO UPDATE SET note = excluded.note, updated_at = excluded.updated_at",
+                        upserts,
+                    )
+                if deletes:
+                    self._conn.executemany("DELETE FROM notes WHERE serial = ?", deletes)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # --- JSON dosyalarından geçiş ---
+
+    def migrate_from_json(self, cache_file=CACHE_FILE, notes_file=NOTES_FILE):
+        """device_notes.json'ı bir kez, warranty_cache.json'ı değiştikçe içeri al"""
+        if self.get_meta('notes_migrated') is None:
+            notes = read_notes_file(notes_file)
+            if notes:
+                self.set_notes(notes)
+                logger.info(f"{len(notes)} not {notes_file} dosyasından taşındı")
+            self.set_meta('notes_migrated', datetime.now().isoformat())
+
+        self.import_json_cache(cache_file)
+
+    def import_json_cache(self, cache_file=CACHE_FILE):
+        """warranty_cache.json son içe aktarımdan beri değiştiyse kayıtları depoya al.
+
+        app.py derlenmiş (pyarmor) olarak dağıtıldığı için önbelleği hâlâ bu dosyaya
+        yazabilir; bu köprü, o sürümler güncellenene kadar depoyu güncel tutar.
+        """
+        try:
+            if not os.path.exists(cache_file):
+                return 0
+            mtime = os.path.getmtime(cache_file)
+            if self.get_meta('json_cache_mtime') == repr(mtime):
+                return 0
+
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cache_data = json.load(f)
+
+            # Arşive taşınmış aylardaki kayıtlar depoya geri getirilmez (aylara göre
+            # taşınmamış eski arşiv kayıtlarını put_lookups ayrıca atlar)
+            archived_until = float(self.get_meta('archived_until', 0))
+            entries = [
+                (serial, data['result'], data['timestamp']) for serial, data in cache_data.items()
+                if datetime.fromisoformat(data['timestamp']).timestamp() > archived_until
+            ]
+            count = self.put_lookups(entries)
+            self.set_meta('json_cache_mtime', repr(mtime))
+            logger.info(f"{count} sorgu {cache_file} dosyasından içe aktarıldı")
+            return count
+        except Exception as e:
+            logger.exception(f"JSON cache import error: {e}")
+            return 0
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store(path=DB_FILE):
+    """Paylaşılan depo örneği - ilk açılışta JSON dosyalarından geçiş yapılır"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = WarrantyStore(path, CachePolicy.load())
+            _store.migrate_from_json()
+        return _store